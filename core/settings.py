@@ -59,6 +59,9 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'saas.middleware.TenantMiddleware',
+    'saas.middleware.MaintenanceMiddleware',
+    'saas.middleware.EntitlementMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -169,7 +172,16 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'saas.authentication.TenantJWTAuthentication',
+    ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'saas.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'saas.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'DEFAULT_FILTER_BACKENDS': (
@@ -394,6 +406,25 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'publish-due-announcement-notifications': {
+        'task': 'saas.tasks.publish_due_announcement_notifications',
+        'schedule': 60,  # Dakikada bir
+    },
+    'reconcile-unread-notification-counts': {
+        'task': 'saas.tasks.reconcile_unread_notification_counts',
+        'schedule': 3600,  # Saatte bir
+    },
+}
+
+# Bildirim alıcılarının dağıtımı: 'celery' (broker'a ulaşılamazsa süreç içi) veya 'thread'
+NOTIFICATION_FANOUT_BACKEND = 'celery'
+
+# Bildirim akışı (SSE) olaylarının süreçler arası taşındığı Redis; ortam
+# değişkeni boş verilirse yalnızca aynı süreçte oluşturulan bildirimler iletilir
+NOTIFICATION_STREAM_BROKER_URL = os.environ.get(
+    'NOTIFICATION_STREAM_BROKER_URL', 'redis://127.0.0.1:6379/2'
+) or None
 
 # Security settings
 if not DEBUG:
@@ -0,0 +1,24 @@
+"""
+Test ayarları: python manage.py test --settings=core.test_settings
+
+Geliştirme ayarlarını kullanır; testlerde çalışmayan Debug Toolbar çıkarılır,
+cache ve bildirim akışı Redis yerine süreç içinde tutulur.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app != 'debug_toolbar']
+MIDDLEWARE = [name for name in MIDDLEWARE if not name.startswith('debug_toolbar.')]
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Dağıtım broker'a gönderilmeden süreç içinde yapılır
+NOTIFICATION_FANOUT_BACKEND = 'thread'
+
+# Akış olayları aynı süreçteki dinleyicilere iletilir
+NOTIFICATION_STREAM_BROKER_URL = None
@@ -4,11 +4,11 @@ from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from django.contrib.admin import SimpleListFilter
 from .models import (
-    City, District, Neighborhood, Currency, Company, Branch, 
+    City, District, Neighborhood, LocationSnapshot, Currency, Company, Branch, 
     Employee, Plan, Subscription, Invoice, Notification, 
     NotificationRecipient, MaintenanceMode, Announcement,
     AnnouncementRead, CompanyBranding, APIUsage, Integration,
-    FileStorage, AuditLog
+    FileStorage, AuditLog, CompanyStatistics
 )
 
 class BaseAdmin(admin.ModelAdmin):
@@ -46,6 +46,31 @@ class NeighborhoodAdmin(LocationBaseAdmin):
     list_filter = ('district__city', 'district', 'is_active')
     search_fields = ('name', 'district__name', 'district__city__name')
 
+@admin.register(LocationSnapshot)
+class LocationSnapshotAdmin(BaseAdmin):
+    list_display = ('version', 'city_count', 'district_count', 'neighborhood_count', 'size', 'created_at', 'is_active')
+    exclude = ('payload',)
+    readonly_fields = ('version', 'checksum', 'size', 'city_count', 'district_count',
+                      'neighborhood_count', 'created_at', 'updated_at')
+
+    def has_add_permission(self, request):
+        # Anlık görüntüler publish_location_snapshot komutuyla oluşturulur
+        return False
+
+@admin.register(CompanyStatistics)
+class CompanyStatisticsAdmin(BaseAdmin):
+    list_display = ('company', 'total_branches', 'total_employees', 'active_employees',
+                    'storage_used', 'pending_invoices', 'updated_at')
+    search_fields = ('company__name',)
+    list_select_related = ('company',)
+
+    def get_readonly_fields(self, request, obj=None):
+        # Sayaçlar sinyallerle ve reconcile_company_statistics komutuyla güncellenir
+        return [field.name for field in self.model._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
 @admin.register(Currency)
 class CurrencyAdmin(LocationBaseAdmin):
     list_display = ('code', 'name', 'symbol', 'is_active')
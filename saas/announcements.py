@@ -0,0 +1,92 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .models import Announcement, AnnouncementRead
+
+
+def visible_announcements(tenant, now=None):
+    """
+    Kullanıcının görebileceği, yayında olan duyurular.
+    Announcement.can_view kuralının sorgu karşılığıdır (tek sorgu).
+    """
+    now = now or timezone.now()
+    announcements = Announcement.objects.filter(
+        Q(end_date__isnull=True) | Q(end_date__gte=now),
+        publish_date__lte=now,
+    )
+    if not tenant.is_authenticated:
+        return announcements.none()
+    if tenant.is_system_user:
+        return announcements
+    if not tenant.has_employee:
+        return announcements.none()
+
+    roles = ['all']
+    if tenant.is_company_admin:
+        roles.append('company_admin')
+    elif tenant.is_branch_admin:
+        roles.append('branch_admin')
+    elif tenant.role == 'employee':
+        roles.append('employee')
+
+    targets = Announcement.target_companies.through.objects.filter(announcement_id=OuterRef('pk'))
+    return announcements.filter(
+        ~Exists(targets) | Exists(targets.filter(company_id=tenant.company_id)),
+        target_role__in=roles,
+    )
+
+
+def announcement_recipients(announcement):
+    """
+    Duyuruyu görebilecek aktif kullanıcılar. visible_announcements kuralının
+    kullanıcı tarafındaki karşılığıdır: sistem kullanıcıları her duyuruyu,
+    çalışanlar hedef şirketlerindeki ve rollerine uyan duyuruları görür.
+    """
+    users = User.objects.filter(is_active=True)
+    system_users = Q(is_superuser=True) | Q(is_staff=True)
+    target_role = announcement.target_role
+    if target_role == 'all':
+        employees = Q(employee__isnull=False)
+    elif target_role in ('company_admin', 'branch_admin', 'employee'):
+        employees = Q(employee__role=target_role)
+    else:
+        # 'superuser' ve 'staff' duyurularını yalnızca sistem kullanıcıları görür
+        return users.filter(system_users)
+
+    targets = announcement.target_companies.all()
+    if targets.exists():
+        employees &= Q(employee__branch__company__in=targets)
+    return users.filter(system_users | employees)
+
+
+def unread_announcements(user_id, tenant, now=None):
+    """Kullanıcının görebildiği ve henüz okumadığı duyurular"""
+    reads = AnnouncementRead.objects.filter(announcement_id=OuterRef('pk'), user_id=user_id)
+    return visible_announcements(tenant, now).exclude(Exists(reads))
+
+
+def count_unread_announcements(user_id, tenant):
+    return unread_announcements(user_id, tenant).count()
+
+
+def mark_announcements_read(user_id, tenant, announcement_ids=None):
+    """
+    Kullanıcının görebildiği okunmamış duyuruları (verilirse yalnızca bu
+    duyuruları) okundu yapar. Okunmamışlar tek sorguda bulunur, okunma
+    kayıtları tek INSERT ile yazılır; eklenen kayıt sayısı döner. Aynı
+    kullanıcının eşzamanlı çağrıları kullanıcı satırı kilitlenerek sıraya
+    girer; bulunan okunmamışları başka bir çağrı araya girip yazamaz.
+    """
+    with transaction.atomic():
+        list(User.objects.select_for_update().filter(pk=user_id).values_list('pk'))
+        unread = unread_announcements(user_id, tenant)
+        if announcement_ids is not None:
+            unread = unread.filter(id__in=announcement_ids)
+        ids = list(unread.values_list('id', flat=True))
+        AnnouncementRead.objects.bulk_create(
+            [AnnouncementRead(announcement_id=announcement_id, user_id=user_id) for announcement_id in ids],
+            ignore_conflicts=True,
+        )
+    return len(ids)
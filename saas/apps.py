@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SaasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'saas'
+
+    def ready(self):
+        # Cache geçersiz kılma sinyallerini kaydet
+        from . import signals  # noqa: F401
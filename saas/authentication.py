@@ -0,0 +1,200 @@
+import copy
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .caching import bump_version_on_commit, get_version, get_versions
+from .tenancy import TENANT_CACHE_ATTR, TenantContext, resolve_tenant
+
+# Token claim'leri: kullanıcının bağlamı ve claim'lerin üretildiği yetki sürümü
+COMPANY_CLAIM = 'company_id'
+BRANCH_CLAIM = 'branch_id'
+EMPLOYEE_CLAIM = 'employee_id'
+ROLE_CLAIM = 'role'
+STAFF_CLAIM = 'is_staff'
+SUPERUSER_CLAIM = 'is_superuser'
+VERSION_CLAIM = 'auth_version'
+
+# Sürüm ad alanları: kullanıcının kendisi/çalışan kaydı ve grup izinleri
+USER_NAMESPACE = 'auth:user:{}'
+SHARED_NAMESPACE = 'auth:shared'
+
+USER_STATE_CACHE_SIZE = 1024
+
+# Bildirim akışı token'ının ömrü; yalnızca bağlantı açılırken kontrol edilir
+STREAM_TOKEN_LIFETIME = timedelta(minutes=1)
+
+
+def invalidate_user_state(user_id):
+    """Kullanıcının süreçlerdeki durumunu ve token claim'lerini geçersiz kılar"""
+    if user_id is not None:
+        bump_version_on_commit(USER_NAMESPACE.format(user_id))
+
+
+def invalidate_user_states():
+    """Tüm kullanıcıların yetki önbelleğini geçersiz kılar (grup izinleri)"""
+    bump_version_on_commit(SHARED_NAMESPACE)
+
+
+def issue_tokens(user, tenant):
+    """
+    Kullanıcı için refresh ve access token üretir. Bağlam claim'leri refresh
+    token'a yazılır; yenilenen access token'lar da aynı claim'leri taşır.
+    """
+    refresh = RefreshToken.for_user(user)
+    refresh[VERSION_CLAIM] = get_version(USER_NAMESPACE.format(user.pk))
+    refresh[STAFF_CLAIM] = tenant.is_staff
+    refresh[SUPERUSER_CLAIM] = tenant.is_superuser
+    refresh[COMPANY_CLAIM] = tenant.company_id
+    refresh[BRANCH_CLAIM] = tenant.branch_id
+    refresh[EMPLOYEE_CLAIM] = tenant.employee_id
+    refresh[ROLE_CLAIM] = tenant.role
+    return refresh
+
+
+class StreamToken(AccessToken):
+    """
+    Yalnızca bildirim akışını açmaya yarayan kısa ömürlü token. EventSource
+    başlık gönderemediğinden URL'de taşınır; URL'ler sunucu loglarına
+    düştüğünden access token'lar URL'de kabul edilmez. Token tipi farklı
+    olduğundan API isteklerinde de kullanılamaz.
+    """
+    token_type = 'stream'
+    lifetime = STREAM_TOKEN_LIFETIME
+
+
+def tenant_from_claims(user, token):
+    """Token claim'lerinden veritabanına gitmeden istek bağlamını kurar"""
+    return TenantContext(
+        user_id=user.pk,
+        is_authenticated=True,
+        is_staff=user.is_staff,
+        is_superuser=user.is_superuser,
+        employee_id=token.get(EMPLOYEE_CLAIM),
+        branch_id=token.get(BRANCH_CLAIM),
+        company_id=token.get(COMPANY_CLAIM),
+        role=token.get(ROLE_CLAIM),
+    )
+
+
+def is_token_current(token):
+    """Token claim'leri kullanıcının güncel yetki sürümüyle mi üretilmiş? (tek cache okuması)"""
+    user_id = token.get(api_settings.USER_ID_CLAIM)
+    return token.get(VERSION_CLAIM) == get_version(USER_NAMESPACE.format(user_id))
+
+
+def tenant_from_token(token):
+    """
+    Kullanıcı yüklenmeden yalnızca token'dan kurulan bağlam (middleware'ler
+    için). Claim'ler token üretildiği andaki bilgiyi taşır; güncel olup
+    olmadıkları is_token_current ile kontrol edilmelidir.
+    """
+    return TenantContext(
+        user_id=token.get(api_settings.USER_ID_CLAIM),
+        is_authenticated=True,
+        is_staff=bool(token.get(STAFF_CLAIM)),
+        is_superuser=bool(token.get(SUPERUSER_CLAIM)),
+        employee_id=token.get(EMPLOYEE_CLAIM),
+        branch_id=token.get(BRANCH_CLAIM),
+        company_id=token.get(COMPANY_CLAIM),
+        role=token.get(ROLE_CLAIM),
+    )
+
+
+@dataclass(frozen=True)
+class UserState:
+    versions: tuple
+    user: object
+    tenant: TenantContext
+
+
+class UserStateCache:
+    """Süreç içi, boyutu sınırlı (LRU) kullanıcı durumu önbelleği"""
+
+    def __init__(self, maxsize=USER_STATE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id, versions):
+        with self._lock:
+            state = self._states.get(user_id)
+            if state is None or state.versions != versions:
+                return None
+            self._states.move_to_end(user_id)
+            return state
+
+    def set(self, user_id, state):
+        with self._lock:
+            self._states[user_id] = state
+            self._states.move_to_end(user_id)
+            while len(self._states) > self.maxsize:
+                self._states.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._states.clear()
+
+
+user_states = UserStateCache()
+
+
+class TenantJWTAuthentication(JWTAuthentication):
+    """
+    Kullanıcıyı ve bağlamını her istekte veritabanından okumayan JWT
+    kimlik doğrulaması.
+
+    Kullanıcı nesnesi (izin önbelleği doldurulmuş olarak) ve bağlamı süreç
+    içi LRU'da tutulur; geçerliliği paylaşılan cache'teki kullanıcı ve grup
+    sürümleriyle kontrol edilir. Kullanıcı, çalışan kaydı, grupları veya
+    izinleri değiştiğinde sürüm yenilenir ve bir sonraki istekte yeniden
+    yüklenir. Bağlam, token'ın yetki sürümü güncelse claim'lerden, değilse
+    veritabanından kurulur. Sürümler değişmediği sürece istek sorgusuzdur.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        token = self.get_validated_token(raw_token)
+        state = self.get_user_state(token)
+        # Bağlam isteğe yazılır; get_tenant aynı istekte yeniden çözmez
+        setattr(getattr(request, '_request', request), TENANT_CACHE_ATTR, state.tenant)
+        # Paylaşılan nesne istekler arasında değişmesin diye kopyası döner
+        return copy.copy(state.user), token
+
+    def get_user_state(self, token):
+        user_id = token.get(api_settings.USER_ID_CLAIM)
+        versions = tuple(get_versions([USER_NAMESPACE.format(user_id), SHARED_NAMESPACE]))
+        state = user_states.get(user_id, versions)
+        if state is None:
+            # Kullanıcı yoksa veya aktif değilse AuthenticationFailed fırlatır
+            user = self.get_user(token)
+            # İzin kontrolleri (has_perm) sonraki isteklerde sorgu yapmasın
+            user.get_all_permissions()
+            if token.get(VERSION_CLAIM) == versions[0]:
+                tenant = tenant_from_claims(user, token)
+            else:
+                tenant = resolve_tenant(user)
+            state = UserState(versions=versions, user=user, tenant=tenant)
+            user_states.set(user_id, state)
+        elif api_settings.CHECK_REVOKE_TOKEN and token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(state.user.password):
+            # Parola değişmeden önce üretilmiş token'lar önbellekten geçemez
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
+        return state
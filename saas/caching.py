@@ -0,0 +1,90 @@
+import functools
+import threading
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = 'saas:version:{}'
+
+
+def get_version(namespace):
+    """
+    Ad alanının güncel sürümünü döndürür.
+    Sürüm paylaşılan cache'te tutulan opak bir değerdir; cache'ten düşerse
+    yeni bir değer üretilir, böylece eski bir sürümle asla çakışmaz.
+    """
+    key = VERSION_KEY.format(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_versions(namespaces):
+    """Birden çok ad alanının sürümünü tek cache isteğiyle döndürür"""
+    keys = [VERSION_KEY.format(namespace) for namespace in namespaces]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+        versions.update(cache.get_many(missing))
+    return [versions.get(key) for key in keys]
+
+
+def bump_version(namespace):
+    """Ad alanının sürümünü yeniler, tüm süreçlerdeki kopyalar geçersiz olur"""
+    version = uuid.uuid4().hex
+    cache.set(VERSION_KEY.format(namespace), version, timeout=None)
+    return version
+
+
+def on_commit_once(func, *args):
+    """
+    func(*args) çağrısını transaction commit edildikten sonra çalıştırır.
+    Aynı transaction içinde aynı çağrı birden fazla kez istenirse bir kez çalışır.
+    """
+    connection = transaction.get_connection()
+    if connection.in_atomic_block:
+        for _, callback, _ in connection.run_on_commit:
+            if getattr(callback, 'func', None) is func and callback.args == args:
+                return
+    transaction.on_commit(functools.partial(func, *args))
+
+
+def bump_version_on_commit(namespace):
+    """
+    Sürümü transaction commit edildikten sonra yeniler.
+    Aynı transaction içinde birden fazla çağrı tek bir yenilemeye indirgenir.
+    """
+    on_commit_once(bump_version, namespace)
+
+
+class VersionedValue:
+    """
+    Süreç içinde tutulan ve paylaşılan sürüm değiştiğinde yeniden kurulan değer.
+
+    Her erişimde yalnızca sürüm anahtarı okunur; veri değişmediği sürece
+    builder tekrar çağrılmaz.
+    """
+
+    def __init__(self, namespace, builder):
+        self.namespace = namespace
+        self.builder = builder
+        self._lock = threading.Lock()
+        self._version = None
+        self._value = None
+
+    def get(self):
+        version = get_version(self.namespace)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._value = self.builder()
+                    self._version = version
+        return self._value
+
+    def invalidate(self):
+        bump_version_on_commit(self.namespace)
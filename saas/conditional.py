@@ -0,0 +1,198 @@
+import hashlib
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .caching import on_commit_once
+from .pagination import KeysetPagination
+from .query_plan import QueryPlan
+
+CHANGE_KEY = 'saas:changed:{}'
+
+
+def _change_key(model):
+    return CHANGE_KEY.format(model._meta.label_lower)
+
+
+def _touch(key):
+    cache.set(key, time.time(), timeout=None)
+
+
+def mark_changed(model):
+    """
+    updated_at'e yansımayan değişiklikleri (silme, M2M, SET_NULL) işaretler.
+    Zaman damgası commit'ten sonra paylaşılan cache'e yazılır.
+    """
+    on_commit_once(_touch, _change_key(model))
+
+
+def get_change_time(model):
+    """
+    Modelin son işaretlenen değişiklik zamanı. Cache'te yoksa şimdiki zaman
+    yazılır; böylece kaybolan bir kayıt hiçbir zaman eski bir 304'e yol açmaz.
+    """
+    key = _change_key(model)
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, time.time(), timeout=None)
+        value = cache.get(key)
+    return value
+
+
+@dataclass(frozen=True)
+class FingerprintSpec:
+    """Bir sorgu planı için toplanacak updated_at alanları ve izlenen modeller"""
+    maxima: tuple  # (anahtar, updated_at lookup'ı)
+    models: tuple
+    distinct: bool
+
+
+def _related_model(model, path):
+    for name in path.split('__'):
+        model = model._meta.get_field(name).related_model
+    return model
+
+
+def _has_updated_at(model):
+    return any(field.name == 'updated_at' for field in model._meta.concrete_fields)
+
+
+@lru_cache(maxsize=None)
+def build_fingerprint_spec(model, plan):
+    """
+    Serializer'ın okuduğu her ilişkinin updated_at değeri parmak izine katılır;
+    böylece ör. şube adı değiştiğinde çalışan listesinin ETag'i de değişir.
+    """
+    paths = ('',) + plan.select_related + plan.prefetch_related
+    maxima, models = [], []
+    for index, path in enumerate(paths):
+        related = _related_model(model, path) if path else model
+        if related not in models:
+            models.append(related)
+        if _has_updated_at(related):
+            lookup = f'{path}__updated_at' if path else 'updated_at'
+            maxima.append((f'updated_{index}', lookup))
+    return FingerprintSpec(
+        maxima=tuple(maxima),
+        models=tuple(models),
+        distinct=bool(plan.prefetch_related),
+    )
+
+
+def view_fingerprint_spec(view, queryset):
+    """QueryPlanMixin kullanan bir viewset'in planı (ek ilişkiler dahil) için tanım"""
+    plan = view.get_query_plan(queryset)
+    extra = view.query_plan_extra
+    if extra.select_related or extra.prefetch_related:
+        plan = QueryPlan(
+            select_related=plan.select_related + extra.select_related,
+            prefetch_related=plan.prefetch_related + extra.prefetch_related,
+        )
+    return build_fingerprint_spec(queryset.model, plan)
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    etag: str
+    last_modified: Optional[int]
+
+
+def queryset_fingerprint(queryset, spec, *variant):
+    """
+    Filtrelenmiş sorgunun parmak izi: satır sayısı, updated_at en büyük
+    değerleri ve izlenen modellerin değişiklik zamanları. Tek bir aggregate
+    sorgusudur; satırlar okunmaz, serialize edilmez.
+    """
+    values = queryset.order_by().aggregate(
+        fingerprint_count=Count('pk', distinct=spec.distinct),
+        **{key: Max(lookup) for key, lookup in spec.maxima}
+    )
+    count = values.pop('fingerprint_count')
+    changes = [get_change_time(model) for model in spec.models]
+
+    timestamps = [value.timestamp() for value in values.values() if value is not None]
+    timestamps.extend(changes)
+    last_modified = int(max(timestamps)) if timestamps else None
+
+    parts = [*variant, count, *sorted(values.items()), *changes]
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return Fingerprint(etag=quote_etag(digest), last_modified=last_modified)
+
+
+class ConditionalGetMixin:
+    """
+    list ve retrieve için ETag / Last-Modified üretir. İstemcinin
+    If-None-Match / If-Modified-Since başlıkları eşleşirse satırlar okunmadan
+    ve serialize edilmeden 304 döner.
+
+    Parmak izi filtrelenmiş sorgudan (satır sayısı, kök ve ilişkili modellerin
+    en büyük updated_at değeri) ve silme/M2M değişiklik zamanlarından çıkar.
+    Keyset sayfalanan büyük tablolarda liste için tam tarama gerekeceğinden
+    yalnızca retrieve koşullu yanıtlanır. QueryPlanMixin ile birlikte kullanılır.
+    """
+    conditional_list = True
+
+    def get_fingerprint_spec(self, queryset):
+        return view_fingerprint_spec(self, queryset)
+
+    def get_fingerprint(self, queryset):
+        request = self.request
+        return queryset_fingerprint(
+            queryset,
+            self.get_fingerprint_spec(queryset),
+            request.get_full_path(),
+            request.accepted_media_type,
+            request.user.pk,
+        )
+
+    def conditional_response(self, fingerprint, get_response):
+        """Koşul eşleşirse 304/412, aksi halde get_response() sonucunu döndürür"""
+        response = get_conditional_response(
+            self.request,
+            etag=fingerprint.etag,
+            last_modified=fingerprint.last_modified,
+        )
+        if response is None:
+            response = get_response()
+            if response.status_code != 200:
+                return response
+
+        response.headers['ETag'] = fingerprint.etag
+        if fingerprint.last_modified is not None:
+            response.headers['Last-Modified'] = http_date(fingerprint.last_modified)
+        patch_cache_control(response, private=True, max_age=0, must_revalidate=True)
+        patch_vary_headers(response, ('Accept', 'Authorization'))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        if not self.conditional_list or isinstance(self.paginator, KeysetPagination):
+            return super().list(request, *args, **kwargs)
+
+        fingerprint = self.get_fingerprint(self.filter_queryset(self.get_queryset()))
+        return self.conditional_response(
+            fingerprint, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+        )
+
+    def get_object(self):
+        # retrieve'da parmak izinden önce okunan nesne yeniden sorgulanmaz
+        instance = getattr(self, '_conditional_object', None)
+        if instance is None:
+            instance = self._conditional_object = super().get_object()
+        return instance
+
+    def retrieve(self, request, *args, **kwargs):
+        # Nesne yetkileri 304'ten önce kontrol edilir
+        instance = self.get_object()
+        fingerprint = self.get_fingerprint(
+            self.filter_queryset(self.get_queryset()).filter(pk=instance.pk)
+        )
+        return self.conditional_response(
+            fingerprint,
+            lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs)
+        )
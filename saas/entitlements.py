@@ -0,0 +1,169 @@
+import hashlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .caching import bump_version_on_commit, get_versions
+from .models import Subscription
+
+ENTITLEMENT_KEY = 'saas:entitlement:{}:{}'
+ENTITLEMENT_TIMEOUT = 3600
+
+# Sürüm ad alanları: şirketin abonelikleri ve tüm planlar
+COMPANY_NAMESPACE = 'entitlement:company:{}'
+PLAN_NAMESPACE = 'entitlement:plans'
+
+STATUS_LABELS = dict(Subscription.STATUS_CHOICES)
+
+
+@dataclass(frozen=True)
+class Entitlement:
+    """
+    Şirketin o anki hakları: aktif abonelik, plan limitleri ve bitiş zamanı.
+    Abonelik yoksa subscription_id None'dır. valid_until anında (abonelik
+    bittiğinde veya ileri tarihli bir abonelik başladığında) yeniden hesaplanır.
+    """
+    company_id: Optional[int]
+    subscription_id: Optional[int] = None
+    status: Optional[str] = None
+    plan_id: Optional[int] = None
+    plan_name: Optional[str] = None
+    plan_price: Optional[Decimal] = None
+    features: dict = field(default_factory=dict)
+    max_users: Optional[int] = None
+    max_storage: Optional[int] = None
+    starts_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    trial_ends: Optional[datetime] = None
+    valid_until: Optional[datetime] = None
+
+    def is_active(self, now=None):
+        """Şirketin şu an geçerli bir aboneliği var mı?"""
+        if self.subscription_id is None:
+            return False
+        return (now or timezone.now()) <= self.expires_at
+
+    def is_stale(self, now=None):
+        return self.valid_until is not None and (now or timezone.now()) >= self.valid_until
+
+    @property
+    def status_display(self):
+        return STATUS_LABELS.get(self.status, self.status)
+
+    @property
+    def is_trial(self):
+        return Subscription.is_trial.fget(self)
+
+    def remaining_days(self, now=None):
+        if self.expires_at is None:
+            return 0
+        return (self.expires_at - (now or timezone.now())).days
+
+    def has_feature(self, name):
+        """Plan özelliği açık mı? (Plan.features içindeki değer)"""
+        return bool(self.limit(name))
+
+    def limit(self, name, default=None):
+        """Plan.features içindeki limit veya bayrak; tanımlı değilse default"""
+        if not isinstance(self.features, dict):
+            return default
+        return self.features.get(name, default)
+
+
+def active_subscriptions(company_ref, now=None):
+    """Şirketin şu an geçerli aboneliklerini döndürür (en yeni başlangıç önce)"""
+    now = now or timezone.now()
+    return Subscription.objects.filter(
+        company=company_ref,
+        status='active',
+        start_date__lte=now,
+        end_date__gte=now,
+        is_active=True
+    ).order_by('-start_date')
+
+
+def invalidate_entitlement(company_id):
+    """Şirketin hak bilgisini commit'ten sonra geçersiz kılar"""
+    if company_id is not None:
+        bump_version_on_commit(COMPANY_NAMESPACE.format(company_id))
+
+
+def invalidate_entitlements():
+    """Tüm şirketlerin hak bilgisini geçersiz kılar (plan değişiklikleri)"""
+    bump_version_on_commit(PLAN_NAMESPACE)
+
+
+def compute_entitlement(company_id, now=None):
+    """
+    Şirketin bitmemiş aktif aboneliklerini planlarıyla tek sorguda okur.
+    Başlamış olanların en yenisi aktif abonelik, başlamamış olanların en
+    erkeni hak bilgisinin geçerlilik sınırıdır.
+    """
+    now = now or timezone.now()
+    subscriptions = Subscription.objects.select_related('plan').filter(
+        company_id=company_id,
+        status='active',
+        end_date__gte=now,
+        is_active=True
+    ).order_by('-start_date')
+
+    current, next_start = None, None
+    for subscription in subscriptions:
+        if subscription.start_date > now:
+            next_start = subscription.start_date
+        elif current is None:
+            current = subscription
+
+    if current is None:
+        return Entitlement(company_id=company_id, valid_until=next_start)
+
+    plan = current.plan
+    valid_until = current.end_date
+    if next_start is not None and next_start < valid_until:
+        valid_until = next_start
+    return Entitlement(
+        company_id=company_id,
+        subscription_id=current.id,
+        status=current.status,
+        plan_id=plan.id,
+        plan_name=plan.name,
+        plan_price=plan.price,
+        features=plan.features,
+        max_users=plan.max_users,
+        max_storage=plan.max_storage,
+        starts_at=current.start_date,
+        expires_at=current.end_date,
+        trial_ends=current.trial_ends,
+        valid_until=valid_until,
+    )
+
+
+def _entitlement_key(company_id):
+    versions = get_versions([COMPANY_NAMESPACE.format(company_id), PLAN_NAMESPACE])
+    digest = hashlib.md5(repr(versions).encode(), usedforsecurity=False).hexdigest()
+    return ENTITLEMENT_KEY.format(company_id, digest)
+
+
+def get_entitlement(company_id, now=None):
+    """
+    Şirketin hak bilgisi. Paylaşılan cache'ten okunur; abonelik veya plan
+    kaydedildiğinde sürüm yenilenir, süre dolduğunda yeniden hesaplanır.
+    Şirket verilmezse boş hak bilgisi döner.
+    """
+    if company_id is None:
+        return Entitlement(company_id=None)
+
+    now = now or timezone.now()
+    key = _entitlement_key(company_id)
+    entitlement = cache.get(key)
+    if entitlement is None or entitlement.is_stale(now):
+        entitlement = compute_entitlement(company_id, now)
+        timeout = ENTITLEMENT_TIMEOUT
+        if entitlement.valid_until is not None:
+            timeout = max(1, min(timeout, int((entitlement.valid_until - now).total_seconds())))
+        cache.set(key, entitlement, timeout)
+    return entitlement
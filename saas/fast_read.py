@@ -0,0 +1,273 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Callable
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.exceptions import FieldDoesNotExist
+from django.core.handlers.asgi import ASGIRequest
+from django.db import models
+from django.http import StreamingHttpResponse
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from .fieldsets import ALL_FIELDS
+from .models import Subscription
+from .pagination import KeysetPagination
+from .renderers import ORJSONRenderer
+from .serializers import SubscriptionSerializer
+
+# Metot/property kaynaklarının okuduğu sütunlar. Hızlı yolda bu kaynaklar model
+# yerine yalnızca bu sütunları taşıyan hafif bir nesneyle çağrılır.
+ATTRIBUTE_COLUMNS = {
+    (User, 'get_full_name'): ('first_name', 'last_name'),
+    (Subscription, 'is_trial'): ('status', 'trial_ends'),
+}
+
+# SerializerMethodField'ların okuduğu sütunlar: (serializer, metot adı) -> sütunlar
+METHOD_FIELD_COLUMNS = {
+    (SubscriptionSerializer, 'get_remaining_days'): ('end_date',),
+}
+
+# Akış (stream) yanıtlarında sunucu tarafı cursor'dan tek seferde okunan satır
+STREAM_CHUNK_SIZE = 2000
+
+
+class NotCompilable(Exception):
+    """Serializer values() satırlarından üretilemiyor; normal yola dönülür"""
+
+
+def _join(*parts):
+    return '__'.join(part for part in parts if part)
+
+
+def _identity(value):
+    return value
+
+
+def _cell(index, to_representation):
+    def get(row):
+        value = row[index]
+        return None if value is None else to_representation(value)
+    return get
+
+
+class RowCompiler:
+    """
+    Serializer'ı bir kez values_list() sütunlarına ve satırı sözlüğe çeviren
+    fonksiyona derler. Her hücre serializer'ın kendi alanının
+    to_representation'ından geçtiğinden çıktı ModelSerializer ile aynıdır;
+    satır başına model ve alan nesnesi oluşturulmaz.
+
+    Desteklenmeyen alanlar (çoğul ilişkiler, dosya alanları, sütunları
+    bilinmeyen metot/property'ler) NotCompilable fırlatır.
+    """
+
+    def __init__(self):
+        self.lookups = []
+        self.positions = {}
+
+    def column(self, lookup):
+        if lookup not in self.positions:
+            self.positions[lookup] = len(self.lookups)
+            self.lookups.append(lookup)
+        return self.positions[lookup]
+
+    def compile_serializer(self, serializer, model, path, presence=None):
+        getters = [
+            (name, self.compile_field(field, model, path))
+            for name, field in serializer.fields.items()
+            if not field.write_only
+        ]
+
+        def to_dict(row):
+            # İlişkili nesne yoksa iç içe serializer None döner
+            if presence is not None and row[presence] is None:
+                return None
+            return {name: get(row) for name, get in getters}
+        return to_dict
+
+    def compile_field(self, field, model, path):
+        if isinstance(field, (serializers.ListSerializer, serializers.ManyRelatedField)):
+            raise NotCompilable(field.field_name)
+        if field.source == '*':
+            if isinstance(field, serializers.BaseSerializer):
+                return self.compile_serializer(field, model, path)
+            if isinstance(field, serializers.SerializerMethodField):
+                return self.compile_method_field(field, path)
+            raise NotCompilable(field.field_name)
+
+        parts = field.source_attrs
+        for position, name in enumerate(parts):
+            last = position == len(parts) - 1
+            try:
+                model_field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                if not last:
+                    raise NotCompilable(field.field_name)
+                return self.compile_attribute(field, model, path, name)
+
+            if not model_field.concrete or model_field.many_to_many:
+                raise NotCompilable(field.field_name)
+            if isinstance(model_field, models.FileField):
+                raise NotCompilable(field.field_name)
+
+            lookup = _join(path, name)
+            if not model_field.is_relation:
+                if not last:
+                    raise NotCompilable(field.field_name)
+                return _cell(self.column(lookup), field.to_representation)
+
+            if last:
+                if isinstance(field, serializers.BaseSerializer):
+                    return self.compile_serializer(
+                        field, model_field.related_model, lookup, self.column(lookup)
+                    )
+                if isinstance(field, serializers.PrimaryKeyRelatedField):
+                    pk_field = field.pk_field
+                    return _cell(
+                        self.column(lookup),
+                        pk_field.to_representation if pk_field else _identity
+                    )
+                raise NotCompilable(field.field_name)
+            model, path = model_field.related_model, lookup
+
+    def compile_attribute(self, field, model, path, name):
+        if name.startswith('get_') and name.endswith('_display'):
+            try:
+                choice_field = model._meta.get_field(name[len('get_'):-len('_display')])
+            except FieldDoesNotExist:
+                raise NotCompilable(field.field_name)
+            choices = {value: str(label) for value, label in choice_field.flatchoices}
+            return _cell(
+                self.column(_join(path, choice_field.name)),
+                lambda value: field.to_representation(choices.get(value, value))
+            )
+
+        columns = ATTRIBUTE_COLUMNS.get((model, name))
+        if columns is None:
+            raise NotCompilable(field.field_name)
+        attribute = getattr(model, name)
+        function = attribute.fget if isinstance(attribute, property) else attribute
+        indexes = [(column, self.column(_join(path, column))) for column in columns]
+        presence = self.column(path) if path else None
+
+        def get(row):
+            if presence is not None and row[presence] is None:
+                return None
+            value = function(SimpleNamespace(**{column: row[index] for column, index in indexes}))
+            return None if value is None else field.to_representation(value)
+        return get
+
+    def compile_method_field(self, field, path):
+        columns = METHOD_FIELD_COLUMNS.get((type(field.parent), field.method_name))
+        if columns is None:
+            raise NotCompilable(field.field_name)
+        indexes = [(column, self.column(_join(path, column))) for column in columns]
+
+        def get(row):
+            return field.to_representation(
+                SimpleNamespace(**{column: row[index] for column, index in indexes})
+            )
+        return get
+
+
+@dataclass(frozen=True)
+class FastReader:
+    """Derlenmiş okuma yolu: values_list() sütunları ve satır fonksiyonu"""
+    lookups: tuple
+    to_dict: Callable
+
+    def values(self, queryset):
+        return queryset.prefetch_related(None).values_list(*self.lookups)
+
+    def rows(self, rows):
+        to_dict = self.to_dict
+        return [to_dict(row) for row in rows]
+
+
+@lru_cache(maxsize=1024)
+def compile_reader(serializer_class, model, selection=ALL_FIELDS):
+    """Serializer ve alan seçimi için okuma yolunu derler; derlenemiyorsa None"""
+    serializer = selection.apply(serializer_class())
+    compiler = RowCompiler()
+    try:
+        to_dict = compiler.compile_serializer(serializer, model, '')
+    except NotCompilable:
+        return None
+    return FastReader(lookups=tuple(compiler.lookups), to_dict=to_dict)
+
+
+class FastReadMixin:
+    """
+    Liste isteklerinde model nesneleri yerine values_list() satırlarını
+    derlenmiş serializer fonksiyonuyla sözlüğe çevirir. JSON çıktısı normal
+    yol ile aynıdır; serializer derlenemiyorsa veya keyset sayfalama
+    kullanılıyorsa normal list() çalışır. QueryPlanMixin ile birlikte kullanılır.
+    """
+
+    def get_fast_reader(self):
+        if isinstance(self.paginator, KeysetPagination):
+            return None
+        return compile_reader(
+            self.get_serializer_class(), self.queryset.model, self.get_field_selection()
+        )
+
+    def list(self, request, *args, **kwargs):
+        reader = self.get_fast_reader()
+        if reader is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = reader.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(reader.rows(page))
+        return Response(reader.rows(queryset))
+
+
+async def iterate_in_thread(iterator):
+    """
+    Senkron üreteci async üreteç olarak sunar. Her parça sync_to_async ile
+    istek thread'inde üretilir; böylece veritabanı cursor'ı parçalar arasında
+    aynı bağlantıda kalır.
+    """
+    next_chunk = sync_to_async(next)
+    done = object()
+    while (chunk := await next_chunk(iterator, done)) is not done:
+        yield chunk
+
+
+class StreamingListMixin(FastReadMixin):
+    """
+    Sayfalanmayan listeleri bellekte bütün gövdeyi kurmadan döndürür.
+    Satırlar iterator() ile (PostgreSQL'de sunucu tarafı cursor) parça parça
+    okunur ve ORJSONRenderer.render_stream ile yazılır. JSON dışı bir
+    renderer (ör. browsable API) seçildiğinde normal list() çalışır.
+
+    Django ASGI altında senkron akışları sync_to_async(list) ile tek seferde
+    tükettiğinden gövde bellekte kurulurdu; ASGI isteklerinde akış async
+    üretece çevrilir ve parçalar okundukça gönderilir. WSGI'de senkron kalır.
+    """
+    stream_chunk_size = STREAM_CHUNK_SIZE
+
+    def list(self, request, *args, **kwargs):
+        renderer = getattr(request, 'accepted_renderer', None)
+        if (
+            self.paginator is not None
+            or not isinstance(renderer, ORJSONRenderer)
+            or not renderer.can_stream(request.accepted_media_type, self.get_renderer_context())
+        ):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        reader = self.get_fast_reader()
+        if reader is not None:
+            rows = map(reader.to_dict, reader.values(queryset).iterator(chunk_size=self.stream_chunk_size))
+        else:
+            serializer = self.get_serializer()
+            rows = map(serializer.to_representation, queryset.iterator(chunk_size=self.stream_chunk_size))
+        content = renderer.render_stream(rows)
+        if isinstance(request._request, ASGIRequest):
+            content = iterate_in_thread(content)
+        return StreamingHttpResponse(content, content_type=renderer.media_type)
@@ -0,0 +1,113 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from rest_framework import serializers
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+# Sorgu planları seçim başına saklandığından istek başına yol sayısı sınırlanır
+MAX_SELECTION_PATHS = 64
+
+
+def _parse_paths(value):
+    """'id,subscription_details.plan_details' -> {('id',), ('subscription_details', 'plan_details')}"""
+    paths = set()
+    for item in value.split(','):
+        path = tuple(part.strip() for part in item.split('.') if part.strip())
+        if path:
+            paths.add(path)
+        if len(paths) >= MAX_SELECTION_PATHS:
+            break
+    return frozenset(paths)
+
+
+def _build_tree(paths, leaf):
+    """
+    Yolları iç içe sözlüğe çevirir. leaf=None alanın tamamını, leaf={} yalnızca
+    alanın kendisini ifade eder; kısa yol uzun yolu kapsar.
+    """
+    tree = {}
+    for path in sorted(paths, key=len):
+        node = tree
+        for name in path[:-1]:
+            node = node.setdefault(name, {})
+            if node is None:
+                break
+        else:
+            node.setdefault(path[-1], None if leaf is None else {})
+    return tree
+
+
+def _is_nested(field):
+    return isinstance(getattr(field, 'child', field), serializers.BaseSerializer)
+
+
+def prune_serializer(serializer, fields=None, expand=None):
+    """
+    Serializer alanlarını yerinde budar.
+
+    fields: tutulacak alan ağacı (None: tümü). expand: gömülecek iç içe
+    serializer ağacı (None: tümü). Genişletilmeyen iç içe serializer'lar
+    (ör. subscription_details) atılır; ilişkinin kimliği yanındaki alanda
+    (ör. subscription) zaten döner. fields ile açıkça istenen iç içe alan
+    genişletilmiş sayılır.
+    """
+    serializer = getattr(serializer, 'child', serializer)
+    for name in list(serializer.fields):
+        field = serializer.fields[name]
+        requested = fields is not None and name in fields
+        if fields is not None and not requested:
+            serializer.fields.pop(name)
+            continue
+        if not _is_nested(field):
+            continue
+        if expand is not None and name not in expand and not requested:
+            serializer.fields.pop(name)
+            continue
+
+        sub_fields = fields[name] if requested else None
+        sub_expand = None if expand is None else (expand.get(name) or {})
+        if sub_fields is not None or sub_expand is not None:
+            prune_serializer(field, sub_fields, sub_expand)
+
+
+@dataclass(frozen=True)
+class FieldSelection:
+    """
+    ?fields= ve ?expand= ile istenen alanlar.
+
+    * ?fields=id,user_full_name yalnızca bu alanları döndürür; nokta ile iç içe
+      alan seçilebilir (subscription_details.remaining_days).
+    * ?expand= verildiğinde iç içe serializer'lar yalnızca listelenirse gömülür
+      (?expand=subscription_details.plan_details); boş değer hepsini kapatır.
+    * Parametre verilmezse tüm alanlar ve iç içe serializer'lar döner.
+    """
+    fields: Optional[frozenset] = None
+    expand: Optional[frozenset] = None
+
+    @classmethod
+    def from_request(cls, request):
+        params = getattr(request, 'query_params', request.GET)
+        fields = params.get(FIELDS_PARAM)
+        expand = params.get(EXPAND_PARAM)
+        return cls(
+            fields=_parse_paths(fields) if fields else None,
+            expand=_parse_paths(expand) if expand is not None else None,
+        )
+
+    @property
+    def is_default(self):
+        return self.fields is None and self.expand is None
+
+    def apply(self, serializer):
+        """Seçimi serializer'a uygular ve serializer'ı döndürür"""
+        if not self.is_default:
+            prune_serializer(
+                serializer,
+                None if self.fields is None else _build_tree(self.fields, leaf=None),
+                None if self.expand is None else _build_tree(self.expand, leaf={}),
+            )
+        return serializer
+
+
+ALL_FIELDS = FieldSelection()
@@ -0,0 +1,315 @@
+import csv
+import io
+import os
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, transaction
+from rest_framework.exceptions import ValidationError
+
+from .models import AuditLog, Branch, Employee, Neighborhood, tr_fold
+from .response_cache import invalidate_responses
+from .serializers import EmployeeImportRowSerializer
+from .slugs import allocate_slugs
+from .statistics import adjust_statistics
+
+try:
+    import openpyxl
+except ImportError:  # XLSX desteği opsiyoneldir
+    openpyxl = None
+
+# Tek seferde doğrulanıp kaydedilen satır sayısı
+IMPORT_CHUNK_SIZE = 500
+
+# Dosya başlıkları için Türkçe karşılıklar (küçük harfe ve ASCII'ye çevrilmiş halleri)
+HEADER_ALIASES = {
+    'kullanici_adi': 'username',
+    'ad': 'first_name',
+    'adi': 'first_name',
+    'soyad': 'last_name',
+    'soyadi': 'last_name',
+    'e_posta': 'email',
+    'eposta': 'email',
+    'tc_kimlik_no': 'identity_number',
+    'tc': 'identity_number',
+    'dogum_tarihi': 'birth_date',
+    'cinsiyet': 'gender',
+    'telefon': 'phone',
+    'adres': 'address',
+    'mahalle': 'neighborhood',
+    'ise_baslama_tarihi': 'hire_date',
+    'rol': 'role',
+    'sube': 'branch',
+}
+
+
+class ImportFileError(Exception):
+    """İçe aktarılacak dosya okunamadığında fırlatılır"""
+
+
+@dataclass
+class ImportResult:
+    total: int = 0
+    created: int = 0
+    errors: list = field(default_factory=list)
+    dry_run: bool = False
+
+    @property
+    def failed(self):
+        return len(self.errors)
+
+    def add_error(self, row_number, errors):
+        self.errors.append({'row': row_number, 'errors': errors})
+
+    def as_dict(self):
+        return {
+            'total': self.total,
+            'created': self.created,
+            'failed': self.failed,
+            'dry_run': self.dry_run,
+            'errors': self.errors,
+        }
+
+
+def normalize_header(name):
+    key = tr_fold(str(name or '').strip()).lower().replace(' ', '_').replace('-', '_')
+    return HEADER_ALIASES.get(key, key)
+
+
+def _cell(value):
+    """Excel hücresini CSV ile aynı biçime (metin) getirir"""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        # TC kimlik no gibi sayılar Excel'de float olarak gelir
+        return str(int(value))
+    return str(value).strip()
+
+
+def iter_csv_rows(fileobj):
+    """CSV dosyasını satır satır okur; ayraç (, veya ;) otomatik bulunur"""
+    stream = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    sample = stream.read(4096)
+    stream.seek(0)
+    options = {}
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+    except csv.Error:
+        # Satırların alan sayısı tutarsızsa Sniffer karar veremez; ayraç başlıktan seçilir
+        dialect = csv.excel
+        options['delimiter'] = max(',;\t', key=sample.partition('\n')[0].count)
+    reader = csv.reader(stream, dialect, **options)
+    headers = [normalize_header(name) for name in next(reader, [])]
+    for values in reader:
+        if any(value.strip() for value in values):
+            yield dict(zip(headers, (value.strip() for value in values)))
+        else:
+            yield None
+    stream.detach()
+
+
+def iter_xlsx_rows(fileobj):
+    """XLSX dosyasının ilk sayfasını salt okunur modda satır satır okur"""
+    if openpyxl is None:
+        raise ImportFileError('XLSX desteği için openpyxl paketi kurulmalıdır.')
+    workbook = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = [normalize_header(name) for name in next(rows, [])]
+        for values in rows:
+            values = [_cell(value) for value in values]
+            yield dict(zip(headers, values)) if any(values) else None
+    finally:
+        workbook.close()
+
+
+def iter_import_rows(fileobj, filename):
+    """Dosya uzantısına göre uygun okuyucuyu seçer"""
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension == '.csv':
+        return iter_csv_rows(fileobj)
+    if extension in ('.xlsx', '.xlsm'):
+        return iter_xlsx_rows(fileobj)
+    raise ImportFileError('Desteklenmeyen dosya türü. CSV veya XLSX yükleyin.')
+
+
+class EmployeeImporter:
+    """
+    Çalışanları dosyadan parça parça içe aktarır.
+
+    Her parça önce satır satır (sorgusuz) doğrulanır, ardından kullanıcı adı,
+    TC kimlik no, şube ve mahalle kontrolleri parça başına birkaç sorguda yapılır.
+    Geçerli satırlar User ve Employee tablolarına bulk_create ile yazılır;
+    parola özeti tüm dosya için bir kez hesaplanır. Hatalı satırlar satır
+    numarasıyla raporlanır, diğer satırların kaydını engellemez.
+    """
+
+    def __init__(self, branch, user=None, default_password=None, dry_run=False,
+                 chunk_size=IMPORT_CHUNK_SIZE):
+        self.branch = branch
+        self.company = branch.company
+        self.user = user
+        self.dry_run = dry_run
+        self.chunk_size = chunk_size
+        # Varsayılan parola yoksa kullanıcılar parola sıfırlama ile giriş yapar
+        self.password = make_password(default_password) if default_password else make_password(None)
+        # İlişkili yönetici üzerinden okunan şubelerde branch.company sorgusuz gelir
+        self.branches = {
+            branch.id: branch
+            for branch in self.company.branches.all()
+        }
+        self.seen_usernames = set()
+        self.seen_identity_numbers = set()
+        self.result = ImportResult(dry_run=dry_run)
+        # Alanlar bir kez kurulur, her satır aynı serializer ile doğrulanır
+        self.row_serializer = EmployeeImportRowSerializer()
+
+    def run(self, rows):
+        # Satır numaraları başlık satırından sonra 2'den başlar
+        numbered = enumerate(rows, start=2)
+        while True:
+            chunk = list(islice(numbered, self.chunk_size))
+            if not chunk:
+                break
+            self.import_chunk(chunk)
+
+        if self.result.created and not self.dry_run:
+            self.write_audit_log()
+        return self.result
+
+    def validate_chunk(self, chunk):
+        """Satırları doğrular; geçerli olanları (satır no, veri) olarak döndürür"""
+        valid = []
+        for row_number, row in chunk:
+            if row is None:
+                continue
+            self.result.total += 1
+            try:
+                valid.append((row_number, self.row_serializer.run_validation(row)))
+            except ValidationError as e:
+                self.result.add_error(row_number, e.detail)
+        if not valid:
+            return valid
+
+        usernames = {data['username'] for _, data in valid}
+        identity_numbers = {data['identity_number'] for _, data in valid}
+        neighborhood_ids = {data['neighborhood'] for _, data in valid if data.get('neighborhood')}
+        taken_usernames = set(
+            User.objects.filter(username__in=usernames).values_list('username', flat=True)
+        )
+        taken_identity_numbers = set(
+            Employee.objects.filter(identity_number__in=identity_numbers)
+            .values_list('identity_number', flat=True)
+        )
+        existing_neighborhoods = set(
+            Neighborhood.objects.filter(id__in=neighborhood_ids).values_list('id', flat=True)
+        )
+
+        checked = []
+        for row_number, data in valid:
+            errors = {}
+            if data['username'] in taken_usernames or data['username'] in self.seen_usernames:
+                errors['username'] = ['Bu kullanıcı adı zaten kullanılıyor.']
+            if (data['identity_number'] in taken_identity_numbers
+                    or data['identity_number'] in self.seen_identity_numbers):
+                errors['identity_number'] = ['Bu TC Kimlik No ile kayıtlı bir çalışan zaten var.']
+            if data.get('branch') and data['branch'] not in self.branches:
+                errors['branch'] = ['Şube bu şirkete ait değil.']
+            if data.get('neighborhood') and data['neighborhood'] not in existing_neighborhoods:
+                errors['neighborhood'] = ['Geçersiz mahalle.']
+
+            if errors:
+                self.result.add_error(row_number, errors)
+                continue
+            self.seen_usernames.add(data['username'])
+            self.seen_identity_numbers.add(data['identity_number'])
+            checked.append((row_number, data))
+        return checked
+
+    def import_chunk(self, chunk):
+        valid = self.validate_chunk(chunk)
+        if not valid or self.dry_run:
+            self.result.created += len(valid)
+            return
+
+        users = [
+            User(
+                username=data['username'],
+                first_name=data['first_name'],
+                last_name=data['last_name'],
+                email=data.get('email', ''),
+                password=self.password,
+            )
+            for _, data in valid
+        ]
+        employees = [
+            Employee(
+                user=user,
+                branch=self.branches.get(data.get('branch'), self.branch),
+                identity_number=data['identity_number'],
+                birth_date=data['birth_date'],
+                gender=data['gender'],
+                phone=data['phone'],
+                address=data['address'],
+                neighborhood_id=data.get('neighborhood'),
+                hire_date=data['hire_date'],
+                role=data['role'],
+            )
+            for user, (_, data) in zip(users, valid)
+        ]
+        # bulk_create save() çağırmadığından etiket burada üretilir
+        for employee in employees:
+            employee.display_name = employee.build_display_name()
+
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+                allocate_slugs(employees)
+                Employee.objects.bulk_create(employees)
+                # bulk_create sinyal göndermediğinden sayaçlar burada artırılır
+                adjust_statistics(
+                    self.company.id,
+                    total_employees=len(employees),
+                    active_employees=len(employees)
+                )
+                invalidate_responses(Employee, self.company.id)
+        except IntegrityError as e:
+            # Eşzamanlı bir kayıt çakıştıysa parçadaki satırlar hatalı sayılır
+            for row_number, _ in valid:
+                self.result.add_error(row_number, {'non_field_errors': [str(e)]})
+            return
+
+        self.result.created += len(employees)
+
+    def write_audit_log(self):
+        """İçe aktarım için tek bir özet audit log kaydı yazar"""
+        AuditLog.objects.create(
+            user=self.user,
+            company=self.company,
+            action='create',
+            content_type=ContentType.objects.get_for_model(Branch),
+            object_id=self.branch.id,
+            object_repr=f"Toplu çalışan içe aktarımı: {self.branch}",
+            changes={
+                'imported': self.result.created,
+                'failed': self.result.failed,
+                'total': self.result.total,
+                'branch': self.branch.id,
+            }
+        )
+
+
+def import_employees(fileobj, filename, branch, user=None, default_password=None, dry_run=False):
+    """Dosyadaki çalışanları verilen şubeye (veya satırdaki şubeye) aktarır"""
+    importer = EmployeeImporter(
+        branch, user=user, default_password=default_password, dry_run=dry_run
+    )
+    return importer.run(iter_import_rows(fileobj, filename))
@@ -0,0 +1,96 @@
+from django.contrib.auth.models import User
+from django.db.models import CharField, F, OuterRef, Subquery, Value
+from django.db.models.functions import Concat, Trim
+from django.utils import timezone
+
+from .models import Branch, City, District, Employee, Invoice, Neighborhood, Subscription
+from .response_cache import invalidate_responses
+
+# Saklanan etiketler modelin build_* metotlarıyla aynı biçimde SQL'de üretilir;
+# böylece üst kaydın adı değiştiğinde bağlı satırlar tek UPDATE ile yenilenir.
+
+
+def _value_of(model, outer_field, field):
+    return Subquery(model.objects.filter(pk=OuterRef(outer_field)).values(field)[:1])
+
+
+def district_label():
+    return Concat(
+        _value_of(City, 'city_id', 'name'), Value(' - '), F('name'),
+        output_field=CharField()
+    )
+
+
+def neighborhood_label():
+    return Concat(
+        _value_of(District, 'district_id', 'full_name'), Value(' - '), F('name'),
+        output_field=CharField()
+    )
+
+
+def employee_label():
+    full_name = Trim(Concat(
+        _value_of(User, 'user_id', 'first_name'), Value(' '),
+        _value_of(User, 'user_id', 'last_name'),
+        output_field=CharField()
+    ))
+    return Concat(
+        full_name, Value(' - '),
+        _value_of(Branch, 'branch_id', 'name'), Value('/'),
+        _value_of(Branch, 'branch_id', 'company__name'),
+        output_field=CharField()
+    )
+
+
+def invoice_label():
+    return Concat(
+        F('number'), Value(' - '),
+        _value_of(Subscription, 'subscription_id', 'company__name'),
+        output_field=CharField()
+    )
+
+
+def _sync(queryset, field, expression):
+    """
+    Etiketi güncel olmayan satırları tek UPDATE ile yeniler; güncellenen sayıyı döndürür.
+    updated_at de yenilenir; koşullu GET parmak izleri değişikliği görür.
+    """
+    updated = (
+        queryset.alias(expected_label=expression)
+        .exclude(**{field: F('expected_label')})
+        .update(**{field: expression}, updated_at=timezone.now())
+    )
+    if updated:
+        # update() sinyal göndermez; modelin önbellekteki yanıtları elle geçersiz kılınır
+        invalidate_responses(queryset.model)
+    return updated
+
+
+def sync_location_labels(city_id=None, district_id=None):
+    """
+    İlçe ve mahalle etiketlerini yeniler (toplu yüklemeler ve ad değişiklikleri için).
+    Filtre verilmezse tüm tablo kontrol edilir; yalnızca değişen satırlar yazılır.
+    """
+    districts = District.objects.all()
+    neighborhoods = Neighborhood.objects.all()
+    if city_id is not None:
+        districts = districts.filter(city_id=city_id)
+        neighborhoods = neighborhoods.filter(district__city_id=city_id)
+    if district_id is not None:
+        districts = districts.filter(pk=district_id)
+        neighborhoods = neighborhoods.filter(district_id=district_id)
+    # Mahalle etiketi ilçe etiketinden üretildiğinden önce ilçeler yenilenir
+    return (
+        _sync(districts, 'full_name', district_label())
+        + _sync(neighborhoods, 'full_name', neighborhood_label())
+    )
+
+
+def sync_employee_labels(**filters):
+    """Kullanıcı, şube veya şirket adı değişen çalışanların etiketlerini yeniler"""
+    return _sync(Employee.objects.filter(**filters), 'display_name', employee_label())
+
+
+def sync_invoice_labels(**filters):
+    """Şirket adı değişen faturaların etiketlerini yeniler"""
+    return _sync(Invoice.objects.filter(**filters), 'display_name', invoice_label())
@@ -0,0 +1,197 @@
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import requests
+
+DEFAULT_SOURCE_URL = "https://raw.githubusercontent.com/metinyildirimnet/turkiye-adresler-json/main"
+
+CITY_FILE = 'sehirler.json'
+DISTRICT_FILE = 'ilceler.json'
+NEIGHBORHOOD_FILES = tuple(f'mahalleler-{i}.json' for i in range(1, 5))
+LOCATION_FILES = (CITY_FILE, DISTRICT_FILE) + NEIGHBORHOOD_FILES
+
+READ_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_TIMEOUT = 60
+
+# Bir dizi elemanından sonra gelebilecek karakterler
+VALUE_TERMINATORS = ' \t\r\n,]'
+
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+
+def iter_json_array(stream, chunk_size=READ_CHUNK_SIZE):
+    """
+    Üst seviyesi dizi olan bir JSON metnini elemanları tek tek okuyarak döndürür.
+    Dosyanın tamamı belleğe alınmaz; tampon yalnızca işlenmemiş kısmı tutar.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    started = False
+    eof = False
+
+    while True:
+        # Boşlukları ve eleman ayraçlarını atla
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            buffer, pos = stream.read(chunk_size), 0
+            eof = not buffer
+
+        if pos >= len(buffer):
+            raise ValueError('JSON dizisi beklenmedik şekilde bitti')
+
+        char = buffer[pos]
+        if not started:
+            if char != '[':
+                raise ValueError('JSON dosyası bir dizi ile başlamalı')
+            started = True
+            pos += 1
+            continue
+        if char == ']':
+            return
+        if char == ',':
+            pos += 1
+            continue
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            item, end = None, len(buffer)
+
+        # Değerden sonra ayraç görülmeden eleman tamamlanmış sayılmaz;
+        # tampon sonunda bölünmüş bir sayı ("12" + "34") yanlış okunabilir
+        if not eof and (end >= len(buffer) or buffer[end] not in VALUE_TERMINATORS):
+            chunk = stream.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+        yield item
+        pos = end
+
+
+class DirectorySource:
+    """Dosyaları yerel bir dizinden okur"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def open(self, name):
+        return open(os.path.join(self.path, name), encoding='utf-8-sig')
+
+    def close(self):
+        pass
+
+
+class ZipSource:
+    """Dosyaları bir zip arşivinden okur; arşiv içindeki alt dizinler önemsizdir"""
+
+    def __init__(self, path):
+        self.archive = zipfile.ZipFile(path)
+        self.members = {
+            os.path.basename(name): name
+            for name in self.archive.namelist()
+            if not name.endswith('/')
+        }
+
+    def open(self, name):
+        if name not in self.members:
+            raise FileNotFoundError(f'{name} arşivde bulunamadı')
+        return io.TextIOWrapper(self.archive.open(self.members[name]), encoding='utf-8-sig')
+
+    def close(self):
+        self.archive.close()
+
+
+class TarSource:
+    """Dosyaları (sıkıştırılmış) bir tar arşivinden okur"""
+
+    def __init__(self, path):
+        self.archive = tarfile.open(path)
+        self.members = {
+            os.path.basename(member.name): member
+            for member in self.archive.getmembers()
+            if member.isfile()
+        }
+
+    def open(self, name):
+        if name not in self.members:
+            raise FileNotFoundError(f'{name} arşivde bulunamadı')
+        return io.TextIOWrapper(self.archive.extractfile(self.members[name]), encoding='utf-8-sig')
+
+    def close(self):
+        self.archive.close()
+
+
+def download_file(url, path, timeout=DOWNLOAD_TIMEOUT):
+    """Dosyayı belleğe almadan parça parça diske indirir"""
+    with requests.get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        with open(path, 'wb') as fp:
+            for chunk in response.iter_content(READ_CHUNK_SIZE):
+                fp.write(chunk)
+    return path
+
+
+def download_location_files(base_url, directory, names=LOCATION_FILES):
+    """Konum dosyalarını paralel olarak indirir"""
+    base_url = base_url.rstrip('/')
+    with ThreadPoolExecutor(max_workers=len(names)) as executor:
+        futures = [
+            executor.submit(download_file, f"{base_url}/{name}", os.path.join(directory, name))
+            for name in names
+        ]
+        return [future.result() for future in futures]
+
+
+@contextmanager
+def open_location_source(source=DEFAULT_SOURCE_URL):
+    """
+    Kaynağa göre uygun okuyucuyu döndürür.
+
+    - http(s) adresi: dosyalar geçici bir dizine paralel indirilir
+    - Dizin: dosyalar doğrudan okunur
+    - .zip / .tar(.gz|.bz2|.xz) arşivi: dosyalar açılmadan arşivden okunur
+    """
+    temp_dir = None
+    if source.startswith(('http://', 'https://')):
+        temp_dir = tempfile.mkdtemp(prefix='locations-')
+        try:
+            download_location_files(source, temp_dir)
+        except Exception:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+        reader = DirectorySource(temp_dir)
+    elif os.path.isdir(source):
+        reader = DirectorySource(source)
+    elif source.endswith('.zip'):
+        reader = ZipSource(source)
+    elif source.endswith(TAR_SUFFIXES):
+        reader = TarSource(source)
+    else:
+        raise ValueError(f'Desteklenmeyen konum kaynağı: {source}')
+
+    try:
+        yield reader
+    finally:
+        reader.close()
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def iter_location_file(reader, name):
+    """Kaynaktaki bir JSON dosyasının kayıtlarını akış halinde döndürür"""
+    with reader.open(name) as stream:
+        yield from iter_json_array(stream)
@@ -0,0 +1,93 @@
+import gzip
+import hashlib
+import json
+
+from .caching import VersionedValue, bump_version_on_commit
+from .models import City, District, Neighborhood
+
+LOCATIONS_NAMESPACE = 'locations'
+
+# Ağaçtaki dizilerin alan sırası (istemciler bu başlığa göre okur)
+TREE_FIELDS = {
+    'city': ['id', 'code', 'name', 'districts'],
+    'district': ['id', 'name', 'neighborhoods'],
+    'neighborhood': ['id', 'name', 'postal_code'],
+}
+
+
+def load_location_rows():
+    """
+    Aktif il, ilçe ve mahalleleri model örneği oluşturmadan, üç sorguda okur.
+    Dönen listeler isme göre sıralıdır.
+    """
+    cities = list(
+        City.objects.filter(is_active=True)
+        .order_by('name')
+        .values_list('id', 'code', 'name')
+    )
+    districts = list(
+        District.objects.filter(is_active=True)
+        .order_by('name')
+        .values_list('id', 'city_id', 'name')
+    )
+    neighborhoods = list(
+        Neighborhood.objects.filter(is_active=True)
+        .order_by('name')
+        .values_list('id', 'district_id', 'name', 'postal_code')
+    )
+    return cities, districts, neighborhoods
+
+
+class LocationTree:
+    """
+    İl → İlçe → Mahalle ağacının bellekte tutulan, önceden kodlanmış hali.
+    JSON ve gzip gövdeleri bir kez üretilir, her istekte yalnızca gönderilir.
+    """
+    __slots__ = ('payload', 'gzip_payload', 'etag', 'counts')
+
+    def __init__(self, cities, districts, neighborhoods):
+        neighborhoods_by_district = {}
+        for neighborhood_id, district_id, name, postal_code in neighborhoods:
+            neighborhoods_by_district.setdefault(district_id, []).append(
+                [neighborhood_id, name, postal_code]
+            )
+
+        districts_by_city = {}
+        for district_id, city_id, name in districts:
+            districts_by_city.setdefault(city_id, []).append(
+                [district_id, name, neighborhoods_by_district.get(district_id, [])]
+            )
+
+        tree = {
+            'fields': TREE_FIELDS,
+            'cities': [
+                [city_id, code, name, districts_by_city.get(city_id, [])]
+                for city_id, code, name in cities
+            ],
+        }
+
+        self.payload = json.dumps(tree, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.gzip_payload = gzip.compress(self.payload, mtime=0)
+        self.etag = '"%s"' % hashlib.blake2b(self.payload, digest_size=16).hexdigest()
+        self.counts = {
+            'cities': len(cities),
+            'districts': len(districts),
+            'neighborhoods': len(neighborhoods),
+        }
+
+
+def build_location_tree():
+    return LocationTree(*load_location_rows())
+
+
+_location_tree = VersionedValue(LOCATIONS_NAMESPACE, build_location_tree)
+
+
+def get_location_tree():
+    """Süreç içindeki güncel konum ağacını döndürür, gerekirse yeniden kurar"""
+    return _location_tree.get()
+
+
+def invalidate_location_tree():
+    """Konum verisi değiştiğinde tüm süreçlerdeki ağaçları geçersiz kılar"""
+    bump_version_on_commit(LOCATIONS_NAMESPACE)
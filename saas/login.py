@@ -0,0 +1,214 @@
+import hashlib
+import logging
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone, translation
+
+from .caching import bump_version_on_commit, get_versions
+from .models import Employee, Subscription
+from .serializers import BranchDetailSerializer, CompanyDetailSerializer
+
+logger = logging.getLogger(__name__)
+
+PROFILE_KEY = 'saas:login:{}:{}'
+PROFILE_TIMEOUT = 3600
+
+# Çalışan girişinin önbellekler boşken yaptığı sorgu sayısı: kullanıcı, bakım
+# (süreç içinde tutulur, yalnızca ilk istekte), bağlam, hak bilgisi, gruplar,
+# izinler ve çalışan profili. Profil önbellekteyse kullanıcı ve bağlam yeterlidir.
+# Parola hash'i yükseltilirken yapılan UPDATE bütçeye dahil değildir; o istekte
+# uyarı loglanır.
+LOGIN_QUERY_BUDGET = 7
+
+# Sürüm ad alanları: kullanıcıya, şirkete ve herkese ait değişiklikler
+USER_NAMESPACE = 'login:user:{}'
+COMPANY_NAMESPACE = 'login:company:{}'
+SHARED_NAMESPACE = 'login:shared'
+
+
+@contextmanager
+def query_budget(limit, label):
+    """
+    Blok içindeki sorguları sayar. Bütçe aşılırsa isteği bozmadan uyarı
+    loglar; bütçe testlerde assertNumQueries ile doğrulanır.
+    """
+    executed = []
+
+    def count(execute, sql, params, many, context):
+        executed.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count):
+        yield executed
+
+    if len(executed) > limit:
+        logger.warning(f'{label}: {len(executed)} sorgu (bütçe {limit})')
+
+
+def invalidate_user_profile(user_id):
+    """Kullanıcının (ve çalışan kaydının) giriş profilini geçersiz kılar"""
+    if user_id is not None:
+        bump_version_on_commit(USER_NAMESPACE.format(user_id))
+
+
+def invalidate_company_profiles(company_id):
+    """Şirketin tüm kullanıcılarının giriş profilini geçersiz kılar"""
+    if company_id is not None:
+        bump_version_on_commit(COMPANY_NAMESPACE.format(company_id))
+
+
+def invalidate_profiles():
+    """Tüm giriş profillerini geçersiz kılar (plan, grup, konum değişiklikleri)"""
+    bump_version_on_commit(SHARED_NAMESPACE)
+
+
+def _profile_key(user, tenant):
+    namespaces = [USER_NAMESPACE.format(user.pk), SHARED_NAMESPACE]
+    if tenant.company_id is not None:
+        namespaces.append(COMPANY_NAMESPACE.format(tenant.company_id))
+    parts = (
+        tenant.company_id, tenant.subscription_id,
+        translation.get_language(), get_versions(namespaces),
+    )
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return PROFILE_KEY.format(user.pk, digest)
+
+
+def _employee_profile(employee):
+    return {
+        'id': employee.id,
+        'role': {
+            'code': employee.role,
+            'display': employee.get_role_display(),
+        },
+        'identity_number': employee.identity_number[-4:] + '****',
+        'personal': {
+            'birth_date': employee.birth_date,
+            'gender': {
+                'code': employee.gender,
+                'display': employee.get_gender_display(),
+            },
+            'phone': employee.phone,
+        },
+        'employment': {
+            'hire_date': employee.hire_date,
+            'termination_date': employee.termination_date,
+            'is_active': employee.is_active,
+        },
+        'location': {
+            'address': employee.address,
+            'neighborhood': {
+                'id': employee.neighborhood.id if employee.neighborhood else None,
+                'name': employee.neighborhood.full_name if employee.neighborhood else None,
+            }
+        }
+    }
+
+
+def _subscription_profile(entitlement):
+    return {
+        'id': entitlement.subscription_id,
+        'plan': {
+            'id': entitlement.plan_id,
+            'name': entitlement.plan_name,
+            'features': entitlement.features,
+            'price': str(entitlement.plan_price),
+            'max_users': entitlement.max_users,
+            'max_storage': entitlement.max_storage,
+        },
+        'status': {
+            'code': entitlement.status,
+            'display': entitlement.status_display,
+        },
+        'dates': {
+            'start': entitlement.starts_at,
+            'end': entitlement.expires_at,
+            'trial_ends': entitlement.trial_ends,
+        },
+    }
+
+
+def _branding_profile(branding):
+    return {
+        'primary_color': branding.primary_color,
+        'secondary_color': branding.secondary_color,
+        'logo_url': branding.logo.url if branding.logo else None,
+        'favicon_url': branding.favicon.url if branding.favicon else None,
+    }
+
+
+def build_profile(user, tenant):
+    """
+    Giriş yanıtının token ve zamana bağlı alanlar dışındaki kısmı.
+    Çalışan, mahalle ve görünüm ayarları tek sorguda; gruplar ve izinler
+    birer sorguda okunur. Abonelik ve plan şirketin hak bilgisinden gelir.
+    """
+    profile = {
+        'id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'personal': {
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+            'full_name': user.get_full_name(),
+            'date_joined': user.date_joined,
+        },
+        'permissions': {
+            'is_active': user.is_active,
+            'is_staff': user.is_staff,
+            'is_superuser': user.is_superuser,
+            'groups': list(user.groups.values('id', 'name')),
+            'user_permissions': list(user.user_permissions.values('id', 'name')),
+        }
+    }
+    if not tenant.has_employee:
+        return profile
+
+    employee = (
+        Employee.objects.select_related('neighborhood', 'branch__company__branding')
+        .get(pk=tenant.employee_id)
+    )
+    branch = employee.branch
+    company = branch.company
+    profile.update({
+        'employee': _employee_profile(employee),
+        'branch': BranchDetailSerializer(branch).data,
+        'company': CompanyDetailSerializer(company).data,
+    })
+
+    if tenant.has_active_subscription:
+        profile['company']['subscription'] = _subscription_profile(tenant.entitlement)
+    if hasattr(company, 'branding'):
+        profile['company']['branding'] = _branding_profile(company.branding)
+    return profile
+
+
+def get_profile(user, tenant):
+    """
+    Kullanıcının giriş profili. Kullanıcı, şirket ve ortak sürümlerle
+    anahtarlanarak paylaşılan cache'te tutulur; zamana bağlı alanlar
+    (son giriş, kıdem, kalan gün, deneme durumu) her istekte eklenir.
+    """
+    key = _profile_key(user, tenant)
+    profile = cache.get(key)
+    if profile is None:
+        profile = build_profile(user, tenant)
+        cache.set(key, profile, PROFILE_TIMEOUT)
+
+    now = timezone.now()
+    profile['personal']['last_login'] = user.last_login
+    if 'employee' in profile:
+        employment = profile['employee']['employment']
+        employment['tenure'] = (now.date() - employment['hire_date']).days
+
+        subscription = profile['company'].get('subscription')
+        if subscription:
+            dates = subscription['dates']
+            subscription['is_trial'] = Subscription.is_trial.fget(SimpleNamespace(
+                status=subscription['status']['code'], trial_ends=dates['trial_ends']
+            ))
+            subscription['remaining_days'] = (dates['end'] - now).days
+    return profile
@@ -0,0 +1,120 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from django.utils import timezone
+
+from .caching import VersionedValue, bump_version_on_commit
+from .models import MaintenanceMode
+
+MAINTENANCE_NAMESPACE = 'maintenance'
+
+# İsteğin geldiği platform bu başlıkla bildirilir (web, mobile); yoksa api sayılır
+PLATFORM_HEADER = 'HTTP_X_CLIENT_PLATFORM'
+DEFAULT_PLATFORM = 'api'
+PLATFORMS = frozenset(value for value, _ in MaintenanceMode.PLATFORM_CHOICES if value != 'all')
+
+
+@dataclass(frozen=True)
+class MaintenanceWindow:
+    """
+    Süren bir bakımın erişim kararı için gereken alanları. İzinli şirketler
+    önceden kümeye çevrildiğinden karar veritabanına gitmeden verilir.
+    """
+    id: int
+    title: str
+    description: str
+    platform: str
+    planned_end_time: datetime
+    block_access: bool
+    access_level: str
+    allowed_companies: frozenset
+    starts_at: datetime
+    ends_at: Optional[datetime] = None
+
+    def is_active(self, now=None):
+        now = now or timezone.now()
+        return self.starts_at <= now and (self.ends_at is None or self.ends_at > now)
+
+    def applies_to(self, platform):
+        return platform is None or self.platform in ('all', platform)
+
+    def is_company_allowed(self, company_id):
+        """İzinli şirket listesi boşsa veya şirket listedeyse True döner"""
+        return not self.allowed_companies or company_id in self.allowed_companies
+
+    def can_access(self, tenant):
+        """MaintenanceMode.can_access ile aynı kural; istek bağlamından karar verir"""
+        if not self.block_access:
+            return True
+        if not tenant.is_authenticated:
+            return False
+        if tenant.is_superuser:
+            return True
+
+        access_level = self.access_level
+        if access_level == 'superuser':
+            return False
+        if access_level == 'staff':
+            return tenant.is_staff
+        if access_level == 'company_admin':
+            return tenant.is_company_admin and self.is_company_allowed(tenant.company_id)
+        if access_level == 'all':
+            return not tenant.has_employee or self.is_company_allowed(tenant.company_id)
+        return False
+
+
+def _load_windows():
+    """Süren (bitmemiş) bakımları izinli şirketleriyle birlikte okur"""
+    maintenances = (
+        MaintenanceMode.objects
+        .filter(status='in_progress', actual_start_time__isnull=False)
+        .exclude(actual_end_time__lte=timezone.now())
+        .prefetch_related('allowed_companies')
+    )
+    return tuple(
+        MaintenanceWindow(
+            id=maintenance.id,
+            title=maintenance.title,
+            description=maintenance.description,
+            platform=maintenance.platform,
+            planned_end_time=maintenance.planned_end_time,
+            block_access=maintenance.block_access,
+            access_level=maintenance.access_level,
+            allowed_companies=frozenset(company.id for company in maintenance.allowed_companies.all()),
+            starts_at=maintenance.actual_start_time,
+            ends_at=maintenance.actual_end_time,
+        )
+        for maintenance in maintenances
+    )
+
+
+_windows = VersionedValue(MAINTENANCE_NAMESPACE, _load_windows)
+
+
+def invalidate_maintenance():
+    bump_version_on_commit(MAINTENANCE_NAMESPACE)
+
+
+def get_active_maintenances(platform=None, now=None):
+    """
+    Şu an süren bakımlar (platform verilirse o platformu etkileyenler).
+    Bakımlar süreç içinde tutulur; kayıt değiştiğinde sürümle yenilenir,
+    başlangıç ve bitiş zamanları her çağrıda kontrol edilir.
+    """
+    now = now or timezone.now()
+    return [
+        window for window in _windows.get()
+        if window.is_active(now) and window.applies_to(platform)
+    ]
+
+
+def get_active_maintenance(platform=None, now=None):
+    """Şu an süren ilk bakım (yoksa None)"""
+    windows = get_active_maintenances(platform, now)
+    return windows[0] if windows else None
+
+
+def get_request_platform(request):
+    platform = request.META.get(PLATFORM_HEADER, '').strip().lower()
+    return platform if platform in PLATFORMS else DEFAULT_PLATFORM
@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+from saas.models import Branch
+from saas.imports import ImportFileError, import_employees
+
+class Command(BaseCommand):
+    help = 'CSV/XLSX dosyasındaki çalışanları toplu olarak içe aktarır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV veya XLSX dosyasının yolu')
+        parser.add_argument(
+            '--branch',
+            type=int,
+            required=True,
+            help='Satırda şube belirtilmemişse kullanılacak şube ID'
+        )
+        parser.add_argument(
+            '--user',
+            help='Audit log kaydında görünecek kullanıcı adı'
+        )
+        parser.add_argument(
+            '--default-password',
+            help='Tüm kullanıcılar için ortak başlangıç parolası (verilmezse parola sıfırlama gerekir)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Kaydetmeden yalnızca doğrulama yap'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            branch = Branch.objects.select_related('company').get(pk=options['branch'])
+        except Branch.DoesNotExist:
+            raise CommandError(f"Şube bulunamadı: {options['branch']}")
+
+        user = None
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f"Kullanıcı bulunamadı: {options['user']}")
+
+        self.stdout.write(f"{options['path']} dosyası {branch} şubesine aktarılıyor...")
+        try:
+            with open(options['path'], 'rb') as fileobj:
+                result = import_employees(
+                    fileobj, options['path'], branch,
+                    user=user,
+                    default_password=options['default_password'],
+                    dry_run=options['dry_run']
+                )
+        except (ImportFileError, OSError) as e:
+            raise CommandError(str(e))
+
+        for error in result.errors:
+            details = '; '.join(
+                f"{field}: {' '.join(str(message) for message in messages)}"
+                for field, messages in error['errors'].items()
+            )
+            self.stdout.write(self.style.WARNING(f"Satır {error['row']}: {details}"))
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('Deneme modu: kayıt yapılmadı.'))
+        self.stdout.write(self.style.SUCCESS(
+            f'Toplam {result.total} satır: {result.created} çalışan aktarıldı, {result.failed} satır hatalı.'
+        ))
@@ -1,12 +1,58 @@
 from django.core.management.base import BaseCommand
-import json
-import requests
+from django.db.models import CharField, Value
+from django.db.models.functions import Cast, Concat
+from django.utils import timezone
 from saas.models import City, District, Neighborhood
-from django.db import transaction
+from saas.locations import invalidate_location_tree
+from saas.login import invalidate_profiles
+from saas.response_cache import invalidate_responses
+from saas.labels import sync_location_labels
+from saas.snapshots import publish_location_snapshot
+from saas.location_sources import (
+    DEFAULT_SOURCE_URL, CITY_FILE, DISTRICT_FILE, NEIGHBORHOOD_FILES,
+    open_location_source, iter_location_file,
+)
+from django.db import models, transaction
+
+# Karşılaştırılan alanlar; kaynakta olmayan alanlara (posta kodu, aktiflik) dokunulmaz
+DIFF_FIELDS = {
+    City: ('name', 'code'),
+    District: ('city_id', 'name'),
+    Neighborhood: ('district_id', 'name'),
+}
+
+# (üst kayıt, ad) benzersiz olan modeller; değişen ve silinecek satırların adları
+# önce geçici değerlere çekilir, böylece yer değiştiren veya serbest kalan adlar
+# yeni değerler yazılırken benzersizlik kısıtına takılmaz
+UNIQUE_NAME_MODELS = (District, Neighborhood)
+TEMPORARY_NAME_PREFIX = '~'
 
 class Command(BaseCommand):
     help = 'Türkiye il, ilçe ve mahalle verilerini yükler'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            default=DEFAULT_SOURCE_URL,
+            help='Veri kaynağı: http(s) adresi, yerel dizin veya .zip/.tar.gz arşivi'
+        )
+        parser.add_argument(
+            '--diff',
+            action='store_true',
+            help='Mevcut kayıtlarla karşılaştırıp yalnızca değişenleri ekle/güncelle/sil'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Değişiklikleri yazmadan yalnızca özetini göster (--diff ile)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Toplu işlemlerde kullanılacak kayıt sayısı'
+        )
+
     def delete_neighborhoods_in_chunks(self, chunk_size=1000):
         """Mahalleleri küçük parçalar halinde sil"""
         total_deleted = 0
@@ -22,155 +68,283 @@ class Command(BaseCommand):
             total_deleted += deleted_count
             self.stdout.write(f"{deleted_count} mahalle silindi... (Toplam: {total_deleted})")
 
-    def handle(self, *args, **kwargs):
+    def read_cities(self, reader):
+        """İlleri {id: (ad, kod)} olarak okur"""
+        cities = {}
+        for city in iter_location_file(reader, CITY_FILE):
+            city_id = int(city['sehir_id'])
+            cities[city_id] = (city['sehir_adi'].strip(), str(city_id).zfill(2))
+        return cities
+
+    def read_districts(self, reader, city_ids):
+        """İlçeleri {id: (il_id, ad)} olarak okur"""
+        districts = {}
+        for district in iter_location_file(reader, DISTRICT_FILE):
+            city_id = int(district['sehir_id'])
+            if city_id not in city_ids:
+                self.stdout.write(self.style.WARNING(
+                    f"İl bulunamadı: {city_id} ({district.get('ilce_adi')})"
+                ))
+                continue
+            districts[int(district['ilce_id'])] = (city_id, district['ilce_adi'].strip())
+        return districts
+
+    def read_neighborhoods(self, reader, district_ids):
+        """
+        Mahalle dosyalarını akış halinde okuyup {id: (ilçe_id, ad)} döndürür.
+        Aynı ilçede aynı isimli mahallelerden yalnızca ilki alınır.
+        """
+        neighborhoods = {}
+        seen_neighborhoods = set()
+
+        for name in NEIGHBORHOOD_FILES:
+            self.stdout.write(f"Mahalle dosyası {name} okunuyor...")
+            count = 0
+            for neighborhood in iter_location_file(reader, name):
+                count += 1
+                mahalle_id = neighborhood.get('mahalle_id')
+                mahalle_adi = (neighborhood.get('mahalle_adi') or '').strip()
+                ilce_id = neighborhood.get('ilce_id')
+
+                # Boş veya 0 ID'li kayıtları atla
+                if not mahalle_id or mahalle_id == '0' or not mahalle_adi:
+                    self.stdout.write(self.style.WARNING(
+                        f"Geçersiz mahalle verisi (atlandı): İlçe: {neighborhood.get('ilce_adi')}, "
+                        f"Şehir: {neighborhood.get('sehir_adi')}"
+                    ))
+                    continue
+
+                try:
+                    district_id = int(ilce_id)
+                except (TypeError, ValueError):
+                    district_id = None
+                if district_id not in district_ids:
+                    self.stdout.write(self.style.WARNING(
+                        f"İlçe bulunamadı: {ilce_id} ({neighborhood.get('ilce_adi')})"
+                    ))
+                    continue
+
+                unique_key = (district_id, mahalle_adi)
+                if unique_key in seen_neighborhoods:
+                    continue
+                seen_neighborhoods.add(unique_key)
+                neighborhoods[int(mahalle_id)] = unique_key
+
+            self.stdout.write(f"{name}: {count} mahalle bulundu")
+        return neighborhoods
+
+    def diff(self, model, incoming):
+        """
+        Kaynaktaki satırları mevcut kayıtlarla karşılaştırır.
+        Yeni, değişen ve kaynakta artık bulunmayan ID'leri döndürür.
+        """
+        fields = DIFF_FIELDS[model]
+        existing = {
+            row[0]: row[1:]
+            for row in model.objects.values_list('id', *fields).iterator(chunk_size=5000)
+        }
+        created = [pk for pk in incoming if pk not in existing]
+        changed = [
+            pk for pk, values in incoming.items()
+            if pk in existing and existing[pk] != values
+        ]
+        removed = [pk for pk in existing if pk not in incoming]
+        return created, changed, removed
+
+    def release_names(self, model, ids, batch_size):
+        """Satırların adlarını ID'den üretilen geçici, benzersiz değerlere çeker"""
+        if model not in UNIQUE_NAME_MODELS:
+            return
+        temporary_name = Concat(
+            Value(TEMPORARY_NAME_PREFIX), Cast('id', output_field=CharField()),
+            output_field=CharField()
+        )
+        for start in range(0, len(ids), batch_size):
+            model.objects.filter(id__in=ids[start:start + batch_size]).update(name=temporary_name)
+
+    def apply_diff(self, model, incoming, created, changed, batch_size):
+        """
+        Değişenleri günceller, sonra yeni kayıtları ekler; eklenen bir satır
+        bu yüklemede serbest kalan bir adı alabilir.
+        """
+        fields = DIFF_FIELDS[model]
+        now = timezone.now()
+
+        def build(pk):
+            # bulk_update auto_now alanını doldurmaz, updated_at elle verilir
+            return model(id=pk, updated_at=now, **dict(zip(fields, incoming[pk])))
+
+        if changed:
+            model.objects.bulk_update(
+                [build(pk) for pk in changed],
+                list(fields) + ['updated_at'],
+                batch_size=batch_size
+            )
+        if created:
+            model.objects.bulk_create([build(pk) for pk in created], batch_size=batch_size)
+
+    def delete_rows(self, model, ids, batch_size):
+        """
+        Kayıtları sinyal göndermeden, parti başına birkaç sorguyla siler.
+        Alt konumlar önceden silindiğinden yalnızca SET_NULL ilişkileri
+        (şirket, şube ve çalışan adresleri) güncellenir.
+        """
+        relations = [
+            relation for relation in model._meta.related_objects
+            if relation.on_delete is models.SET_NULL
+        ]
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            for relation in relations:
+                name = relation.field.name
+                relation.related_model._base_manager.filter(
+                    **{f'{name}__in': batch}
+                ).update(**{name: None})
+            # QuerySet.delete() satırları yükleyip her biri için sinyal gönderir
+            queryset = model._base_manager.filter(id__in=batch)
+            queryset._raw_delete(queryset.db)
+        # update() sinyal göndermez; adresleri boşaltılan modellerin yanıtları yenilenir
+        if ids:
+            for relation in relations:
+                invalidate_responses(relation.related_model)
+
+    def handle_diff(self, cities, districts, neighborhoods, batch_size, dry_run):
+        plan = [
+            (City, 'İl', cities),
+            (District, 'İlçe', districts),
+            (Neighborhood, 'Mahalle', neighborhoods),
+        ]
+        diffs = {}
+        for model, label, incoming in plan:
+            created, changed, removed = self.diff(model, incoming)
+            diffs[model] = (created, changed, removed)
+            self.stdout.write(
+                f"{label}: {len(created)} yeni, {len(changed)} değişen, "
+                f"{len(removed)} kaynakta yok"
+            )
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING('Deneme modu: değişiklik yazılmadı.'))
+            return
+
+        if not any(created or changed or removed for created, changed, removed in diffs.values()):
+            self.stdout.write(self.style.SUCCESS('Konum verileri güncel, değişiklik yok.'))
+            return
+
+        with transaction.atomic():
+            for model, _, _ in plan:
+                _, changed, removed = diffs[model]
+                self.release_names(model, changed + removed, batch_size)
+
+            # Üst kayıtlar önce yazılır; ilçe ve mahalleler yeni il/ilçelere bağlanabilir
+            for model, _, incoming in plan:
+                created, changed, _ = diffs[model]
+                self.apply_diff(model, incoming, created, changed, batch_size)
+
+            # Kaynaktaki her kayıt artık kaynaktaki bir üst kayda bağlı; kaynakta
+            # olmayanlar alttan üste silinir, silme başka kayda yayılmaz
+            for model, _, _ in reversed(plan):
+                self.delete_rows(model, diffs[model][2], batch_size)
+
+            # Toplu işlemler sinyal göndermez; etiketleri ve konum ağacını elle yenile
+            sync_location_labels()
+            invalidate_location_tree()
+            for model in (City, District, Neighborhood):
+                invalidate_responses(model)
+            invalidate_profiles()
+
+    def handle_replace(self, cities, districts, neighborhoods, batch_size):
+        with transaction.atomic():
+            # İlleri kontrol et ve eksikleri kaydet
+            existing_cities = set(City.objects.values_list('id', flat=True))
+            new_cities = [
+                City(id=city_id, name=name, code=code)
+                for city_id, (name, code) in cities.items()
+                if city_id not in existing_cities
+            ]
+            City.objects.bulk_create(new_cities, batch_size=batch_size)
+            self.stdout.write(self.style.SUCCESS(
+                f'{len(new_cities)} yeni il kaydedildi. '
+                f'Toplam {len(existing_cities) + len(new_cities)} il mevcut.'
+            ))
+
+            # İlçeleri kontrol et ve eksikleri kaydet
+            existing_districts = set(District.objects.values_list('id', flat=True))
+            new_districts = [
+                District(id=district_id, city_id=city_id, name=name)
+                for district_id, (city_id, name) in districts.items()
+                if district_id not in existing_districts
+            ]
+            District.objects.bulk_create(new_districts, batch_size=batch_size)
+            self.stdout.write(self.style.SUCCESS(
+                f'{len(new_districts)} yeni ilçe kaydedildi. '
+                f'Toplam {len(existing_districts) + len(new_districts)} ilçe mevcut.'
+            ))
+
+            # Mahalleleri yükle
+            self.stdout.write('Mahalleler siliniyor...')
+            self.delete_neighborhoods_in_chunks()
+            self.stdout.write('Tüm mahalleler silindi.')
+
+            self.stdout.write('Mahalleler kaydediliyor...')
+            items = list(neighborhoods.items())
+            total_created = 0
+            for start in range(0, len(items), batch_size):
+                Neighborhood.objects.bulk_create(
+                    [
+                        Neighborhood(id=pk, district_id=district_id, name=name)
+                        for pk, (district_id, name) in items[start:start + batch_size]
+                    ],
+                    ignore_conflicts=True
+                )
+                total_created += len(items[start:start + batch_size])
+                self.stdout.write(f"{total_created} mahalle kaydedildi...")
+
+            self.stdout.write(self.style.SUCCESS(f'Toplam {total_created} mahalle kaydedildi'))
+
+            # bulk_create sinyal göndermez; etiketleri ve konum ağacını elle yenile
+            sync_location_labels()
+            invalidate_location_tree()
+            for model in (City, District, Neighborhood):
+                invalidate_responses(model)
+            invalidate_profiles()
+
+    def publish_snapshot(self):
+        """Mobil istemcilerin indirdiği anlık görüntüyü yüklenen veriyle yeniler"""
+        snapshot, created = publish_location_snapshot()
+        if created:
+            self.stdout.write(self.style.SUCCESS(f'Konum anlık görüntüsü v{snapshot.version} yayınlandı.'))
+        else:
+            self.stdout.write(f'Konum anlık görüntüsü güncel (v{snapshot.version}).')
+
+    def handle(self, *args, **options):
         self.stdout.write('Konum verileri yükleniyor...')
-        
-        base_url = "https://raw.githubusercontent.com/metinyildirimnet/turkiye-adresler-json/main"
-        
+        source = options['source']
+        batch_size = options['batch_size']
+
         try:
-            # İlleri yükle
-            self.stdout.write('İller kontrol ediliyor...')
-            cities_response = requests.get(f"{base_url}/sehirler.json")
-            cities_data = cities_response.json()
-            
-            with transaction.atomic():
-                # İlleri kontrol et ve eksikleri kaydet
-                cities_dict = {}
-                new_cities_count = 0
-                existing_cities = {city.id: city for city in City.objects.all()}
-                
-                for city in cities_data:
-                    city_id = int(city['sehir_id'])
-                    if city_id not in existing_cities:
-                        city_obj = City.objects.create(
-                            id=city_id,
-                            name=city['sehir_adi'],
-                            code=str(city_id).zfill(2)
-                        )
-                        new_cities_count += 1
-                        cities_dict[str(city_id)] = city_obj
-                    else:
-                        cities_dict[str(city_id)] = existing_cities[city_id]
-                
-                self.stdout.write(self.style.SUCCESS(
-                    f'{new_cities_count} yeni il kaydedildi. '
-                    f'Toplam {len(cities_dict)} il mevcut.'
-                ))
+            self.stdout.write(f'Kaynak: {source}')
+            with open_location_source(source) as reader:
+                cities = self.read_cities(reader)
+                districts = self.read_districts(reader, cities)
+                neighborhoods = self.read_neighborhoods(reader, districts)
 
-                # İlçeleri yükle
-                self.stdout.write('İlçeler kontrol ediliyor...')
-                districts_response = requests.get(f"{base_url}/ilceler.json")
-                districts_data = districts_response.json()
-                
-                districts_dict = {}
-                new_districts_count = 0
-                existing_districts = {district.id: district for district in District.objects.all()}
-                
-                for district in districts_data:
-                    district_id = int(district['ilce_id'])
-                    if district_id not in existing_districts:
-                        district_obj = District.objects.create(
-                            id=district_id,
-                            name=district['ilce_adi'],
-                            city=cities_dict[district['sehir_id']]
-                        )
-                        new_districts_count += 1
-                        districts_dict[str(district_id)] = district_obj
-                    else:
-                        districts_dict[str(district_id)] = existing_districts[district_id]
-                
-                self.stdout.write(self.style.SUCCESS(
-                    f'{new_districts_count} yeni ilçe kaydedildi. '
-                    f'Toplam {len(districts_dict)} ilçe mevcut.'
-                ))
+            self.stdout.write(
+                f"Kaynakta {len(cities)} il, {len(districts)} ilçe, "
+                f"{len(neighborhoods)} mahalle bulundu."
+            )
+
+            if options['diff']:
+                self.handle_diff(cities, districts, neighborhoods, batch_size, options['dry_run'])
+            else:
+                self.handle_replace(cities, districts, neighborhoods, batch_size)
 
-                # Mahalleleri yükle
-                self.stdout.write('Mahalleler siliniyor...')
-                self.delete_neighborhoods_in_chunks()
-                self.stdout.write('Tüm mahalleler silindi.')
-
-                # Tüm mahalle verilerini topla
-                all_neighborhoods = []
-
-                for i in range(1, 5):
-                    self.stdout.write(f"Mahalle dosyası {i} yükleniyor...")
-                    neighborhoods_response = requests.get(f"{base_url}/mahalleler-{i}.json")
-                    data = neighborhoods_response.json()
-                    
-                    # Debug: İlk mahalle verisini kontrol et
-                    if i == 1 and data:
-                        self.stdout.write(f"Örnek mahalle verisi: {data[0]}")
-                    
-                    self.stdout.write(f"Dosya {i}: {len(data)} mahalle bulundu")
-                    all_neighborhoods.extend(data)
-
-                # Mahalleleri küçük gruplar halinde kaydet
-                self.stdout.write('Mahalleler kaydediliyor...')
-                batch_size = 500
-                neighborhoods_to_create = []
-                seen_neighborhoods = set()
-                total_created = 0
-
-                for neighborhood in all_neighborhoods:
-                    try:
-                        mahalle_id = neighborhood.get('mahalle_id')
-                        mahalle_adi = neighborhood.get('mahalle_adi')
-                        ilce_id = neighborhood.get('ilce_id')
-                        
-                        # Boş veya 0 ID'li kayıtları atla
-                        if not mahalle_id or mahalle_id == '0' or not mahalle_adi.strip():
-                            self.stdout.write(self.style.WARNING(
-                                f"Geçersiz mahalle verisi (atlandı): İlçe: {neighborhood.get('ilce_adi')}, "
-                                f"Şehir: {neighborhood.get('sehir_adi')}"
-                            ))
-                            continue
-
-                        unique_key = f"{mahalle_adi}_{ilce_id}"
-                        
-                        if unique_key not in seen_neighborhoods:
-                            seen_neighborhoods.add(unique_key)
-                            
-                            # District kontrolü
-                            if ilce_id not in districts_dict:
-                                self.stdout.write(self.style.WARNING(
-                                    f"İlçe bulunamadı: {ilce_id} ({neighborhood.get('ilce_adi')})"
-                                ))
-                                continue
-                                
-                            neighborhoods_to_create.append(Neighborhood(
-                                id=int(mahalle_id),
-                                name=mahalle_adi.strip(),  # Boşlukları temizle
-                                district=districts_dict[ilce_id]
-                            ))
-
-                            # Batch size'a ulaşınca kaydet
-                            if len(neighborhoods_to_create) >= batch_size:
-                                Neighborhood.objects.bulk_create(
-                                    neighborhoods_to_create,
-                                    ignore_conflicts=True
-                                )
-                                total_created += len(neighborhoods_to_create)
-                                self.stdout.write(f"{total_created} mahalle kaydedildi...")
-                                neighborhoods_to_create = []
-                    
-                    except Exception as e:
-                        self.stdout.write(self.style.ERROR(
-                            f"Mahalle işlenirken hata: {str(e)}, Veri: {neighborhood}"
-                        ))
-                        continue
-
-                # Kalan mahalleleri kaydet
-                if neighborhoods_to_create:
-                    Neighborhood.objects.bulk_create(
-                        neighborhoods_to_create,
-                        ignore_conflicts=True
-                    )
-                    total_created += len(neighborhoods_to_create)
-
-                self.stdout.write(self.style.SUCCESS(f'Toplam {total_created} mahalle kaydedildi'))
+            # --dry-run yalnızca --diff ile geçerlidir
+            if not (options['diff'] and options['dry_run']):
+                self.publish_snapshot()
 
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'Hata oluştu: {str(e)}'))
             raise e
 
-        self.stdout.write(self.style.SUCCESS('Tüm konum verileri başarıyla yüklendi!')) 
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS('Tüm konum verileri başarıyla yüklendi!'))
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from saas.notifications import publish_due_announcements
+
+class Command(BaseCommand):
+    help = 'Yayına girmiş, bildirimi oluşturulmamış duyuruların bildirimlerini oluşturur'
+
+    def handle(self, *args, **options):
+        created = publish_due_announcements()
+        self.stdout.write(self.style.SUCCESS(f'{created} duyuru bildirimi oluşturuldu.'))
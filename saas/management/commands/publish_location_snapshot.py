@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from saas.snapshots import publish_location_snapshot, SNAPSHOT_KEEP
+
+class Command(BaseCommand):
+    help = 'Konum verisinin sıkıştırılmış anlık görüntüsünü yayınlar (mobil senkronizasyon)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Veri değişmemiş olsa da yeni sürüm oluştur'
+        )
+        parser.add_argument(
+            '--keep',
+            type=int,
+            default=SNAPSHOT_KEEP,
+            help='Saklanacak sürüm sayısı (0: hiçbirini silme)'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Konum anlık görüntüsü hazırlanıyor...')
+        snapshot, created = publish_location_snapshot(force=options['force'], keep=options['keep'])
+
+        if not created:
+            self.stdout.write(self.style.SUCCESS(
+                f'Konum verisi değişmemiş, son sürüm v{snapshot.version} kullanılmaya devam ediyor.'
+            ))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f'v{snapshot.version} yayınlandı: {snapshot.city_count} il, '
+            f'{snapshot.district_count} ilçe, {snapshot.neighborhood_count} mahalle '
+            f'({snapshot.size / 1024:.1f} KB)'
+        ))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from saas.statistics import RECONCILE_BATCH_SIZE, rebuild_company_statistics
+
+class Command(BaseCommand):
+    help = 'Şirket istatistik tablosunu kaynak tablolardan yeniden hesaplar ve sapmaları düzeltir'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--company',
+            type=int,
+            action='append',
+            dest='companies',
+            help='Yalnızca bu şirketi hesapla (birden fazla verilebilir)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=RECONCILE_BATCH_SIZE,
+            help='Toplu yazma boyutu'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Şirket istatistikleri hesaplanıyor...')
+        checked, changed = rebuild_company_statistics(
+            options['companies'], batch_size=options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'{checked} şirket kontrol edildi, {changed} istatistik satırı güncellendi.'
+        ))
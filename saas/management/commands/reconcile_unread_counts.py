@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from saas.notifications import RECONCILE_BATCH_SIZE, reconcile_unread_counts
+
+class Command(BaseCommand):
+    help = 'Okunmamış bildirim sayaçlarını veritabanıyla karşılaştırır ve sapmaları düzeltir'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=RECONCILE_BATCH_SIZE,
+            help='Tek seferde kontrol edilen kullanıcı sayısı'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Okunmamış bildirim sayaçları kontrol ediliyor...')
+        checked, changed = reconcile_unread_counts(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{checked} sayaç kontrol edildi, {changed} sayaç düzeltildi.'
+        ))
@@ -0,0 +1,174 @@
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils.http import http_date
+from django.utils.translation import gettext as _
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError, InvalidToken
+
+from .authentication import TenantJWTAuthentication, is_token_current, tenant_from_token
+from .entitlements import get_entitlement
+from .maintenance import get_active_maintenances, get_request_platform
+from .tenancy import ANONYMOUS_TENANT, get_tenant
+
+# Abonelik kontrolünden muaf URL adları (giriş, token yenileme ve dokümantasyon)
+ENTITLEMENT_EXEMPT_URLS = frozenset({
+    'login', 'token_refresh', 'token_verify',
+    'schema-json', 'schema-swagger-ui', 'schema-redoc',
+})
+
+# Bakım kontrolünden muaf URL adları; giriş bakımı kendisi kontrol eder
+MAINTENANCE_EXEMPT_URLS = frozenset({
+    'login', 'schema-json', 'schema-swagger-ui', 'schema-redoc',
+})
+
+# Middleware'lerin token'dan kurduğu bağlamın istekte saklandığı öznitelik
+REQUEST_TENANT_ATTR = '_saas_request_tenant'
+
+_jwt_authentication = TenantJWTAuthentication()
+
+
+def _resolve_request_tenant(request):
+    header = _jwt_authentication.get_header(request)
+    if header is not None:
+        raw_token = _jwt_authentication.get_raw_token(header)
+        if raw_token is None:
+            return ANONYMOUS_TENANT
+        try:
+            token = _jwt_authentication.get_validated_token(raw_token)
+        except (InvalidToken, TokenError):
+            # Geçersiz token'lar DRF kimlik doğrulamasında reddedilir
+            return ANONYMOUS_TENANT
+        if is_token_current(token):
+            return tenant_from_token(token)
+        # Token üretildikten sonra kullanıcının yetkileri değişti; claim'lere
+        # güvenilmez, bağlam kullanıcı önbelleğinden (gerekirse veritabanından) kurulur
+        try:
+            return _jwt_authentication.get_user_state(token).tenant
+        except AuthenticationFailed:
+            return ANONYMOUS_TENANT
+
+    # Oturum çerezi yoksa request.user'a dokunulmaz (Vary: Cookie eklenmesin)
+    if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+        return ANONYMOUS_TENANT
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return ANONYMOUS_TENANT
+    return get_tenant(request)
+
+
+def get_request_tenant(request):
+    """
+    View'dan önce çalışan middleware'ler için istek bağlamı. Bearer token ile
+    gelen isteklerde, token'ın yetki sürümü güncelse claim'lerinden kurulur
+    (imza doğrulanır ama kullanıcı yüklenmez); değilse kullanıcının güncel
+    bağlamı kullanılır. Oturumla gelen isteklerde istek bağlamı kullanılır.
+    """
+    tenant = getattr(request, REQUEST_TENANT_ATTR, None)
+    if tenant is None:
+        tenant = _resolve_request_tenant(request)
+        setattr(request, REQUEST_TENANT_ATTR, tenant)
+    return tenant
+
+
+def _is_exempt(request, url_names):
+    match = request.resolver_match
+    return match is not None and match.url_name in url_names
+
+
+class LazyTenant:
+    """
+    request.tenant için tembel vekil. İlk öznitelik erişiminde bağlamı çözer;
+    kimlik doğrulaması (ör. JWT) sonradan yapılsa bile güncel kullanıcıyı kullanır.
+    """
+    __slots__ = ('_request',)
+
+    def __init__(self, request):
+        self._request = request
+
+    def __getattr__(self, name):
+        return getattr(get_tenant(self._request), name)
+
+    def __repr__(self):
+        return f'<LazyTenant {get_tenant(self._request)!r}>'
+
+
+class TenantMiddleware:
+    """
+    İsteğe request.tenant ekler. Bağlam ihtiyaç duyulduğunda tek sorguyla
+    çözülür ve istek boyunca tüm viewset ve yetki kontrollerince paylaşılır.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.tenant = LazyTenant(request)
+        return self.get_response(request)
+
+
+class MaintenanceMiddleware:
+    """
+    Süren bir bakım isteğin platformunu etkiliyorsa ve kullanıcının erişim
+    izni yoksa 503 döndürür. Platform X-Client-Platform başlığından (web,
+    mobile) okunur; başlık yoksa api sayılır.
+
+    Bakımlar ve izinli şirket kümeleri süreç içinde tutulur; karar token
+    claim'leriyle verildiğinden kontrol veritabanına gitmez.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if _is_exempt(request, MAINTENANCE_EXEMPT_URLS):
+            return None
+
+        windows = get_active_maintenances(get_request_platform(request))
+        if not windows:
+            return None
+        tenant = get_request_tenant(request)
+        for window in windows:
+            if window.can_access(tenant):
+                continue
+            response = JsonResponse({
+                'detail': _("Sistem şu anda bakımda."),
+                'maintenance': {
+                    'title': window.title,
+                    'description': window.description,
+                    'planned_end_time': window.planned_end_time,
+                },
+            }, status=503)
+            response['Retry-After'] = http_date(window.planned_end_time.timestamp())
+            return response
+        return None
+
+
+class EntitlementMiddleware:
+    """
+    Aboneliği sona ermiş şirketlerin isteklerini 403 ile reddeder.
+
+    Şirket, girişte access token'a yazılan claim'den okunur; hak bilgisi
+    paylaşılan cache'ten geldiğinden kontrol veritabanına gitmez.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if _is_exempt(request, ENTITLEMENT_EXEMPT_URLS):
+            return None
+
+        tenant = get_request_tenant(request)
+        if tenant.is_system_user or tenant.company_id is None:
+            return None
+        if get_entitlement(tenant.company_id).is_active():
+            return None
+        return JsonResponse({'detail': _(
+            "Şirketinizin abonelik süresi bitmiştir. "
+            "Lütfen sistem yöneticiniz ile iletişime geçin."
+        )}, status=403)
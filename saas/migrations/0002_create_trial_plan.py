@@ -11,7 +11,6 @@ def create_trial_plan(apps, schema_editor):
         defaults={
             'name': 'Türk Lirası',
             'symbol': '₺',
-            'is_default': True
         }
     )
     
@@ -20,16 +19,18 @@ def create_trial_plan(apps, schema_editor):
         Plan.objects.create(
             id=1,
             name='30 Günlük Deneme',
+            slug='30-gunluk-deneme',  # Geçmiş modelde save() çalışmadığından slug burada verilir
             description='30 günlük ücretsiz deneme sürümü',
             price=0,
             currency=currency,
+            max_users=10,
+            max_storage=100,
             features={
                 'max_branches': 1,
                 'max_employees': 10,
                 'storage_limit': 100,  # MB
                 'api_limit': 1000,     # Günlük API çağrısı
             },
-            is_trial=True,
             is_active=True,
             created_at=timezone.now(),
             updated_at=timezone.now()
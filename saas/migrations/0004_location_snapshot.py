@@ -0,0 +1,34 @@
+# Generated by Django 5.1.6 on 2026-10-17 06:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('saas', '0003_alter_branch_unique_together'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocationSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Aktif mi?')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma Tarihi')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Güncellenme Tarihi')),
+                ('version', models.PositiveIntegerField(unique=True, verbose_name='Sürüm')),
+                ('checksum', models.CharField(max_length=64, verbose_name='Özet Değeri')),
+                ('payload', models.BinaryField(verbose_name='Veri (gzip)')),
+                ('size', models.PositiveIntegerField(default=0, verbose_name='Boyut (bytes)')),
+                ('city_count', models.PositiveIntegerField(default=0, verbose_name='İl Sayısı')),
+                ('district_count', models.PositiveIntegerField(default=0, verbose_name='İlçe Sayısı')),
+                ('neighborhood_count', models.PositiveIntegerField(default=0, verbose_name='Mahalle Sayısı')),
+            ],
+            options={
+                'verbose_name': 'Konum Anlık Görüntüsü',
+                'verbose_name_plural': 'Konum Anlık Görüntüleri',
+                'ordering': ['-version'],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.6 on 2026-10-17 07:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('saas', '0004_location_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompanyStatistics',
+            fields=[
+                ('is_active', models.BooleanField(default=True, verbose_name='Aktif mi?')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma Tarihi')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Güncellenme Tarihi')),
+                ('company', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistics', serialize=False, to='saas.company', verbose_name='Şirket')),
+                ('total_branches', models.IntegerField(default=0, verbose_name='Şube Sayısı')),
+                ('total_employees', models.IntegerField(default=0, verbose_name='Çalışan Sayısı')),
+                ('active_employees', models.IntegerField(default=0, verbose_name='Aktif Çalışan Sayısı')),
+                ('storage_used', models.BigIntegerField(default=0, verbose_name='Kullanılan Depolama (bytes)')),
+                ('api_calls_today', models.IntegerField(default=0, verbose_name='Bugünkü API Çağrıları')),
+                ('api_calls_date', models.DateField(blank=True, null=True, verbose_name='API Çağrı Tarihi')),
+                ('total_invoices', models.IntegerField(default=0, verbose_name='Fatura Sayısı')),
+                ('pending_invoices', models.IntegerField(default=0, verbose_name='Bekleyen Fatura Sayısı')),
+                ('next_subscription_start', models.DateTimeField(blank=True, null=True, verbose_name='Sonraki Abonelik Başlangıcı')),
+                ('active_subscription', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='saas.subscription', verbose_name='Aktif Abonelik')),
+            ],
+            options={
+                'verbose_name': 'Şirket İstatistiği',
+                'verbose_name_plural': 'Şirket İstatistikleri',
+            },
+        ),
+    ]
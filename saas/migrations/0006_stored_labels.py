@@ -0,0 +1,75 @@
+# Generated by Django 5.1.6 on 2026-10-17 07:12
+
+from django.db import migrations, models
+from django.db.models import CharField, F, OuterRef, Subquery, Value
+from django.db.models.functions import Concat, Trim
+
+
+def fill_labels(apps, schema_editor):
+    """Mevcut kayıtların etiketlerini saas/labels.py ile aynı ifadelerle doldurur"""
+    City = apps.get_model('saas', 'City')
+    District = apps.get_model('saas', 'District')
+    Neighborhood = apps.get_model('saas', 'Neighborhood')
+    Branch = apps.get_model('saas', 'Branch')
+    Employee = apps.get_model('saas', 'Employee')
+    Subscription = apps.get_model('saas', 'Subscription')
+    Invoice = apps.get_model('saas', 'Invoice')
+    User = apps.get_model('auth', 'User')
+
+    def value_of(model, outer_field, field):
+        return Subquery(model.objects.filter(pk=OuterRef(outer_field)).values(field)[:1])
+
+    District.objects.update(full_name=Concat(
+        value_of(City, 'city_id', 'name'), Value(' - '), F('name'),
+        output_field=CharField()
+    ))
+    Neighborhood.objects.update(full_name=Concat(
+        value_of(District, 'district_id', 'full_name'), Value(' - '), F('name'),
+        output_field=CharField()
+    ))
+    Employee.objects.update(display_name=Concat(
+        Trim(Concat(
+            value_of(User, 'user_id', 'first_name'), Value(' '),
+            value_of(User, 'user_id', 'last_name'),
+            output_field=CharField()
+        )),
+        Value(' - '), value_of(Branch, 'branch_id', 'name'),
+        Value('/'), value_of(Branch, 'branch_id', 'company__name'),
+        output_field=CharField()
+    ))
+    Invoice.objects.update(display_name=Concat(
+        F('number'), Value(' - '),
+        value_of(Subscription, 'subscription_id', 'company__name'),
+        output_field=CharField()
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('saas', '0005_company_statistics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='district',
+            name='full_name',
+            field=models.CharField(blank=True, editable=False, max_length=110, verbose_name='Tam Adı'),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='display_name',
+            field=models.CharField(blank=True, editable=False, max_length=510, verbose_name='Görünen Ad'),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='display_name',
+            field=models.CharField(blank=True, editable=False, max_length=160, verbose_name='Görünen Ad'),
+        ),
+        migrations.AddField(
+            model_name='neighborhood',
+            name='full_name',
+            field=models.CharField(blank=True, editable=False, max_length=210, verbose_name='Tam Adı'),
+        ),
+        migrations.RunPython(fill_labels, migrations.RunPython.noop),
+    ]
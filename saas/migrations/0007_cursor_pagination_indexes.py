@@ -0,0 +1,40 @@
+# Generated by Django 5.1.6 on 2026-10-17 07:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('saas', '0006_stored_labels'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='apiusage',
+            index=models.Index(fields=['-date', '-id'], name='saas_apiusage_cursor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apiusage',
+            index=models.Index(fields=['company', '-date', '-id'], name='saas_apiusage_company_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['-created_at', '-id'], name='saas_auditlog_cursor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['company', '-created_at', '-id'], name='saas_auditlog_company_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['-created_at', '-id'], name='saas_notification_cursor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationrecipient',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='saas_recipient_cursor_idx'),
+        ),
+    ]
@@ -2,54 +2,48 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.utils.text import slugify
 from django.utils import timezone
-from django.db.models.signals import post_save
-from django.dispatch import receiver
+from django.db import transaction
 from datetime import timedelta
 from django.utils.translation import gettext_lazy as _
+from .slugs import UniqueSlugMixin, allocate_slug
+
+TR_CHAR_MAP = str.maketrans({
+    'ı': 'i', 'İ': 'i',
+    'ğ': 'g', 'Ğ': 'g',
+    'ü': 'u', 'Ü': 'u',
+    'ş': 's', 'Ş': 's',
+    'ö': 'o', 'Ö': 'o',
+    'ç': 'c', 'Ç': 'c',
+})
+
+def tr_fold(text):
+    """
+    Türkçe karakterleri ASCII karşılıklarına çevirir
+    """
+    return text.translate(TR_CHAR_MAP)
 
 def tr_slugify(text):
     """
     Türkçe karakterleri düzelterek slug oluşturur
     """
-    text = text.replace('ı', 'i')
-    text = text.replace('İ', 'i')
-    text = text.replace('ğ', 'g')
-    text = text.replace('Ğ', 'g')
-    text = text.replace('ü', 'u')
-    text = text.replace('Ü', 'u')
-    text = text.replace('ş', 's')
-    text = text.replace('Ş', 's')
-    text = text.replace('ö', 'o')
-    text = text.replace('Ö', 'o')
-    text = text.replace('ç', 'c')
-    text = text.replace('Ç', 'c')
-    return slugify(text)
+    return slugify(tr_fold(text))
 
 def unique_slugify(instance, slug, counter=0):
     """
     Verilen slug'ın benzersiz olmasını sağlar
     Eğer slug kullanımdaysa sonuna sayı ekler
+    Aday slug'lar tek sorguda kontrol edilir (bkz. saas.slugs.allocate_slug)
     """
-    suffix = f"-{counter}" if counter > 0 else ""
-    test_slug = f"{slug}{suffix}"
-    
-    # Aynı model içinde slug kontrolü
-    qs = instance.__class__.objects.filter(slug=test_slug)
-    
-    # Düzenleme durumunda kendisini hariç tut
-    if instance.pk:
-        qs = qs.exclude(pk=instance.pk)
-    
-    # Branch ve Employee için company/branch bazında kontrol
-    if isinstance(instance, Branch):
-        qs = qs.filter(company=instance.company)
-    elif isinstance(instance, Employee):
-        qs = qs.filter(branch=instance.branch)
-    
-    if qs.exists():
-        # Recursive olarak yeni sayı ile dene
-        return unique_slugify(instance, slug, counter + 1)
-    return test_slug
+    return allocate_slug(instance, slug)
+
+def include_update_field(kwargs, name):
+    """
+    save(update_fields=...) ile yapılan kayıtlarda saklanan etiket alanının
+    da yazılmasını sağlar
+    """
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None:
+        kwargs['update_fields'] = {*update_fields, name}
 
 class BaseModel(models.Model):
     is_active = models.BooleanField(default=True, verbose_name="Aktif mi?")
@@ -59,6 +53,13 @@ class BaseModel(models.Model):
     class Meta:
         abstract = True
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Yüklenen değerler saklanır; sinyaller bir ilişkinin değişip değişmediğini sorgusuz anlar
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
 class City(BaseModel):
     name = models.CharField(max_length=50, verbose_name="İl Adı")
     code = models.CharField(max_length=2, unique=True, verbose_name="İl Kodu")
@@ -74,6 +75,8 @@ class City(BaseModel):
 class District(BaseModel):
     city = models.ForeignKey(City, on_delete=models.CASCADE, related_name='districts', verbose_name="İl")
     name = models.CharField(max_length=50, verbose_name="İlçe Adı")
+    # "İl - İlçe"; kayıtta ve il adı değiştiğinde güncellenir (bkz. saas/labels.py)
+    full_name = models.CharField(max_length=110, blank=True, editable=False, verbose_name="Tam Adı")
     
     class Meta:
         verbose_name = 'İlçe'
@@ -82,12 +85,22 @@ class District(BaseModel):
         unique_together = ['city', 'name']
     
     def __str__(self):
+        return self.full_name or self.build_full_name()
+
+    def build_full_name(self):
         return f"{self.city.name} - {self.name}"
 
+    def save(self, *args, **kwargs):
+        self.full_name = self.build_full_name()
+        include_update_field(kwargs, 'full_name')
+        super().save(*args, **kwargs)
+
 class Neighborhood(BaseModel):
     district = models.ForeignKey(District, on_delete=models.CASCADE, related_name='neighborhoods', verbose_name="İlçe")
     name = models.CharField(max_length=100, verbose_name="Mahalle Adı")
     postal_code = models.CharField(max_length=5, blank=True, null=True, verbose_name="Posta Kodu")
+    # "İl - İlçe - Mahalle"; kayıtta ve üst konumlar değiştiğinde güncellenir
+    full_name = models.CharField(max_length=210, blank=True, editable=False, verbose_name="Tam Adı")
     
     class Meta:
         verbose_name = 'Mahalle'
@@ -96,8 +109,37 @@ class Neighborhood(BaseModel):
         unique_together = ['district', 'name']
     
     def __str__(self):
+        return self.full_name or self.build_full_name()
+
+    def build_full_name(self):
         return f"{self.district.city.name} - {self.district.name} - {self.name}"
 
+    def save(self, *args, **kwargs):
+        self.full_name = self.build_full_name()
+        include_update_field(kwargs, 'full_name')
+        super().save(*args, **kwargs)
+
+class LocationSnapshot(BaseModel):
+    """
+    İl, ilçe ve mahallelerin yayınlanmış, sıkıştırılmış sütunsal kopyası.
+    Mobil istemciler tam veriyi bir kez indirir, sonra sürümler arası farkı çeker.
+    """
+    version = models.PositiveIntegerField(unique=True, verbose_name="Sürüm")
+    checksum = models.CharField(max_length=64, verbose_name="Özet Değeri")
+    payload = models.BinaryField(verbose_name="Veri (gzip)")
+    size = models.PositiveIntegerField(default=0, verbose_name="Boyut (bytes)")
+    city_count = models.PositiveIntegerField(default=0, verbose_name="İl Sayısı")
+    district_count = models.PositiveIntegerField(default=0, verbose_name="İlçe Sayısı")
+    neighborhood_count = models.PositiveIntegerField(default=0, verbose_name="Mahalle Sayısı")
+
+    class Meta:
+        verbose_name = 'Konum Anlık Görüntüsü'
+        verbose_name_plural = 'Konum Anlık Görüntüleri'
+        ordering = ['-version']
+
+    def __str__(self):
+        return f"Konum verisi v{self.version}"
+
 class Currency(BaseModel):
     name = models.CharField(max_length=50, verbose_name="Para Birimi Adı")
     code = models.CharField(max_length=3, unique=True, verbose_name="Para Birimi Kodu")
@@ -111,7 +153,7 @@ class Currency(BaseModel):
     def __str__(self):
         return f"{self.name} ({self.code})"
 
-class Company(BaseModel):
+class Company(UniqueSlugMixin, BaseModel):
     COMPANY_TYPES = [
         ('sahis', 'Şahıs Şirketi'),
         ('kolektif', 'Kolektif Şirket'),
@@ -149,66 +191,38 @@ class Company(BaseModel):
     def __str__(self):
         return f"{self.name} ({self.get_company_type_display()})"
 
-    def save(self, *args, **kwargs):
+    def get_slug_base(self):
+        return self.name
+
+    def save(self, *args, provision=True, **kwargs):
+        """
+        Yeni şirket kaydedilirken merkez şube ve 30 günlük deneme aboneliği
+        aynı transaction içinde oluşturulur (bkz. saas.onboarding).
+        provision=False verilirse bu adım atlanır.
+        """
         is_new = self._state.adding  # Yeni kayıt mı kontrolü
-        
-        if not self.slug:
-            slug = tr_slugify(self.name)
-            self.slug = unique_slugify(self, slug)
-        
-        super().save(*args, **kwargs)
 
-        # Yeni şirket ise otomatik işlemleri yap
-        if is_new:
-            # Merkez şube oluştur
-            self.create_main_branch()
-            
-            # 30 günlük deneme planı oluştur
-            try:
-                trial_plan = Plan.objects.get(id=1)  # Deneme planı (ID: 1)
-                
-                from .models import Subscription  # Circular import'u önlemek için
-                
-                Subscription.objects.create(
-                    company=self,
-                    plan=trial_plan,
-                    status='active',
-                    start_date=timezone.now().date(),
-                    end_date=timezone.now().date() + timedelta(days=30)
-                )
-            except Plan.DoesNotExist:
-                # Plan bulunamazsa log kaydı oluştur
-                from django.core.exceptions import ObjectDoesNotExist
-                from django.core.mail import mail_admins
-                
-                error_message = f"ID'si 1 olan deneme planı bulunamadı. Şirket: {self.name}"
-                mail_admins(
-                    "Deneme Planı Hatası",
-                    error_message
-                )
-                raise ObjectDoesNotExist(error_message)
+        if not (is_new and provision):
+            return super().save(*args, **kwargs)
+
+        from .onboarding import provision_company  # Circular import'u önlemek için
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            provision_company(self)
 
     def create_main_branch(self):
         """Şirket için merkez şube oluşturur"""
-        from .models import Branch  # Circular import'u önlemek için
-        
-        return Branch.objects.create(
-            company=self,
-            name="Merkez Şube",
-            is_main_branch=True,
-            phone=self.phone,
-            email=self.email,
-            address=self.address,
-            neighborhood=self.neighborhood
-        )
+        from .onboarding import build_main_branch  # Circular import'u önlemek için
+
+        branch = build_main_branch(self)
+        branch.save()
+        return branch
 
-@receiver(post_save, sender=Company)
-def create_main_branch(sender, instance, created, **kwargs):
-    """Yeni şirket oluşturulduğunda otomatik merkez şube oluşturur"""
-    if created:
-        instance.create_main_branch()
+class Branch(UniqueSlugMixin, BaseModel):
+    SLUG_SCOPE = 'company'  # Slug şirket içinde benzersizdir
+    STR_SELECT_RELATED = ('company',)  # __str__ içinde okunan ilişkiler
 
-class Branch(BaseModel):
     company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='branches', verbose_name="Şirket")
     name = models.CharField(max_length=100, verbose_name="Şube Adı")
     slug = models.SlugField(max_length=150, blank=True, verbose_name="URL")
@@ -229,13 +243,10 @@ class Branch(BaseModel):
     def __str__(self):
         return f"{self.company.name} - {self.name}"
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            slug = tr_slugify(f"{self.company.name} {self.name}")
-            self.slug = unique_slugify(self, slug)
-        super().save(*args, **kwargs)
+    def get_slug_base(self):
+        return f"{self.company.name} {self.name}"
 
-class Employee(BaseModel):
+class Employee(UniqueSlugMixin, BaseModel):
     GENDER_CHOICES = [
         ('M', 'Erkek'),
         ('F', 'Kadın'),
@@ -247,6 +258,8 @@ class Employee(BaseModel):
         ('branch_admin', 'Şube Yöneticisi'),
         ('company_admin', 'Şirket Yöneticisi'),
     ]
+
+    SLUG_SCOPE = 'branch'  # Slug şube içinde benzersizdir
     
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='employee', verbose_name="Kullanıcı")
     branch = models.ForeignKey(Branch, on_delete=models.CASCADE, related_name='employees', verbose_name="Şube")
@@ -259,6 +272,8 @@ class Employee(BaseModel):
     neighborhood = models.ForeignKey(Neighborhood, on_delete=models.SET_NULL, null=True, verbose_name="Mahalle")
     hire_date = models.DateField(verbose_name="İşe Başlama Tarihi")
     termination_date = models.DateField(null=True, blank=True, verbose_name="İşten Ayrılma Tarihi")
+    # "Ad Soyad - Şube/Şirket"; kullanıcı, şube veya şirket adı değiştiğinde güncellenir
+    display_name = models.CharField(max_length=510, blank=True, editable=False, verbose_name="Görünen Ad")
     
     # Yeni eklenen rol alanları
     role = models.CharField(
@@ -277,7 +292,15 @@ class Employee(BaseModel):
         ]
     
     def __str__(self):
+        return self.display_name or self.build_display_name()
+
+    def build_display_name(self):
         return f"{self.user.get_full_name()} - {self.branch.name}/{self.branch.company.name}"
+
+    def save(self, *args, **kwargs):
+        self.display_name = self.build_display_name()
+        include_update_field(kwargs, 'display_name')
+        super().save(*args, **kwargs)
     
     @property
     def full_name(self):
@@ -293,13 +316,12 @@ class Employee(BaseModel):
         """Şube yöneticisi mi?"""
         return self.role == 'branch_admin'
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            slug = tr_slugify(f"{self.user.get_full_name()} {self.identity_number[-4:]}")
-            self.slug = unique_slugify(self, slug)
-        super().save(*args, **kwargs)
+    def get_slug_base(self):
+        return f"{self.user.get_full_name()} {self.identity_number[-4:]}"
+
+class Plan(UniqueSlugMixin, BaseModel):
+    STR_SELECT_RELATED = ('currency',)  # __str__ içinde okunan ilişkiler
 
-class Plan(BaseModel):
     name = models.CharField(max_length=50, verbose_name="Plan Adı")
     slug = models.SlugField(max_length=70, unique=True, blank=True, verbose_name="URL")
     description = models.TextField(verbose_name="Açıklama")
@@ -317,12 +339,12 @@ class Plan(BaseModel):
     def __str__(self):
         return f"{self.name} - {self.price} {self.currency.code}"
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = unique_slugify(self, tr_slugify(self.name))
-        super().save(*args, **kwargs)
+    def get_slug_base(self):
+        return self.name
 
 class Subscription(BaseModel):
+    STR_SELECT_RELATED = ('company', 'plan')  # __str__ içinde okunan ilişkiler
+
     STATUS_CHOICES = [
         ('trial', 'Deneme'),
         ('active', 'Aktif'),
@@ -347,6 +369,11 @@ class Subscription(BaseModel):
     def __str__(self):
         return f"{self.company.name} - {self.plan.name}"
 
+    @property
+    def is_trial(self):
+        """Deneme aboneliği mi?"""
+        return self.status == 'trial' or bool(self.trial_ends and self.trial_ends > timezone.now())
+
 class Invoice(BaseModel):
     STATUS_CHOICES = [
         ('draft', 'Taslak'),
@@ -364,6 +391,8 @@ class Invoice(BaseModel):
     due_date = models.DateField(verbose_name="Son Ödeme Tarihi")
     paid_at = models.DateTimeField(null=True, blank=True, verbose_name="Ödeme Tarihi")
     notes = models.TextField(blank=True, verbose_name="Notlar")
+    # "Fatura No - Şirket"; şirket adı değiştiğinde güncellenir
+    display_name = models.CharField(max_length=160, blank=True, editable=False, verbose_name="Görünen Ad")
     
     class Meta:
         verbose_name = 'Fatura'
@@ -371,8 +400,72 @@ class Invoice(BaseModel):
         ordering = ['-created_at']
     
     def __str__(self):
+        return self.display_name or self.build_display_name()
+
+    def build_display_name(self):
         return f"{self.number} - {self.subscription.company.name}"
 
+    def save(self, *args, **kwargs):
+        self.display_name = self.build_display_name()
+        include_update_field(kwargs, 'display_name')
+        super().save(*args, **kwargs)
+
+class CompanyStatistics(BaseModel):
+    """
+    Şirket panelinde gösterilen sayaçların hazır tutulan kopyası.
+    Sayaçlar sinyallerle artımlı güncellenir (bkz. saas/statistics.py);
+    sapma olursa reconcile_company_statistics komutu tabloyu yeniden hesaplar.
+    """
+    company = models.OneToOneField(
+        Company,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='statistics',
+        verbose_name="Şirket"
+    )
+    total_branches = models.IntegerField(default=0, verbose_name="Şube Sayısı")
+    total_employees = models.IntegerField(default=0, verbose_name="Çalışan Sayısı")
+    active_employees = models.IntegerField(default=0, verbose_name="Aktif Çalışan Sayısı")
+    storage_used = models.BigIntegerField(default=0, verbose_name="Kullanılan Depolama (bytes)")
+    api_calls_today = models.IntegerField(default=0, verbose_name="Bugünkü API Çağrıları")
+    api_calls_date = models.DateField(null=True, blank=True, verbose_name="API Çağrı Tarihi")
+    total_invoices = models.IntegerField(default=0, verbose_name="Fatura Sayısı")
+    pending_invoices = models.IntegerField(default=0, verbose_name="Bekleyen Fatura Sayısı")
+    active_subscription = models.ForeignKey(
+        Subscription,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="Aktif Abonelik"
+    )
+    next_subscription_start = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Sonraki Abonelik Başlangıcı"
+    )
+
+    class Meta:
+        verbose_name = 'Şirket İstatistiği'
+        verbose_name_plural = 'Şirket İstatistikleri'
+
+    def __str__(self):
+        return f"{self.company_id} - İstatistikler"
+
+    def is_subscription_current(self, now=None):
+        """
+        Saklanan aktif abonelik bilgisi hâlâ geçerli mi?
+        Abonelik süresi dolduysa veya ileri tarihli bir abonelik başladıysa
+        yeniden hesaplanması gerekir.
+        """
+        now = now or timezone.now()
+        if self.next_subscription_start and self.next_subscription_start <= now:
+            return False
+        subscription = self.active_subscription
+        if subscription is None:
+            return True
+        return subscription.start_date <= now <= subscription.end_date
+
 class Notification(BaseModel):
     NOTIFICATION_TYPES = [
         ('info', 'Bilgi'),
@@ -437,11 +530,17 @@ class Notification(BaseModel):
         verbose_name = 'Bildirim'
         verbose_name_plural = 'Bildirimler'
         ordering = ['-created_at']
+        indexes = [
+            # Cursor sayfalama (created_at, id)
+            models.Index(fields=['-created_at', '-id'], name='saas_notification_cursor_idx'),
+        ]
     
     def __str__(self):
         return f"{self.get_notification_type_display()}: {self.title}"
 
 class NotificationRecipient(BaseModel):
+    STR_SELECT_RELATED = ('notification', 'user')  # __str__ içinde okunan ilişkiler
+
     notification = models.ForeignKey(
         Notification,
         on_delete=models.CASCADE,
@@ -462,15 +561,21 @@ class NotificationRecipient(BaseModel):
         verbose_name_plural = 'Bildirim Alıcıları'
         unique_together = ['notification', 'user']
         ordering = ['-notification__created_at']
+        indexes = [
+            # Kullanıcının bildirimleri için cursor sayfalama (created_at, id)
+            models.Index(fields=['user', '-created_at', '-id'], name='saas_recipient_cursor_idx'),
+        ]
     
     def __str__(self):
         return f"{self.notification.title} -> {self.user.get_full_name()}"
     
     def mark_as_read(self):
+        from .notifications import mark_read  # Circular import'u önlemek için
+
         if not self.is_read:
+            mark_read(self.user_id, [self.notification_id])
             self.is_read = True
             self.read_at = timezone.now()
-            self.save()
 
 class MaintenanceMode(BaseModel):
     PLATFORM_CHOICES = [
@@ -565,9 +670,10 @@ class MaintenanceMode(BaseModel):
             return not self.actual_end_time or self.actual_end_time > now
         return False
 
-    def can_access(self, user):
+    def can_access(self, user, tenant=None):
         """
-        Kullanıcının bakım sırasında erişim izni olup olmadığını kontrol eder
+        Kullanıcının bakım sırasında erişim izni olup olmadığını kontrol eder.
+        İstekte çözülmüş tenant bağlamı verilirse çalışan bilgisi için sorgu yapılmaz.
         """
         if not self.block_access:
             return True
@@ -587,26 +693,30 @@ class MaintenanceMode(BaseModel):
             return user.is_superuser
         elif access_level == 'staff':
             return user.is_staff
-        elif access_level == 'company_admin':
+
+        if tenant is None:
+            from .tenancy import resolve_tenant  # Circular import'u önlemek için
+            tenant = resolve_tenant(user)
+
+        if access_level == 'company_admin':
             # Kullanıcının şirket yöneticisi olup olmadığını kontrol et
-            if hasattr(user, 'employee'):
-                company = user.employee.branch.company
-                # Eğer allowed_companies belirtilmişse, şirketin izinli olup olmadığını kontrol et
-                if self.allowed_companies.exists():
-                    return (
-                        company.employees.filter(user=user, is_company_admin=True).exists() and
-                        self.allowed_companies.filter(id=company.id).exists()
-                    )
-                return company.employees.filter(user=user, is_company_admin=True).exists()
-            return False
+            if not tenant.is_company_admin:
+                return False
+            # Eğer allowed_companies belirtilmişse, şirketin izinli olup olmadığını kontrol et
+            return self.is_company_allowed(tenant.company_id)
         elif access_level == 'all':
             # Eğer allowed_companies belirtilmişse, kullanıcının şirketinin izinli olup olmadığını kontrol et
-            if self.allowed_companies.exists() and hasattr(user, 'employee'):
-                return self.allowed_companies.filter(id=user.employee.branch.company.id).exists()
-            return True
+            if not tenant.has_employee:
+                return True
+            return self.is_company_allowed(tenant.company_id)
         
         return False
 
+    def is_company_allowed(self, company_id):
+        """İzinli şirket listesi boşsa veya şirket listedeyse True döner (tek sorgu)"""
+        allowed = set(self.allowed_companies.values_list('id', flat=True))
+        return not allowed or company_id in allowed
+
     def start_maintenance(self):
         """Bakımı başlatır"""
         if self.status == 'scheduled':
@@ -714,8 +824,11 @@ class Announcement(BaseModel):
             return False
         return True
 
-    def can_view(self, user):
-        """Kullanıcının duyuruyu görüntüleme yetkisi var mı kontrol eder"""
+    def can_view(self, user, tenant=None):
+        """
+        Kullanıcının duyuruyu görüntüleme yetkisi var mı kontrol eder.
+        İstekte çözülmüş tenant bağlamı verilirse çalışan bilgisi için sorgu yapılmaz.
+        """
         if not user.is_authenticated:
             return False
 
@@ -727,59 +840,54 @@ class Announcement(BaseModel):
         if user.is_staff:
             return True
 
+        if tenant is None:
+            from .tenancy import resolve_tenant  # Circular import'u önlemek için
+            tenant = resolve_tenant(user)
+
         # Kullanıcının çalışan kaydı yoksa görüntüleyemez
-        if not hasattr(user, 'employee'):
+        if not tenant.has_employee:
             return False
 
-        employee = user.employee
-        company = employee.branch.company
-
         # Hedef şirketler belirtilmişse, kullanıcının şirketi kontrol edilir
-        if self.target_companies.exists():
-            if not self.target_companies.filter(id=company.id).exists():
-                return False
+        target_companies = set(self.target_companies.values_list('id', flat=True))
+        if target_companies and tenant.company_id not in target_companies:
+            return False
 
         # Hedef role göre kontrol
         target_role = self.target_role
         if target_role == 'all':
             return True
         elif target_role == 'company_admin':
-            return employee.is_company_admin
+            return tenant.is_company_admin
         elif target_role == 'branch_admin':
-            return employee.is_branch_admin
+            return tenant.is_branch_admin
         elif target_role == 'employee':
-            return employee.role == 'employee'
+            return tenant.role == 'employee'
         
         return False
 
     def create_notification(self):
-        """Duyuru için otomatik bildirim oluşturur"""
-        notification = Notification.objects.create(
+        """
+        Duyuru için bildirim oluşturur. Hedef şirketler okunduğundan duyuru
+        commit edildikten sonra, yayın tarihinde çağrılır
+        (notifications.publish_announcement); alıcılar duyurunun görünürlük
+        kuralıyla dağıtılır (announcements.announcement_recipients).
+        """
+        company = self.target_companies.first()
+        return Notification.objects.create(
             title=f"Yeni Duyuru: {self.title}",
             message=self.content,
             notification_type='info',
-            scope='all' if not self.target_companies.exists() else 'company',
+            scope='all' if company is None else 'company',
+            company=company,
             reference_model='Announcement',
             reference_id=self.id,
             created_by=self.created_by
         )
 
-        # Hedef şirketler varsa bildirime ekle
-        if self.target_companies.exists():
-            notification.company = self.target_companies.first()
-            notification.save()
-
-        return notification
-
-    def save(self, *args, **kwargs):
-        # Yeni oluşturuluyorsa bildirim gönder
-        is_new = not self.pk
-        super().save(*args, **kwargs)
-        
-        if is_new:
-            self.create_notification()
-
 class AnnouncementRead(BaseModel):
+    STR_SELECT_RELATED = ('announcement', 'user')  # __str__ içinde okunan ilişkiler
+
     announcement = models.ForeignKey(
         Announcement,
         on_delete=models.CASCADE,
@@ -879,6 +987,11 @@ class APIUsage(BaseModel):
         verbose_name = 'API Kullanımı'
         verbose_name_plural = 'API Kullanımları'
         unique_together = ['company', 'endpoint', 'method', 'date']
+        indexes = [
+            # Cursor sayfalama (date, id); şirket filtresiyle ve filtresiz
+            models.Index(fields=['-date', '-id'], name='saas_apiusage_cursor_idx'),
+            models.Index(fields=['company', '-date', '-id'], name='saas_apiusage_company_idx'),
+        ]
 
 class Integration(BaseModel):
     INTEGRATION_TYPES = [
@@ -1026,5 +1139,10 @@ class AuditLog(BaseModel):
         verbose_name = 'İşlem Kaydı'
         verbose_name_plural = 'İşlem Kayıtları'
         ordering = ['-created_at']
+        indexes = [
+            # Cursor sayfalama (created_at, id); şirket filtresiyle ve filtresiz
+            models.Index(fields=['-created_at', '-id'], name='saas_auditlog_cursor_idx'),
+            models.Index(fields=['company', '-created_at', '-id'], name='saas_auditlog_company_idx'),
+        ]
 
 
@@ -0,0 +1,386 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count, Exists, OuterRef, Q
+from django.utils import timezone
+
+from .announcements import announcement_recipients
+from .models import Announcement, Notification, NotificationRecipient
+from .streams import publish
+
+logger = logging.getLogger(__name__)
+
+# Alıcılar bu boyutta partiler halinde okunup tek INSERT ile yazılır
+FANOUT_BATCH_SIZE = 5000
+
+# Celery kullanılamadığında dağıtımı yapan süreç içi iş parçacığı sayısı
+FANOUT_WORKERS = 2
+
+# Okunmamış bildirim sayaçları; anahtar yoksa sayı veritabanından hesaplanır
+UNREAD_KEY = 'saas:notifications:unread:{}'
+UNREAD_TIMEOUT = 7 * 24 * 3600
+RECONCILE_BATCH_SIZE = 5000
+
+# Aynı bildirimin dağıtımını yapan çalıştırmayı işaretleyen kilit
+FANOUT_LOCK_KEY = 'saas:notifications:fanout:{}'
+FANOUT_LOCK_TIMEOUT = 600
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def recipient_queryset(notification):
+    """
+    Bildirimin kapsamındaki aktif kullanıcılar (tek sorgu).
+    'user' kapsamındaki bildirimlerin hedefi bildirimde tutulmadığından
+    alıcıları oluşturan tarafından verilir. Duyuru bildirimleri duyuruyu
+    görebilecek kullanıcılara gider (duyuru ayrıca okunur).
+    """
+    if notification.reference_model == 'Announcement':
+        announcement = Announcement.objects.filter(pk=notification.reference_id).first()
+        if announcement is None:
+            return User.objects.none()
+        return announcement_recipients(announcement)
+
+    users = User.objects.filter(is_active=True)
+    scope = notification.scope
+    if scope == 'all':
+        return users
+    if scope == 'company' and notification.company_id:
+        return users.filter(
+            employee__is_active=True,
+            employee__branch__company_id=notification.company_id
+        )
+    if scope == 'branch' and notification.branch_id:
+        return users.filter(
+            employee__is_active=True,
+            employee__branch_id=notification.branch_id
+        )
+    return users.none()
+
+
+def _unread_key(user_id):
+    return UNREAD_KEY.format(user_id)
+
+
+def count_unread(user_id):
+    """Kullanıcının okunmamış bildirim sayısı (veritabanından)"""
+    return NotificationRecipient.objects.filter(user_id=user_id, is_read=False).count()
+
+
+def get_unread_count(user_id):
+    """
+    Kullanıcının okunmamış bildirim sayısı. Sayaç cache'te tutulur;
+    yoksa veritabanından hesaplanıp yazılır.
+    """
+    key = _unread_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = count_unread(user_id)
+        # Bu arada başka bir istek sayacı yazdıysa onunki korunur
+        cache.add(key, count, UNREAD_TIMEOUT)
+    return max(count, 0)
+
+
+def adjust_unread(deltas):
+    """
+    Cache'te bulunan sayaçları ({kullanıcı id: değişim}) atomik olarak
+    artırır/azaltır. Sayacı olmayan kullanıcılara dokunulmaz, ilk okumada
+    baştan hesaplanır.
+    """
+    keys = {_unread_key(user_id): delta for user_id, delta in deltas.items() if delta}
+    for key in cache.get_many(keys):
+        try:
+            cache.incr(key, keys[key])
+        except ValueError:  # Anahtar bu arada düştü
+            pass
+
+
+def forget_unread(user_ids):
+    """Sayaçları siler; bir sonraki okumada veritabanından hesaplanır"""
+    cache.delete_many([_unread_key(user_id) for user_id in user_ids])
+
+
+def mark_read(user_id, notification_ids=None):
+    """
+    Kullanıcının okunmamış bildirimlerini (verilirse yalnızca bu
+    bildirimleri) tek UPDATE ile okundu yapar; yalnızca okunma sütunları
+    yazılır. Sayaç güncellenen satır sayısı kadar düşülür ve bu sayı döner.
+    """
+    recipients = NotificationRecipient.objects.filter(user_id=user_id, is_read=False)
+    if notification_ids is not None:
+        recipients = recipients.filter(notification_id__in=notification_ids)
+    now = timezone.now()
+    updated = recipients.update(is_read=True, read_at=now, updated_at=now)
+    adjust_unread({user_id: -updated})
+    return updated
+
+
+def reconcile_unread_counts(batch_size=RECONCILE_BATCH_SIZE):
+    """
+    Cache'teki sayaçları veritabanıyla karşılaştırır ve sapanları düzeltir.
+    Yalnızca sayacı bulunan kullanıcılar hesaplanır; (kontrol edilen,
+    düzeltilen) sayısı döner.
+    """
+    checked, changed = 0, 0
+    user_ids = User.objects.order_by('id').values_list('id', flat=True)
+    last_id = 0
+    while True:
+        batch = list(user_ids.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            break
+        last_id = batch[-1]
+
+        cached = cache.get_many([_unread_key(user_id) for user_id in batch])
+        if not cached:
+            continue
+        cached_ids = [user_id for user_id in batch if _unread_key(user_id) in cached]
+        actual = dict(
+            NotificationRecipient.objects.filter(user_id__in=cached_ids, is_read=False)
+            .order_by().values_list('user_id').annotate(count=Count('id'))
+        )
+        fixed = {
+            _unread_key(user_id): actual.get(user_id, 0)
+            for user_id in cached_ids
+            if cached[_unread_key(user_id)] != actual.get(user_id, 0)
+        }
+        if fixed:
+            cache.set_many(fixed, UNREAD_TIMEOUT)
+        checked += len(cached_ids)
+        changed += len(fixed)
+    return checked, changed
+
+
+def stream_event(notification):
+    """Bildirimin akışa gönderilen olay adı ve içeriği"""
+    event = 'announcement' if notification.reference_model == 'Announcement' else 'notification'
+    return event, {
+        'id': notification.id,
+        'title': notification.title,
+        'message': notification.message,
+        'notification_type': notification.notification_type,
+        'scope': notification.scope,
+        'reference_model': notification.reference_model,
+        'reference_id': notification.reference_id,
+        'created_at': notification.created_at,
+    }
+
+
+def _create_recipients(notification, user_ids, exclusive=True):
+    NotificationRecipient.objects.bulk_create(
+        [NotificationRecipient(notification_id=notification.id, user_id=user_id) for user_id in user_ids],
+        batch_size=FANOUT_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    if exclusive:
+        adjust_unread(dict.fromkeys(user_ids, 1))
+    else:
+        # Aynı bildirimi dağıtan başka bir çalıştırma var; hangi satırların bu
+        # çalıştırmada eklendiği bilinmediğinden sayaçlar yeniden hesaplanır
+        forget_unread(user_ids)
+    event, data = stream_event(notification)
+    publish(user_ids, event, data, event_id=notification.id)
+
+
+def fan_out(notification_id, batch_size=FANOUT_BATCH_SIZE):
+    """
+    Bildirimin eksik alıcı kayıtlarını oluşturur ve oluşturulan sayısını döner.
+    Kullanıcı id'leri id sırasıyla partiler halinde okunur, her parti tek
+    INSERT ile yazılır, alıcıların okunmamış sayaçları artırılır ve bağlı
+    istemcilere akıştan bildirilir. Mevcut alıcılar sorguda elendiğinden
+    tekrar çalıştırılabilir. Aynı anda çalışan dağıtımlardan yalnızca kilidi
+    alan sayaçları artırır, diğerleri sayaçları siler.
+    """
+    notification = Notification.objects.filter(pk=notification_id).first()
+    if notification is None:
+        return 0
+
+    lock_key = FANOUT_LOCK_KEY.format(notification_id)
+    exclusive = cache.add(lock_key, True, FANOUT_LOCK_TIMEOUT)
+    try:
+        users = (
+            recipient_queryset(notification)
+            .exclude(notifications__notification_id=notification_id)
+            .order_by('id').values_list('id', flat=True)
+        )
+        total, last_id = 0, 0
+        while True:
+            user_ids = list(users.filter(id__gt=last_id)[:batch_size])
+            if not user_ids:
+                break
+            _create_recipients(notification, user_ids, exclusive)
+            total += len(user_ids)
+            last_id = user_ids[-1]
+        return total
+    finally:
+        if exclusive:
+            cache.delete(lock_key)
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=FANOUT_WORKERS, thread_name_prefix='notification-fanout'
+            )
+        return _executor
+
+
+def _send_to_celery(task_name, *args, eta=None):
+    """Görevi kuyruğa gönderir; Celery veya broker yoksa False döner"""
+    from . import tasks
+    task = getattr(tasks, task_name)
+    if not hasattr(task, 'apply_async'):  # Celery kurulu değil
+        return False
+    try:
+        task.apply_async(args, eta=eta, retry=False)
+    except Exception:
+        logger.warning('Celery broker\'a ulaşılamadı, %s%r süreç içinde çalıştırılacak', task_name, args)
+        return False
+    return True
+
+
+def _run_in_background(func, *args):
+    close_old_connections()
+    try:
+        func(*args)
+    except Exception:
+        logger.exception('%s%r arka planda çalıştırılamadı', func.__name__, args)
+    finally:
+        connection.close()
+
+
+def _submit(func, *args):
+    """func(*args) çağrısını süreç içi iş parçacığı havuzunda çalıştırır"""
+    _get_executor().submit(_run_in_background, func, *args)
+
+
+def _fan_out_backend():
+    return getattr(settings, 'NOTIFICATION_FANOUT_BACKEND', 'thread')
+
+
+def _dispatch_fan_out(notification_id):
+    # Broker bağlantısı da isteği bekletmesin diye havuzda denenir
+    if _fan_out_backend() == 'celery' and _send_to_celery('fan_out_notification', notification_id):
+        return
+    fan_out(notification_id)
+
+
+def dispatch_fan_out(notification_id):
+    """
+    Dağıtımı istek dışında başlatır: NOTIFICATION_FANOUT_BACKEND 'celery' ise
+    görev kuyruğa gönderilir, gönderilemezse veya 'thread' ise dağıtım süreç
+    içi iş parçacığı havuzunda yapılır.
+    """
+    _submit(_dispatch_fan_out, notification_id)
+
+
+def schedule_fan_out(notification_id):
+    """Dağıtımı transaction commit edildikten sonra başlatır"""
+    transaction.on_commit(lambda: dispatch_fan_out(notification_id))
+
+
+# Duyuru bildirimleri: duyuru kaydedilip commit edildikten sonra, yayın tarihi
+# geldiğinde oluşturulur. Celery'de görev yayın tarihine ertelenir; diğer
+# durumlarda (veya görev kaybolursa) periyodik tarama yayına girenleri yakalar.
+
+# Taramanın bildirimi eksik duyuruları aradığı geriye dönük süre; daha eski
+# duyurular (ör. bu mekanizmadan önce oluşturulanlar) için bildirim oluşturulmaz
+ANNOUNCEMENT_PUBLISH_WINDOW = timedelta(days=1)
+
+# Aynı duyurunun bildirimini oluşturan çalıştırmayı işaretleyen kilit
+ANNOUNCEMENT_LOCK_KEY = 'saas:announcements:publish:{}'
+ANNOUNCEMENT_LOCK_TIMEOUT = 60
+
+
+def published_announcements(now=None):
+    """Yayın tarihi gelmiş ve bitmemiş duyurular"""
+    now = now or timezone.now()
+    return Announcement.objects.filter(
+        Q(end_date__isnull=True) | Q(end_date__gte=now),
+        publish_date__lte=now,
+    )
+
+
+def _has_notification(announcement_id):
+    return Notification.objects.filter(
+        reference_model='Announcement', reference_id=announcement_id
+    ).exists()
+
+
+def publish_announcement(announcement_id, now=None):
+    """
+    Yayındaki duyurunun bildirimini (henüz yoksa) oluşturur ve döndürür;
+    duyuru silinmiş, yayına girmemiş veya bildirimi varsa None döner.
+    Alıcılara dağıtım, bildirim kaydedildiğinde commit'ten sonra başlar.
+    """
+    announcement = published_announcements(now).filter(pk=announcement_id).first()
+    if announcement is None:
+        return None
+
+    lock_key = ANNOUNCEMENT_LOCK_KEY.format(announcement_id)
+    if not cache.add(lock_key, True, ANNOUNCEMENT_LOCK_TIMEOUT):
+        return None
+    try:
+        with transaction.atomic():
+            if _has_notification(announcement_id):
+                return None
+            return announcement.create_notification()
+    finally:
+        cache.delete(lock_key)
+
+
+def publish_due_announcements(now=None):
+    """
+    Son ANNOUNCEMENT_PUBLISH_WINDOW içinde yayına girmiş, bildirimi
+    oluşturulmamış duyuruların bildirimlerini oluşturur; oluşturulan sayısı döner.
+    """
+    now = now or timezone.now()
+    notified = Notification.objects.filter(
+        reference_model='Announcement', reference_id=OuterRef('pk')
+    )
+    announcement_ids = (
+        published_announcements(now)
+        .filter(publish_date__gt=now - ANNOUNCEMENT_PUBLISH_WINDOW)
+        .exclude(Exists(notified))
+        .order_by('publish_date').values_list('id', flat=True)
+    )
+    return sum(publish_announcement(announcement_id, now) is not None for announcement_id in announcement_ids)
+
+
+def _dispatch_announcement(announcement_id):
+    if _fan_out_backend() == 'celery' and _send_to_celery('publish_announcement_notification', announcement_id):
+        return
+    publish_announcement(announcement_id)
+
+
+def _defer_announcement(announcement_id, publish_date):
+    _send_to_celery('publish_announcement_notification', announcement_id, eta=publish_date)
+
+
+def dispatch_announcement(announcement_id, publish_date):
+    """
+    Duyuru bildirimini istek dışında oluşturur. Yayın tarihi gelmemişse
+    Celery görevi o ana ertelenir; Celery kullanılamıyorsa bildirimi
+    periyodik tarama (publish_due_announcements) oluşturur.
+    """
+    if publish_date <= timezone.now():
+        _submit(_dispatch_announcement, announcement_id)
+    elif _fan_out_backend() == 'celery':
+        _submit(_defer_announcement, announcement_id, publish_date)
+
+
+def schedule_announcement(announcement):
+    """
+    Bildirimi duyuru commit edildikten sonra planlar. Hedef şirketler alıcıları
+    belirlediğinden duyuruyla aynı transaction içinde yazılmalıdır.
+    """
+    announcement_id, publish_date = announcement.pk, announcement.publish_date
+    transaction.on_commit(lambda: dispatch_announcement(announcement_id, publish_date))
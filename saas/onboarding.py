@@ -0,0 +1,195 @@
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.mail import mail_admins
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .caching import VersionedValue, bump_version_on_commit
+from .models import Branch, Company, CompanyStatistics, Plan, Subscription
+from .response_cache import invalidate_responses
+from .slugs import allocate_slugs
+from .statistics import build_company_statistics
+
+PLANS_NAMESPACE = 'plans'
+
+TRIAL_PLAN_ID = 1  # Deneme planı (ID: 1)
+TRIAL_DAYS = 30
+
+# Toplu kayıtta tek istekte kabul edilen en fazla şirket sayısı
+BULK_REGISTER_LIMIT = 500
+BULK_BATCH_SIZE = 250
+
+# Eşzamanlı kayıtlarda şirket slug'ı çakışırsa yeniden deneme sayısı
+BULK_REGISTER_ATTEMPTS = 3
+
+
+class BulkRegisterConflict(Exception):
+    """
+    Toplu kayıt sırasında bazı satırlar başka bir kayıtla çakıştığında fırlatılır.
+    errors, doğrulama hatalarıyla aynı biçimde satır başına hata sözlükleridir.
+    """
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+@dataclass
+class OnboardingResult:
+    company: Company
+    branch: Branch
+    subscription: Subscription
+
+
+def _load_trial_plan():
+    return Plan.objects.select_related('currency').filter(id=TRIAL_PLAN_ID).first()
+
+
+_trial_plan = VersionedValue(PLANS_NAMESPACE, _load_trial_plan)
+
+
+def invalidate_plans():
+    bump_version_on_commit(PLANS_NAMESPACE)
+
+
+def get_trial_plan():
+    """
+    Deneme planını döndürür; plan süreç içinde tutulur ve değiştiğinde yenilenir.
+    Plan bulunamazsa yöneticilere e-posta gönderilir ve hata fırlatılır.
+    """
+    trial_plan = _trial_plan.get()
+    if trial_plan is None:
+        error_message = f"ID'si {TRIAL_PLAN_ID} olan deneme planı bulunamadı."
+        mail_admins("Deneme Planı Hatası", error_message)
+        raise ObjectDoesNotExist(error_message)
+    return trial_plan
+
+
+def build_main_branch(company):
+    """Şirketin merkez şubesini (kaydetmeden) hazırlar"""
+    return Branch(
+        company=company,
+        name=f"{company.name} Merkez",
+        is_main_branch=True,
+        phone=company.phone,
+        email=company.email,
+        address=company.address,
+        neighborhood_id=company.neighborhood_id
+    )
+
+
+def build_trial_subscription(company, trial_plan, now=None):
+    """Şirketin deneme aboneliğini (kaydetmeden) hazırlar"""
+    now = now or timezone.now()
+    return Subscription(
+        company=company,
+        plan=trial_plan,
+        status='active',
+        start_date=now,
+        end_date=now + timedelta(days=TRIAL_DAYS)
+    )
+
+
+def provision_company(company):
+    """
+    Yeni kaydedilmiş şirket için merkez şube, deneme aboneliği ve istatistik
+    satırı oluşturur. Company.save tarafından aynı transaction içinde çağrılır.
+    """
+    trial_plan = get_trial_plan()
+    with transaction.atomic():
+        branch = build_main_branch(company)
+        branch.save()
+        subscription = build_trial_subscription(company, trial_plan)
+        subscription.save()
+        build_company_statistics(company, subscription=subscription).save(force_insert=True)
+    return OnboardingResult(company, branch, subscription)
+
+
+def register_company(data):
+    """
+    Doğrulanmış veriden şirket, merkez şube ve deneme aboneliği oluşturur.
+    Tüm adımlar tek transaction içindedir; biri başarısız olursa hiçbiri kalmaz.
+    """
+    get_trial_plan()  # Plan yoksa şirket oluşturulmadan hata ver
+    with transaction.atomic():
+        company = Company(**data)
+        company.is_active = True
+        company.save(provision=False)
+        return provision_company(company)
+
+
+def bulk_register_companies(rows, batch_size=BULK_BATCH_SIZE):
+    """
+    Çok sayıda şirketi toplu insert ile kaydeder (bayi içe aktarımları için).
+
+    Şirket slug'ları tek seferde ayrılır; yeni şirketlerin şubesi olmadığından
+    şube slug'ları için veritabanına gidilmez. Sorgu sayısı şirket sayısından
+    bağımsızdır: slug kontrolü ve tablo başına birkaç insert.
+
+    Doğrulamadan sonra başka bir istek aynı vergi numarasını kaydetmişse
+    BulkRegisterConflict fırlatılır; şirket slug'ı çakışmışsa slug'lar yeniden
+    ayrılıp kayıt tekrar denenir.
+    """
+    trial_plan = get_trial_plan()
+    now = timezone.now()
+
+    for attempt in range(BULK_REGISTER_ATTEMPTS):
+        try:
+            return _bulk_register(rows, trial_plan, now, batch_size)
+        except IntegrityError:
+            # Doğrulamadan sonra aynı vergi numarasıyla kayıt yapılmış olabilir
+            errors = _tax_number_conflicts(rows)
+            if any(errors):
+                raise BulkRegisterConflict(errors)
+            # Aksi halde slug yarışıdır; slug'lar yeniden ayrılarak tekrar denenir
+            if attempt == BULK_REGISTER_ATTEMPTS - 1:
+                raise
+
+
+def _tax_number_conflicts(rows):
+    """Vergi numarası artık kayıtlı olan satırlar için hata listesi döndürür"""
+    existing = set(
+        Company.objects.filter(
+            tax_number__in=[row['tax_number'] for row in rows]
+        ).values_list('tax_number', flat=True)
+    )
+    return [
+        {'tax_number': ['Bu vergi numarası ile kayıtlı bir şirket zaten var.']}
+        if row['tax_number'] in existing else {}
+        for row in rows
+    ]
+
+
+def _bulk_register(rows, trial_plan, now, batch_size):
+    companies = [Company(**row, is_active=True) for row in rows]
+    with transaction.atomic():
+        allocate_slugs(companies)
+        Company.objects.bulk_create(companies, batch_size=batch_size)
+
+        branches = allocate_slugs(
+            [build_main_branch(company) for company in companies],
+            check_existing=False
+        )
+        Branch.objects.bulk_create(branches, batch_size=batch_size)
+
+        subscriptions = [
+            build_trial_subscription(company, trial_plan, now)
+            for company in companies
+        ]
+        Subscription.objects.bulk_create(subscriptions, batch_size=batch_size)
+
+        CompanyStatistics.objects.bulk_create([
+            build_company_statistics(company, subscription=subscription)
+            for company, subscription in zip(companies, subscriptions)
+        ], batch_size=batch_size)
+
+        # bulk_create sinyal göndermediğinden yanıt önbelleği elle geçersiz kılınır
+        for model in (Company, Branch, Subscription, CompanyStatistics):
+            invalidate_responses(model)
+
+    return [
+        OnboardingResult(company, branch, subscription)
+        for company, branch, subscription in zip(companies, branches, subscriptions)
+    ]
@@ -0,0 +1,133 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Sıralama alanlarının tamamı üzerinden (ör. created_at, id) keyset sayfalama.
+
+    Cursor son satırın sıralama değerlerini taşır; sonraki sayfa
+    "created_at <= x AND (created_at < x OR id < y)" koşuluyla bileşik indeksten
+    okunur. COUNT(*) ve OFFSET yapılmadığından her sayfanın maliyeti aynıdır.
+    DRF'in CursorPagination'ından farklı olarak yalnızca ilk alanı değil tüm
+    alanları kullanır; aynı tarihli çok sayıda satırda da offset taraması olmaz.
+    Sıralama sabittir, OrderingFilter ile birlikte kullanılmamalıdır.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = DEFAULT_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.fields = [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+
+        position, reverse = self.decode_cursor(request)
+        queryset = self._load_ordering_fields(queryset).order_by(*self._ordering(reverse))
+        if position is not None:
+            queryset = queryset.filter(self._after(position, reverse))
+
+        # Bir fazla satır okunarak sonraki sayfanın varlığı COUNT yapmadan anlaşılır
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        return self.page
+
+    def _load_ordering_fields(self, queryset):
+        """only() ile daraltılmış sorguda cursor alanlarının da okunmasını sağlar"""
+        field_names, defer = queryset.query.deferred_loading
+        if field_names and not defer:
+            queryset = queryset.only(*field_names, *(name for name, _ in self.fields))
+        return queryset
+
+    def _ordering(self, reverse):
+        return [
+            f'-{name}' if descending != reverse else name
+            for name, descending in self.fields
+        ]
+
+    def _after(self, position, reverse):
+        """Cursor'dan sonra gelen satırlar için koşul"""
+        def lookup(name, descending, inclusive=False):
+            operator = 'lt' if descending != reverse else 'gt'
+            return f'{name}__{operator}{"e" if inclusive else ""}'
+
+        first, first_descending = self.fields[0]
+        condition = Q()
+        for index, (name, descending) in enumerate(self.fields):
+            equal = {prior: position[i] for i, (prior, _) in enumerate(self.fields[:index])}
+            condition |= Q(**equal, **{lookup(name, descending): position[index]})
+        # İlk alandaki aralık koşulu indeks taramasını sınırlar
+        return Q(**{lookup(first, first_descending, inclusive=True): position[0]}) & condition
+
+    def get_position(self, instance):
+        return [
+            self.model._meta.get_field(name).value_to_string(instance)
+            for name, _ in self.fields
+        ]
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        encoded = urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            padding = '=' * (-len(encoded) % 4)
+            payload = json.loads(urlsafe_b64decode(encoded + padding))
+            raw_position, reverse = payload['p'], bool(payload.get('r'))
+            if len(raw_position) != len(self.fields):
+                raise ValueError
+            position = [
+                self.model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(self.fields, raw_position)
+            ]
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if any(value is None for value in position):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+
+
+class CreatedAtCursorPagination(KeysetPagination):
+    """En yeni kayıt önce: (created_at, id)"""
+    ordering = ('-created_at', '-id')
+
+
+class DateCursorPagination(KeysetPagination):
+    """En yeni gün önce: (date, id)"""
+    ordering = ('-date', '-id')
@@ -0,0 +1,231 @@
+from dataclasses import dataclass
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+from .fieldsets import ALL_FIELDS, FieldSelection
+
+# ?fields= / ?expand= seçimleri de planlandığından önbellek sınırlıdır
+PLAN_CACHE_SIZE = 1024
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    """
+    Bir serializer'ın okuduğu ilişkiler ve sütunlar için sorgu planı.
+    select_related tek JOIN'li sorguya, prefetch_related ilişki başına bir
+    ek sorguya çevrilir; böylece liste sorgu sayısı sayfa boyutundan bağımsızdır.
+    """
+    select_related: tuple = ()
+    prefetch_related: tuple = ()
+    only: tuple = ()
+
+    def apply(self, queryset, restrict_fields=True):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if restrict_fields and self.only:
+            queryset = queryset.only(*self.only)
+        return queryset
+
+
+def _join(*parts):
+    return '__'.join(part for part in parts if part)
+
+
+def _concrete_fields(model):
+    return [field.name for field in model._meta.concrete_fields]
+
+
+class QueryPlanner:
+    """
+    Serializer alanlarının kaynaklarını (ör. 'branch.company.name') model
+    ilişkileri üzerinde yürüyerek planı çıkarır.
+
+    * Tekil ilişkiler (FK, one-to-one) select_related ile, çoğul ilişkiler
+      (M2M, ters FK) ve onların altındaki ilişkiler prefetch_related ile alınır.
+    * Okunan sütunlar only() ile sınırlanır. Metot ve property'ler (__str__,
+      get_full_name, SerializerMethodField...) hangi sütunu okuduğu
+      bilinmediğinden ilgili modelin tüm sütunlarını yükletir.
+    * Modeller __str__ içinde okudukları ilişkileri STR_SELECT_RELATED ile belirtir.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.select = set()
+        self.prefetch = set()
+        self.columns = set()
+        self.full_paths = {}  # yol -> model; tüm sütunlar yüklenir
+        self.restrictable = True
+
+    def plan(self, serializer):
+        self.visit_serializer(serializer, self.model, '', many=False)
+        return QueryPlan(
+            select_related=tuple(sorted(self.select)),
+            prefetch_related=tuple(sorted(self.prefetch)),
+            only=self.only_fields(),
+        )
+
+    def only_fields(self):
+        if not self.restrictable:
+            return ()
+        columns = set(self.columns) | {self.model._meta.pk.name}
+        for path, model in self.full_paths.items():
+            columns.update(_join(path, name) for name in _concrete_fields(model))
+        # select_related ile gezilen FK'ler ertelenemez
+        columns.update(
+            path for path in self.select
+            if not self._is_reverse(path)
+        )
+        return tuple(sorted(columns))
+
+    def _is_reverse(self, path):
+        model = self.model
+        for name in path.split('__'):
+            field = model._meta.get_field(name)
+            if not field.concrete:
+                return True
+            model = field.related_model
+        return False
+
+    def visit_serializer(self, serializer, model, path, many):
+        for field in serializer.fields.values():
+            if field.write_only:
+                continue
+            self.visit_field(field, model, path, many)
+
+    def visit_field(self, field, model, path, many):
+        if field.source == '*':
+            if isinstance(field, serializers.BaseSerializer):
+                self.visit_serializer(field, model, path, many)
+            else:
+                self.mark_full(path, model, many)
+            return
+
+        parts = field.source.split('.')
+        for position, name in enumerate(parts):
+            last = position == len(parts) - 1
+            try:
+                model_field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                self.visit_attribute(name, model, path, many)
+                return
+
+            if not model_field.is_relation:
+                if not many:
+                    self.columns.add(_join(path, name))
+                return
+
+            related_path = _join(path, name)
+            related_model = model_field.related_model
+            if model_field.many_to_many or model_field.one_to_many:
+                many = True
+
+            if last and self._reads_pk_only(field):
+                # PrimaryKeyRelatedField yalnızca FK sütununu okur, JOIN gerekmez
+                if many:
+                    self.prefetch.add(related_path)
+                elif model_field.concrete:
+                    self.columns.add(related_path)
+                else:
+                    self.select.add(related_path)
+                return
+
+            if many:
+                self.prefetch.add(related_path)
+            else:
+                self.select.add(related_path)
+            model, path = related_model, related_path
+
+        # Kaynak bir ilişkinin kendisi: iç içe serializer veya str(nesne)
+        child = getattr(field, 'child', field)
+        if isinstance(child, serializers.BaseSerializer):
+            self.visit_serializer(child, model, path, many)
+        else:
+            self.visit_attribute('__str__', model, path, many)
+
+    @staticmethod
+    def _reads_pk_only(field):
+        relation = getattr(field, 'child_relation', field)
+        return (
+            isinstance(relation, serializers.RelatedField)
+            and relation.use_pk_only_optimization()
+        )
+
+    def visit_attribute(self, name, model, path, many):
+        """Model alanı olmayan bir öznitelik (metot/property) okunuyor"""
+        if name.startswith('get_') and name.endswith('_display'):
+            field_name = name[len('get_'):-len('_display')]
+            if not many:
+                self.columns.add(_join(path, field_name))
+            return
+
+        self.mark_full(path, model, many)
+        if name == '__str__':
+            for lookup in getattr(model, 'STR_SELECT_RELATED', ()):
+                self.add_relation_chain(model, path, lookup, many)
+
+    def add_relation_chain(self, model, path, lookup, many):
+        """'district__city' gibi bir ilişki zincirini tüm sütunlarıyla ekler"""
+        for name in lookup.split('__'):
+            model_field = model._meta.get_field(name)
+            path = _join(path, name)
+            model = model_field.related_model
+            if model_field.many_to_many or model_field.one_to_many:
+                many = True
+            (self.prefetch if many else self.select).add(path)
+            self.mark_full(path, model, many)
+
+    def mark_full(self, path, model, many):
+        if many:
+            return
+        if not path:
+            self.restrictable = False
+        else:
+            self.full_paths[path] = model
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def build_query_plan(serializer_class, model, selection=ALL_FIELDS):
+    """Serializer sınıfı ve alan seçimi için planı bir kez hesaplar ve saklar"""
+    return QueryPlanner(model).plan(selection.apply(serializer_class()))
+
+
+class QueryPlanMixin:
+    """
+    ViewSet'in queryset'ine serializer'dan çıkarılan select_related /
+    prefetch_related / only() planını uygular.
+
+    Plan serializer sınıfı başına bir kez hesaplanır. only() yalnızca okuma
+    isteklerinde uygulanır; yazma isteklerinde tüm sütunlar yüklenir.
+    query_plan_extra ile serializer'dan çıkarılamayan ilişkiler eklenebilir.
+
+    Okuma isteklerinde ?fields= ve ?expand= serializer'ı budar; plan da budanmış
+    serializer'dan çıkarıldığından JOIN'ler ve sütunlar yanıtla birlikte azalır.
+    """
+    query_plan_extra = QueryPlan()
+
+    def get_field_selection(self):
+        request = getattr(self, 'request', None)
+        if request is None or request.method not in SAFE_METHODS:
+            return ALL_FIELDS
+        return FieldSelection.from_request(request)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        return self.get_field_selection().apply(serializer)
+
+    def get_query_plan(self, queryset):
+        return build_query_plan(
+            self.get_serializer_class(), queryset.model, self.get_field_selection()
+        )
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        request = getattr(self, 'request', None)
+        restrict_fields = request is None or request.method in SAFE_METHODS
+        queryset = self.get_query_plan(queryset).apply(queryset, restrict_fields)
+        return self.query_plan_extra.apply(queryset, restrict_fields=False)
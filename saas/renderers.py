@@ -0,0 +1,87 @@
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+# Tarihler DRF'in biçimiyle (milisaniye, 'Z') yazılsın diye kodlayıcıya bırakılır
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+# Decimal, datetime, tembel çeviri metinleri, QuerySet vb. DRF'teki gibi kodlanır
+_default = encoders.JSONEncoder().default
+
+# DRF'in JSONRenderer'ı gibi satır/paragraf ayırıcıları kaçışlanır
+_LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+STREAM_BATCH_SIZE = 500
+
+
+def dumps(data):
+    """
+    Veriyi DRF'in JSONRenderer'ı ile aynı biçimde, orjson ile kodlar.
+    Farklar yalnızca float'lardadır: üslü sayılar farklı yazılır (DRF 1e-07,
+    orjson 1e-7; değer aynıdır), NaN ve sonsuz değerler DRF'te ValueError
+    fırlatırken orjson null yazar. saas modellerinde float alan yoktur;
+    float döndüren bir alan eklenirse NaN/sonsuz değerler serializer'da
+    reddedilmelidir.
+    """
+    content = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+    if b'\xe2\x80' in content:
+        for separator, escaped in _LINE_SEPARATORS:
+            content = content.replace(separator, escaped)
+    return content
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    orjson ile çalışan JSON renderer. Çıktı, float farkları (bkz. dumps) dışında DRF'in
+    JSONRenderer'ı ile aynıdır (sıkışık, UTF-8); girintili çıktı istenirse (ör. browsable API) veya
+    orjson'ın desteklemediği bir değer gelirse DRF'in renderer'ına dönülür.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            return dumps(data)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+    def can_stream(self, accepted_media_type, renderer_context=None):
+        return not self.get_indent(accepted_media_type, renderer_context or {})
+
+    def render_stream(self, rows, batch_size=STREAM_BATCH_SIZE):
+        """
+        Liste öğelerini parça parça JSON dizisi olarak üretir. Gövde bellekte
+        bütün olarak tutulmaz; StreamingHttpResponse ile gönderilir.
+        """
+        yield b'['
+        batch = []
+        first = True
+        for row in rows:
+            batch.append(dumps(row))
+            if len(batch) >= batch_size:
+                yield (b'' if first else b',') + b','.join(batch)
+                batch, first = [], False
+        if batch:
+            yield (b'' if first else b',') + b','.join(batch)
+        yield b']'
+
+
+class ORJSONParser(JSONParser):
+    """orjson ile çalışan JSON parser"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            data = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                data = data.decode(encoding)
+            return orjson.loads(data)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
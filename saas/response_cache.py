@@ -0,0 +1,198 @@
+import hashlib
+
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import HttpResponse
+from rest_framework.response import Response
+
+from .caching import bump_version_on_commit, get_versions
+from .conditional import view_fingerprint_spec
+from .models import (
+    APIUsage, AuditLog, Branch, Company, CompanyBranding, CompanyStatistics,
+    Employee, FileStorage, Integration, Invoice, Notification, Subscription
+)
+from .renderers import ORJSONRenderer
+
+RESPONSE_KEY = 'saas:response:{}:{}'
+RESPONSE_CACHE_TIMEOUT = 300
+
+# Sürüm kapsamları: şirket id'si, tüm şirketleri gören yanıtlar için ALL_SCOPE,
+# bir şirkete bağlanamayan değişiklikler (plan, konum, kullanıcı) için SHARED_SCOPE
+ALL_SCOPE = 'all'
+SHARED_SCOPE = 'shared'
+
+# Kaydın ait olduğu şirket (ORM lookup'ı)
+COMPANY_LOOKUPS = {
+    Company: 'id',
+    Branch: 'company_id',
+    Employee: 'branch__company_id',
+    Subscription: 'company_id',
+    Invoice: 'subscription__company_id',
+    CompanyStatistics: 'company_id',
+    Notification: 'company_id',
+    CompanyBranding: 'company_id',
+    APIUsage: 'company_id',
+    Integration: 'company_id',
+    FileStorage: 'company_id',
+    AuditLog: 'company_id',
+}
+
+
+def _namespace(model, scope):
+    return f'response:{model._meta.label_lower}:{scope}'
+
+
+def invalidate_responses(model, company_id=None):
+    """
+    Modele bağlı önbellekteki yanıtları commit'ten sonra geçersiz kılar.
+    company_id verilirse yalnızca o şirketin ve tüm şirketleri gören yanıtlar,
+    verilmezse modelin bütün yanıtları etkilenir.
+    """
+    if company_id is None:
+        bump_version_on_commit(_namespace(model, SHARED_SCOPE))
+    else:
+        bump_version_on_commit(_namespace(model, company_id))
+        bump_version_on_commit(_namespace(model, ALL_SCOPE))
+
+
+def company_of(instance):
+    """Kaydın şirket id'si; şirkete bağlı olmayan modellerde veya bulunamazsa None"""
+    lookup = COMPANY_LOOKUPS.get(type(instance))
+    if lookup is None:
+        return None
+    value = instance
+    try:
+        for name in lookup.split('__'):
+            value = getattr(value, name)
+            if value is None:
+                return None
+    except ObjectDoesNotExist:
+        return None
+    return value
+
+
+def stored_company_of(instance):
+    """Kaydın veritabanındaki (değişiklik öncesi) şirket id'si"""
+    lookup = COMPANY_LOOKUPS.get(type(instance))
+    if lookup is None or instance.pk is None:
+        return None
+    return (
+        type(instance)._base_manager.filter(pk=instance.pk)
+        .values_list(lookup, flat=True).first()
+    )
+
+
+def owner_changed(instance, field):
+    """
+    Şirketi belirleyen ilişki yüklendiğinden beri değişti mi? Veritabanından
+    yüklenmemiş örneklerde bilinemediğinden True döner.
+    """
+    loaded = instance.__dict__.get('_loaded_values')
+    attname = instance._meta.get_field(field).attname
+    if loaded is None or attname not in loaded:
+        return True
+    return loaded[attname] != getattr(instance, attname)
+
+
+def owner_field(model):
+    """Şirketi belirleyen alan (ör. Employee için 'branch'); Company için None"""
+    lookup = COMPANY_LOOKUPS.get(model)
+    if lookup is None or lookup == 'id':
+        return None
+    return model._meta.get_field(lookup.split('__')[0]).name
+
+
+class ResponseCacheMixin:
+    """
+    list ve retrieve yanıtlarını paylaşılan cache'te JSON olarak saklar.
+
+    Anahtar viewset, işlem, normalize edilmiş sorgu dizesi, kapsam ve
+    serializer'ın okuduğu modellerin sürümlerinden oluşur. Sürümler model
+    sinyalleriyle yalnızca değişen şirket için yenilenir; eski anahtarlar
+    okunmaz ve süresi dolunca silinir.
+
+    Anahtar varsayılan olarak isteği yapanın şirket, rol, şube ve çalışanına
+    (sistem kullanıcılarında bunun yerine sistem kullanıcısı olmasına) göre
+    ayrılır; böylece sonradan kiracıya göre daraltılan bir queryset yanıtı başka
+    kiracıya sızdırmaz. Sürümler, her şirketin değişikliği ile geçersiz olan
+    tüm şirketler kapsamındadır. response_cache_scope ile değiştirilir:
+
+    * 'company': sorgu isteği yapanın şirketine göre daraltılır; sürümler de
+      yalnızca o şirketin değişiklikleriyle yenilenir.
+    * 'all': yanıt kullanıcıdan bağımsızdır (ör. planlar); anahtar kiracıya
+      göre ayrılmaz. Açıkça belirtilmelidir.
+
+    JSON dışı renderer'lar ve akış yanıtları önbelleğe alınmaz.
+    QueryPlanMixin ile birlikte kullanılır.
+    """
+    response_cache_timeout = RESPONSE_CACHE_TIMEOUT
+    response_cache_scope = None
+
+    def get_response_cache_scope(self):
+        """(sürüm kapsamı, anahtara eklenecek kimlik)"""
+        user = self.request.user
+        if self.response_cache_scope == ALL_SCOPE:
+            return ALL_SCOPE, user.is_authenticated
+        tenant = self.request.tenant
+        if tenant.is_system_user or not tenant.has_employee:
+            return ALL_SCOPE, (user.is_authenticated, tenant.is_system_user)
+        identity = (tenant.company_id, tenant.role, tenant.branch_id, tenant.employee_id)
+        if self.response_cache_scope == 'company':
+            return tenant.company_id, identity
+        return ALL_SCOPE, identity
+
+    def get_response_cache_key(self):
+        request = self.request
+        queryset = self.get_queryset()
+        scope, identity = self.get_response_cache_scope()
+        namespaces = []
+        for model in view_fingerprint_spec(self, queryset).models:
+            namespaces.append(_namespace(model, SHARED_SCOPE))
+            namespaces.append(_namespace(model, scope))
+
+        query = sorted(
+            (key, tuple(values)) for key, values in request.query_params.lists()
+        )
+        parts = (
+            self.action, sorted(self.kwargs.items()), query,
+            request.accepted_media_type, identity, get_versions(namespaces),
+        )
+        digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+        return RESPONSE_KEY.format(type(self).__name__, digest)
+
+    def is_response_cacheable(self):
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        return (
+            isinstance(renderer, ORJSONRenderer)
+            and renderer.can_stream(self.request.accepted_media_type, self.get_renderer_context())
+        )
+
+    def cached_response(self, get_response):
+        if not self.is_response_cacheable():
+            return get_response()
+
+        renderer = self.request.accepted_renderer
+        key = self.get_response_cache_key()
+        content = cache.get(key)
+        if content is None:
+            response = get_response()
+            if not isinstance(response, Response) or response.status_code != 200:
+                return response
+            content = renderer.render(
+                response.data, self.request.accepted_media_type, self.get_renderer_context()
+            )
+            cache.set(key, content, self.response_cache_timeout)
+        return HttpResponse(content, content_type=renderer.media_type)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            lambda: super(ResponseCacheMixin, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        # Nesne bulunamazsa 404, yetki yoksa 403 önbellekten önce döner
+        self.get_object()
+        return self.cached_response(
+            lambda: super(ResponseCacheMixin, self).retrieve(request, *args, **kwargs)
+        )
+
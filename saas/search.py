@@ -0,0 +1,273 @@
+from array import array
+from collections import Counter
+from itertools import chain
+from bisect import bisect_left
+
+from .caching import VersionedValue
+from .locations import LOCATIONS_NAMESPACE, load_location_rows
+from .models import tr_slugify
+
+# Sıralamada tür önceliği: önce iller, sonra ilçeler, sonra mahalleler
+LOCATION_TYPES = ('city', 'district', 'neighborhood')
+
+MAX_RESULTS = 20
+
+# Trigram eşleşmesinde kabul edilen en düşük benzerlik oranı
+TRIGRAM_THRESHOLD = 0.5
+
+# Çok yaygın trigramlar (ör. "mah") seçici olmadığı için aramada atlanır
+TRIGRAM_MAX_POSTINGS = 2000
+
+# Süreç içinde saklanan sorgu sonucu sayısı üst sınırı
+RESULT_CACHE_SIZE = 20000
+
+# Önek aralığının üst sınırı için kullanılan en büyük karakter
+PREFIX_END = '\uffff'
+
+
+def normalize(text):
+    """
+    Metni tr_slugify ile aynı kurallarla kelimelere ayırır.
+    'Kadıköy / MODA' -> ['kadikoy', 'moda']
+    """
+    if not text:
+        return []
+    return [token for token in tr_slugify(text).split('-') if token]
+
+
+def trigrams(token):
+    padded = f" {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class LocationIndex:
+    """
+    İl, ilçe ve mahalleler için bellekte tutulan otomatik tamamlama indeksi.
+
+    Kayıtlar sabit bir sıralamaya (tür, isim uzunluğu, isim) göre numaralanır;
+    kayıt numarası aynı zamanda eşitlik durumundaki sıralama anahtarıdır ve her
+    tür ardışık bir numara aralığına düşer. Kelimeler üç sıralı dizide tutulur:
+    adın ilk kelimesi, adın tüm kelimeleri ve üst konum adları/posta kodu.
+    Önek aramaları bisect ile yapılır, sorgu başına veritabanına gidilmez.
+    """
+
+    def __init__(self, cities, districts, neighborhoods):
+        tokens_cache = {}
+
+        def tokens_of(text):
+            tokens = tokens_cache.get(text)
+            if tokens is None:
+                tokens = tokens_cache[text] = tuple(normalize(text))
+            return tokens
+
+        city_info = {city_id: (name, tokens_of(name)) for city_id, _, name in cities}
+        district_info = {}
+        for district_id, city_id, name in districts:
+            city_name, city_tokens = city_info.get(city_id, ('', ()))
+            district_info[district_id] = (city_id, name, city_name, tokens_of(name) + city_tokens)
+
+        prepared = []
+        for city_id, code, name in cities:
+            prepared.append((0, name, tokens_of(name), (), {
+                'type': 'city', 'id': city_id, 'name': name, 'label': name,
+                'city_id': city_id, 'district_id': None, 'postal_code': None,
+            }))
+        for district_id, city_id, name in districts:
+            city_name, city_tokens = city_info.get(city_id, ('', ()))
+            prepared.append((1, name, tokens_of(name), city_tokens, {
+                'type': 'district', 'id': district_id, 'name': name,
+                'label': f"{city_name} - {name}",
+                'city_id': city_id, 'district_id': district_id, 'postal_code': None,
+            }))
+        for neighborhood_id, district_id, name, postal_code in neighborhoods:
+            city_id, district_name, city_name, context = district_info.get(
+                district_id, (None, '', '', ())
+            )
+            if postal_code:
+                context = context + (postal_code,)
+            prepared.append((2, name, tokens_of(name), context, {
+                'type': 'neighborhood', 'id': neighborhood_id, 'name': name,
+                'label': f"{city_name} - {district_name} - {name}",
+                'city_id': city_id, 'district_id': district_id, 'postal_code': postal_code,
+            }))
+
+        prepared = [item for item in prepared if item[2]]
+        prepared.sort(key=lambda item: (item[0], len(item[1]), item[2]))
+
+        self.own_texts = [' ' + ' '.join(item[2]) for item in prepared]
+        self.all_texts = [' ' + ' '.join(item[2] + item[3]) for item in prepared]
+        self.results = [item[4] for item in prepared]
+
+        # Her türün kayıt numarası aralığı
+        orders = [item[0] for item in prepared]
+        self.type_ranges = {
+            location_type: (bisect_left(orders, order), bisect_left(orders, order + 1))
+            for order, location_type in enumerate(LOCATION_TYPES)
+        }
+
+        first_postings = []
+        own_postings = []
+        context_postings = []
+        trigram_postings = {}
+        for idx, (_, _, own, context, _) in enumerate(prepared):
+            first_postings.append((own[0], idx))
+            for token in set(own):
+                own_postings.append((token, idx))
+                for gram in trigrams(token):
+                    trigram_postings.setdefault(gram, array('I')).append(idx)
+            for token in set(context).difference(own):
+                context_postings.append((token, idx))
+
+        self.first_keys, self.first_ids = self._postings(first_postings)
+        self.own_keys, self.own_ids = self._postings(own_postings)
+        self.context_keys, self.context_ids = self._postings(context_postings)
+        self.trigrams = trigram_postings
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.results)
+
+    @staticmethod
+    def _postings(postings):
+        postings.sort()
+        return [token for token, _ in postings], array('I', (idx for _, idx in postings))
+
+    @staticmethod
+    def _matching(keys, ids, token):
+        """Öneki token olan kelimelere ait kayıt numaralarını döndürür"""
+        lo = bisect_left(keys, token)
+        hi = bisect_left(keys, token + PREFIX_END, lo)
+        return ids[lo:hi]
+
+    def search(self, text, limit=10, location_type=None):
+        """
+        Sorguya en iyi uyan kayıtları sıralı olarak döndürür.
+
+        Sıralama: adı sorguyla başlayanlar, adında tüm kelimeler geçenler,
+        üst konum/posta kodu ile eşleşenler ve son olarak trigram benzerliği.
+        Aynı seviyede iller ilçelerden, ilçeler mahallelerden önce gelir.
+        """
+        query = normalize(text)
+        limit = max(1, min(limit, MAX_RESULTS))
+        if not query:
+            return []
+
+        key = (location_type, ' '.join(query), limit)
+        results = self._cache.get(key)
+        if results is None:
+            lo, hi = self.type_ranges.get(location_type, (0, len(self.results)))
+            if len(query) == 1:
+                ids = self._search_token(query[0], limit, lo, hi)
+            else:
+                ids = self._search_phrase(query, limit, lo, hi)
+            if not ids and len(key[1]) >= 3:
+                # Önek eşleşmesi yoksa yazım hatası olabilir
+                ids = self._search_trigrams(query, limit, lo, hi)
+            results = [self.results[idx] for idx in ids]
+
+            if len(self._cache) >= RESULT_CACHE_SIZE:
+                self._cache.clear()
+            self._cache[key] = results
+        return results
+
+    def _search_token(self, token, limit, lo, hi):
+        """
+        Tek kelimelik sorgu: seviyeler sırayla doldurulur.
+        Her seviyedeki adaylar numaraya göre sıralanıp tür aralığına kırpılır.
+        """
+        found = []
+        seen = set()
+        for keys, ids in (
+            (self.first_keys, self.first_ids),
+            (self.own_keys, self.own_ids),
+            (self.context_keys, self.context_ids),
+        ):
+            candidates = sorted(self._matching(keys, ids, token))
+            start = bisect_left(candidates, lo)
+            stop = bisect_left(candidates, hi, start)
+            for idx in candidates[start:stop]:
+                if idx not in seen:
+                    seen.add(idx)
+                    found.append(idx)
+                    if len(found) >= limit:
+                        return found
+        return found
+
+    def _search_phrase(self, query, limit, lo, hi):
+        """
+        Çok kelimelik sorgu: seçici kelimelerin aday kümeleri kesiştirilir,
+        kesişim numara sırasıyla gezilir ve ilk seviye dolunca durulur.
+        """
+        matches = [
+            (
+                self._matching(self.own_keys, self.own_ids, token),
+                self._matching(self.context_keys, self.context_ids, token),
+            )
+            for token in set(query)
+        ]
+        matches.sort(key=lambda pair: len(pair[0]) + len(pair[1]))
+
+        candidates = None
+        for own_ids, context_ids in matches:
+            # Çok yaygın kelimeler (ör. "mah") için küme kurulmaz, aşağıda doğrulanır
+            if candidates is not None and len(own_ids) + len(context_ids) > 8 * len(candidates):
+                break
+            ids = set(own_ids)
+            ids.update(context_ids)
+            candidates = ids if candidates is None else candidates & ids
+
+        # Kelime başları tek bir alt dizgi aramasıyla kontrol edilir: " moda"
+        words = [' ' + token for token in query]
+        phrase = ' ' + ' '.join(query)
+        tiers = ([], [], [])
+        for idx in sorted(candidates):
+            if idx < lo or idx >= hi:
+                continue
+            own = self.own_texts[idx]
+            if own.startswith(phrase):
+                tier = 0
+            elif all(word in own for word in words):
+                tier = 1
+            elif all(word in self.all_texts[idx] for word in words):
+                tier = 2
+            else:
+                continue
+            tiers[tier].append(idx)
+            if tier == 0 and len(tiers[0]) >= limit:
+                break
+        return (tiers[0] + tiers[1] + tiers[2])[:limit]
+
+    def _search_trigrams(self, query, limit, lo, hi):
+        """Yazım hatalarına karşı ada trigram benzerliğiyle kayıt bulur"""
+        grams = set()
+        for token in query:
+            grams |= trigrams(token)
+
+        postings = [self.trigrams.get(gram) for gram in grams]
+        counts = Counter(chain.from_iterable(
+            ids for ids in postings
+            if ids is not None and len(ids) <= TRIGRAM_MAX_POSTINGS
+        ))
+
+        threshold = TRIGRAM_THRESHOLD * len(grams)
+        scored = sorted(
+            (-count, idx) for idx, count in counts.items()
+            if count >= threshold and lo <= idx < hi
+        )
+        return [idx for _, idx in scored[:limit]]
+
+
+def build_location_index():
+    return LocationIndex(*load_location_rows())
+
+
+_location_index = VersionedValue(LOCATIONS_NAMESPACE, build_location_index)
+
+
+def get_location_index():
+    """Süreç içindeki güncel konum indeksini döndürür, gerekirse yeniden kurar"""
+    return _location_index.get()
+
+
+def autocomplete_locations(text, limit=10, location_type=None):
+    return get_location_index().search(text, limit=limit, location_type=location_type)
@@ -12,6 +12,9 @@ from .models import (
 )
 from django.utils import timezone
 from django.conf import settings
+from .onboarding import BULK_REGISTER_LIMIT
+from .authentication import issue_tokens
+from .tenancy import resolve_tenant
 
 class UserSerializer(serializers.ModelSerializer):
     """
@@ -77,20 +80,22 @@ class LoginSerializer(serializers.Serializer):
     password = serializers.CharField(write_only=True)
 
     def validate(self, data):
+        from .maintenance import get_active_maintenance  # Circular import'u önlemek için
+
         # Kullanıcıyı doğrula
         user = authenticate(**data)
         if not user:
             raise serializers.ValidationError(_("Geçersiz kullanıcı adı veya parola."))
 
-        # 1. Sistem bakım kontrolü
-        active_maintenance = MaintenanceMode.objects.filter(
-            status='in_progress',
-            actual_start_time__lte=timezone.now()
-        ).exclude(actual_end_time__lte=timezone.now()).first()
+        # 1. Sistem bakım kontrolü (yanıttaki sistem durumu da bu kayıttan üretilir)
+        active_maintenance = get_active_maintenance()
+
+        # Çalışan, şube, şirket ve aktif abonelik tek sorguda çözülür
+        tenant = resolve_tenant(user)
 
         if active_maintenance:
             # Bakım sırasında erişim izni kontrolü
-            if not active_maintenance.can_access(user):
+            if not active_maintenance.can_access(tenant):
                 raise serializers.ValidationError(_(
                     "Sistem şu anda bakımda. "
                     f"Tahmini bitiş zamanı: {active_maintenance.planned_end_time}"
@@ -101,55 +106,46 @@ class LoginSerializer(serializers.Serializer):
             raise serializers.ValidationError(_("Giriş yapma izniniz yok. Hesabınız aktif değil."))
 
         # 3. Yetki ve abonelik kontrolü
-        if user.is_superuser or user.is_staff:
-            # Süper kullanıcı veya personel direkt giriş yapabilir
-            refresh = RefreshToken.for_user(user)
-            return {
-                'user': user,
-                'tokens': {
-                    'refresh': str(refresh),
-                    'access': str(refresh.access_token),
-                }
-            }
-        
-        # Normal kullanıcı için şirket ve abonelik kontrolü
-        try:
-            employee = user.employee
-            company = employee.branch.company
-            
+        # Süper kullanıcı veya personel direkt giriş yapabilir
+        if not tenant.is_system_user:
+            # Normal kullanıcı için şirket ve abonelik kontrolü
+            if not tenant.has_employee:
+                raise serializers.ValidationError(_(
+                    "Çalışan kaydınız bulunamadı. "
+                    "Lütfen sistem yöneticiniz ile iletişime geçin."
+                ))
+
             # Aktif abonelik kontrolü
-            active_subscription = Subscription.objects.filter(
-                company=company,
-                status='active',
-                start_date__lte=timezone.now(),
-                end_date__gte=timezone.now(),
-                is_active=True
-            ).first()
-
-            if not active_subscription:
+            if not tenant.has_active_subscription:
                 raise serializers.ValidationError(_(
                     "Şirketinizin abonelik süresi bitmiştir. "
                     "Lütfen sistem yöneticiniz ile iletişime geçin."
                 ))
 
-            # Tüm kontroller başarılı, token oluştur
-            refresh = RefreshToken.for_user(user)
-            return {
-                'user': user,
-                'tokens': {
-                    'refresh': str(refresh),
-                    'access': str(refresh.access_token),
-                }
+        # Tüm kontroller başarılı, token oluştur (bağlam claim'leriyle)
+        refresh = issue_tokens(user, tenant)
+        return {
+            'user': user,
+            'tenant': tenant,
+            'maintenance': active_maintenance,
+            'tokens': {
+                'refresh': str(refresh),
+                'access': str(refresh.access_token),
             }
-
-        except Employee.DoesNotExist:
-            raise serializers.ValidationError(_(
-                "Çalışan kaydınız bulunamadı. "
-                "Lütfen sistem yöneticiniz ile iletişime geçin."
-            ))
+        }
 
     def to_representation(self, instance):
-        data = {
+        from .login import get_profile  # Circular import'u önlemek için
+        from .maintenance import get_active_maintenance
+
+        user = instance['user']
+        tenant = instance.get('tenant') or resolve_tenant(user)
+        if 'maintenance' in instance:
+            maintenance_mode = instance['maintenance']
+        else:
+            maintenance_mode = get_active_maintenance()
+
+        return {
             'status': 'success',
             'message': _('Giriş başarılı'),
             'auth': {
@@ -158,137 +154,25 @@ class LoginSerializer(serializers.Serializer):
                 'refresh_token': instance['tokens']['refresh'],
                 'expires_in': 3600,
             },
-            'user': {
-                'id': instance['user'].id,
-                'username': instance['user'].username,
-                'email': instance['user'].email,
-                'personal': {
-                    'first_name': instance['user'].first_name,
-                    'last_name': instance['user'].last_name,
-                    'full_name': instance['user'].get_full_name(),
-                    'date_joined': instance['user'].date_joined,
-                    'last_login': instance['user'].last_login,
+            # Token dışındaki kullanıcı, çalışan ve şirket bilgileri önbellekten gelir
+            'user': get_profile(user, tenant),
+            # Sistem durumu
+            'system': {
+                'maintenance_mode': {
+                    'is_active': bool(maintenance_mode),
+                    'details': {
+                        'title': maintenance_mode.title if maintenance_mode else None,
+                        'description': maintenance_mode.description if maintenance_mode else None,
+                        'planned_end_time': maintenance_mode.planned_end_time if maintenance_mode else None,
+                    } if maintenance_mode else None,
+                    'has_access': maintenance_mode.can_access(tenant) if maintenance_mode else True,
                 },
-                'permissions': {
-                    'is_active': instance['user'].is_active,
-                    'is_staff': instance['user'].is_staff,
-                    'is_superuser': instance['user'].is_superuser,
-                    'groups': list(instance['user'].groups.values('id', 'name')),
-                    'user_permissions': list(instance['user'].user_permissions.values('id', 'name')),
-                }
+                'server_time': timezone.now(),
+                'version': '1.0.0',
+                'environment': 'production' if not settings.DEBUG else 'development'
             }
         }
 
-        user = instance['user']
-
-        # Çalışan bilgileri
-        if hasattr(user, 'employee'):
-            employee = user.employee
-            branch = employee.branch
-            company = branch.company
-
-            # Şube ve şirket bilgilerini serialize et
-            branch_serializer = BranchDetailSerializer(branch)
-            company_serializer = CompanyDetailSerializer(company)
-
-            data['user'].update({
-                'employee': {
-                    'id': employee.id,
-                    'role': {
-                        'code': employee.role,
-                        'display': employee.get_role_display(),
-                    },
-                    'identity_number': employee.identity_number[-4:] + '****',
-                    'personal': {
-                        'birth_date': employee.birth_date,
-                        'gender': {
-                            'code': employee.gender,
-                            'display': employee.get_gender_display(),
-                        },
-                        'phone': employee.phone,
-                    },
-                    'employment': {
-                        'hire_date': employee.hire_date,
-                        'termination_date': employee.termination_date,
-                        'is_active': employee.is_active,
-                        'tenure': (timezone.now().date() - employee.hire_date).days,
-                    },
-                    'location': {
-                        'address': employee.address,
-                        'neighborhood': {
-                            'id': employee.neighborhood.id if employee.neighborhood else None,
-                            'name': str(employee.neighborhood) if employee.neighborhood else None,
-                        }
-                    }
-                },
-                'branch': branch_serializer.data,
-                'company': company_serializer.data,
-            })
-
-            # Aktif abonelik bilgileri
-            active_subscription = company.subscriptions.filter(
-                status='active',
-                start_date__lte=timezone.now(),
-                end_date__gte=timezone.now(),
-                is_active=True
-            ).first()
-
-            if active_subscription:
-                data['user']['company']['subscription'] = {
-                    'id': active_subscription.id,
-                    'plan': {
-                        'id': active_subscription.plan.id,
-                        'name': active_subscription.plan.name,
-                        'features': active_subscription.plan.features,
-                        'price': str(active_subscription.plan.price),
-                        'max_users': active_subscription.plan.max_users,
-                        'max_storage': active_subscription.plan.max_storage,
-                    },
-                    'status': {
-                        'code': active_subscription.status,
-                        'display': active_subscription.get_status_display(),
-                    },
-                    'dates': {
-                        'start': active_subscription.start_date,
-                        'end': active_subscription.end_date,
-                        'trial_ends': active_subscription.trial_ends,
-                    },
-                    'is_trial': active_subscription.is_trial,
-                    'remaining_days': (active_subscription.end_date - timezone.now().date()).days,
-                }
-
-            # Şirket görünüm ayarları
-            if hasattr(company, 'branding'):
-                data['user']['company']['branding'] = {
-                    'primary_color': company.branding.primary_color,
-                    'secondary_color': company.branding.secondary_color,
-                    'logo_url': company.branding.logo.url if company.branding.logo else None,
-                    'favicon_url': company.branding.favicon.url if company.branding.favicon else None,
-                }
-
-        # Sistem durumu
-        maintenance_mode = MaintenanceMode.objects.filter(
-            status='in_progress',
-            actual_start_time__lte=timezone.now()
-        ).exclude(actual_end_time__lte=timezone.now()).first()
-
-        data['system'] = {
-            'maintenance_mode': {
-                'is_active': bool(maintenance_mode),
-                'details': {
-                    'title': maintenance_mode.title if maintenance_mode else None,
-                    'description': maintenance_mode.description if maintenance_mode else None,
-                    'planned_end_time': maintenance_mode.planned_end_time if maintenance_mode else None,
-                } if maintenance_mode else None,
-                'has_access': maintenance_mode.can_access(user) if maintenance_mode else True,
-            },
-            'server_time': timezone.now(),
-            'version': '1.0.0',
-            'environment': 'production' if not settings.DEBUG else 'development'
-        }
-
-        return data
-
 class CitySerializer(serializers.ModelSerializer):
     """
     İl bilgilerini serialize eden sınıf.
@@ -361,6 +245,60 @@ class CompanySerializer(serializers.ModelSerializer):
 
         return data
 
+class CompanyBulkRegisterListSerializer(serializers.ListSerializer):
+    """
+    Toplu şirket kaydında vergi numarası ve mahalle kontrollerini
+    satır başına değil, tüm liste için tek sorguda yapar.
+    """
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError('En az bir şirket gönderilmelidir.')
+        if len(attrs) > BULK_REGISTER_LIMIT:
+            raise serializers.ValidationError(
+                f'Tek istekte en fazla {BULK_REGISTER_LIMIT} şirket kaydedilebilir.'
+            )
+
+        tax_numbers = [item['tax_number'] for item in attrs]
+        existing_tax_numbers = set(
+            Company.objects.filter(tax_number__in=tax_numbers).values_list('tax_number', flat=True)
+        )
+        neighborhood_ids = {item['neighborhood_id'] for item in attrs if item.get('neighborhood_id')}
+        existing_neighborhoods = set(
+            Neighborhood.objects.filter(id__in=neighborhood_ids).values_list('id', flat=True)
+        )
+
+        errors = []
+        seen = {}
+        for index, item in enumerate(attrs):
+            item_errors = {}
+            tax_number = item['tax_number']
+            if tax_number in existing_tax_numbers:
+                item_errors['tax_number'] = ['Bu vergi numarası ile kayıtlı bir şirket zaten var.']
+            elif tax_number in seen:
+                item_errors['tax_number'] = [
+                    f'Bu vergi numarası listede {seen[tax_number] + 1}. satırda da var.'
+                ]
+            seen.setdefault(tax_number, index)
+            neighborhood_id = item.get('neighborhood_id')
+            if neighborhood_id and neighborhood_id not in existing_neighborhoods:
+                item_errors['neighborhood'] = ['Geçersiz mahalle.']
+            errors.append(item_errors)
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return attrs
+
+class CompanyBulkRegisterSerializer(CompanySerializer):
+    """
+    Toplu şirket kaydı için satır serializer'ı.
+    Benzersizlik ve mahalle kontrolleri liste seviyesinde toplu yapılır.
+    """
+    neighborhood = serializers.IntegerField(source='neighborhood_id', allow_null=True)
+
+    class Meta(CompanySerializer.Meta):
+        list_serializer_class = CompanyBulkRegisterListSerializer
+        extra_kwargs = {'tax_number': {'validators': []}}
+
 class BranchSerializer(serializers.ModelSerializer):
     """
     Şube bilgilerini serialize eden sınıf.
@@ -368,8 +306,9 @@ class BranchSerializer(serializers.ModelSerializer):
     """
     company_name = serializers.CharField(source='company.name', read_only=True)
     neighborhood_full_name = serializers.CharField(
-        source='neighborhood.__str__', 
-        read_only=True
+        source='neighborhood.full_name',
+        read_only=True,
+        allow_null=True
     )
 
     class Meta:
@@ -388,8 +327,9 @@ class EmployeeSerializer(serializers.ModelSerializer):
     branch_name = serializers.CharField(source='branch.name', read_only=True)
     company_name = serializers.CharField(source='branch.company.name', read_only=True)
     neighborhood_full_name = serializers.CharField(
-        source='neighborhood.__str__', 
-        read_only=True
+        source='neighborhood.full_name',
+        read_only=True,
+        allow_null=True
     )
     role_display = serializers.CharField(source='get_role_display', read_only=True)
     gender_display = serializers.CharField(source='get_gender_display', read_only=True)
@@ -403,6 +343,40 @@ class EmployeeSerializer(serializers.ModelSerializer):
                  'role', 'role_display', 'is_active', 'created_at', 'updated_at')
         read_only_fields = ('slug',)
 
+class EmployeeImportRowSerializer(serializers.Serializer):
+    """
+    Toplu çalışan içe aktarımında tek bir satırı doğrular.
+    Veritabanına gitmez; benzersizlik ve ilişki kontrolleri parça bazında toplu yapılır.
+    """
+    DATE_FORMATS = ['%Y-%m-%d', '%d.%m.%Y', '%d/%m/%Y']
+
+    username = serializers.CharField(max_length=150, required=False, allow_blank=True)
+    first_name = serializers.CharField(max_length=150)
+    last_name = serializers.CharField(max_length=150)
+    email = serializers.EmailField(required=False, allow_blank=True)
+    identity_number = serializers.RegexField(
+        r'^\d{11}$',
+        error_messages={'invalid': 'TC Kimlik No 11 haneli sayı olmalıdır.'}
+    )
+    birth_date = serializers.DateField(input_formats=DATE_FORMATS)
+    gender = serializers.ChoiceField(choices=Employee.GENDER_CHOICES)
+    phone = serializers.CharField(max_length=15)
+    address = serializers.CharField()
+    neighborhood = serializers.IntegerField(required=False, allow_null=True)
+    hire_date = serializers.DateField(input_formats=DATE_FORMATS)
+    role = serializers.ChoiceField(choices=Employee.ROLE_CHOICES, required=False, default='employee')
+    branch = serializers.IntegerField(required=False, allow_null=True)
+
+    def to_internal_value(self, data):
+        # Boş hücreler alan hiç gönderilmemiş gibi değerlendirilir
+        data = {key: value for key, value in data.items() if value not in ('', None)}
+        return super().to_internal_value(data)
+
+    def validate(self, data):
+        if not data.get('username'):
+            data['username'] = data['identity_number']
+        return data
+
 class PlanSerializer(serializers.ModelSerializer):
     """Plan bilgilerini serialize eden sınıf."""
     class Meta:
@@ -423,7 +397,7 @@ class SubscriptionSerializer(serializers.ModelSerializer):
 
     def get_remaining_days(self, obj):
         if obj.end_date:
-            return (obj.end_date - timezone.now().date()).days
+            return (obj.end_date - timezone.now()).days
         return None
 
 class InvoiceSerializer(serializers.ModelSerializer):
@@ -462,7 +436,16 @@ class AnnouncementSerializer(serializers.ModelSerializer):
                  'created_at')
 
     def get_target_companies_names(self, obj):
-        return list(obj.target_companies.values_list('name', flat=True))
+        # target_companies listede prefetch edildiğinden ek sorgu yapılmaz
+        return [company.name for company in obj.target_companies.all()]
+
+class MarkReadSerializer(serializers.Serializer):
+    """Okundu işaretlenecek bildirim veya duyuruların id listesi."""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=1000
+    )
 
 class MaintenanceModeSerializer(serializers.ModelSerializer):
     """Bakım modu bilgilerini serialize eden sınıf."""
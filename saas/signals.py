@@ -0,0 +1,366 @@
+from django.apps import apps
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_save
+from django.dispatch import receiver
+from django.contrib.auth.models import Group, User
+from django.utils import timezone
+
+from .models import (
+    BaseModel, City, District, Neighborhood, LocationSnapshot, Plan, Company, Branch,
+    Employee, FileStorage, APIUsage, Invoice, Subscription, CompanyBranding, MaintenanceMode,
+    Notification, Announcement
+)
+from .authentication import invalidate_user_state, invalidate_user_states
+from .conditional import mark_changed
+from .entitlements import invalidate_entitlement, invalidate_entitlements
+from .labels import sync_employee_labels, sync_invoice_labels, sync_location_labels
+from .locations import invalidate_location_tree
+from .maintenance import invalidate_maintenance
+from .notifications import schedule_announcement, schedule_fan_out
+from .login import invalidate_company_profiles, invalidate_profiles, invalidate_user_profile
+from .snapshots import invalidate_latest_snapshot
+from .onboarding import invalidate_plans
+from .response_cache import (
+    company_of, invalidate_responses, owner_changed, owner_field, stored_company_of
+)
+from .statistics import adjust_statistics, is_counted_active, refresh_statistics
+
+
+@receiver([post_save, post_delete], sender=City)
+@receiver([post_save, post_delete], sender=District)
+@receiver([post_save, post_delete], sender=Neighborhood)
+def location_changed(sender, **kwargs):
+    """Konum verisi değiştiğinde bellekteki konum ağacını geçersiz kılar"""
+    invalidate_location_tree()
+
+
+# Saklanan etiketler: üst kaydın adı değiştiğinde bağlı satırlar tek UPDATE ile yenilenir.
+# Yeni kayıtların bağlı satırı olmadığından atlanır.
+
+def _renamed(created, raw, update_fields, *names):
+    if created or raw:
+        return False
+    return update_fields is None or any(name in update_fields for name in names)
+
+
+@receiver(post_save, sender=City)
+def city_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if _renamed(created, raw, update_fields, 'name'):
+        sync_location_labels(city_id=instance.pk)
+
+
+@receiver(post_save, sender=District)
+def district_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if _renamed(created, raw, update_fields, 'name', 'city', 'full_name'):
+        sync_location_labels(district_id=instance.pk)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # Girişte yalnızca last_login kaydedilir, etiketler etkilenmez
+    if _renamed(created, raw, update_fields, 'first_name', 'last_name'):
+        sync_employee_labels(user_id=instance.pk)
+        # User modelinde updated_at yok; adı okuyan listelerin ETag'i yenilenir
+        mark_changed(User)
+
+
+@receiver(post_save, sender=Branch)
+def branch_renamed(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if _renamed(created, raw, update_fields, 'name', 'company'):
+        sync_employee_labels(branch_id=instance.pk)
+
+
+@receiver(post_save, sender=Company)
+def company_renamed(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if _renamed(created, raw, update_fields, 'name'):
+        sync_employee_labels(branch__company_id=instance.pk)
+        sync_invoice_labels(subscription__company_id=instance.pk)
+
+
+@receiver([post_save, post_delete], sender=LocationSnapshot)
+def location_snapshot_changed(sender, **kwargs):
+    """Yayınlanan anlık görüntü değiştiğinde süreçlerdeki kopyayı yeniler"""
+    invalidate_latest_snapshot()
+
+
+@receiver([post_save, post_delete], sender=MaintenanceMode)
+@receiver(m2m_changed, sender=MaintenanceMode.allowed_companies.through)
+def maintenance_changed(sender, **kwargs):
+    """Bakım kaydı veya izinli şirketleri değiştiğinde süreçlerdeki bakım bilgisini yeniler"""
+    action = kwargs.get('action')
+    if action is None or action.startswith('post_'):
+        invalidate_maintenance()
+
+
+@receiver(post_save, sender=Notification)
+def notification_created(sender, instance, created, raw=False, **kwargs):
+    """Yeni bildirimin alıcı kayıtları commit'ten sonra arka planda oluşturulur"""
+    if created and not raw:
+        schedule_fan_out(instance.pk)
+
+
+@receiver(post_save, sender=Announcement)
+def announcement_created(sender, instance, created, raw=False, **kwargs):
+    """
+    Yeni duyurunun bildirimi commit'ten sonra (hedef şirketler yazılmış olarak)
+    yayın tarihinde oluşturulur. Fixture ile yüklenen duyuruları periyodik
+    tarama yakalar.
+    """
+    if created and not raw:
+        schedule_announcement(instance)
+
+
+@receiver([post_save, post_delete], sender=Plan)
+def plan_changed(sender, **kwargs):
+    """Plan değiştiğinde süreçlerde tutulan deneme planını yeniler"""
+    invalidate_plans()
+
+
+# Taşınan kayıtların eski şirket id'si pre_save ile post_save arasında burada tutulur
+PREVIOUS_COMPANY_ATTR = '_previous_company_id'
+
+
+# Şirket istatistikleri: ekleme ve silmede sayaçlar F() ile artırılır/azaltılır,
+# güncellemede ilgili sayaç grubu şirket için yeniden hesaplanır.
+
+def _invoice_company_id(invoice):
+    try:
+        return invoice.subscription.company_id
+    except Subscription.DoesNotExist:
+        return None
+
+
+def _employee_company_id(employee):
+    try:
+        return employee.branch.company_id
+    except Branch.DoesNotExist:
+        return None
+
+
+def previous_company_of(instance):
+    """
+    Kayıt başka şirkete taşındıysa eski şirket id'si, aksi halde None.
+    Eski şirket pre_save'de (model_owner_loaded) okunur.
+    """
+    previous = instance.__dict__.get(PREVIOUS_COMPANY_ATTR)
+    return None if previous == company_of(instance) else previous
+
+
+@receiver(post_save, sender=Branch)
+def branch_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        adjust_statistics(instance.company_id, total_branches=1)
+        return
+    previous = previous_company_of(instance)
+    if previous is not None:
+        # Şube çalışanlarıyla birlikte taşındığından iki şirketin sayaçları değişir
+        adjust_statistics(previous, total_branches=-1)
+        adjust_statistics(instance.company_id, total_branches=1)
+        refresh_statistics(previous, 'employees')
+        refresh_statistics(instance.company_id, 'employees')
+
+
+@receiver(post_delete, sender=Branch)
+def branch_deleted(sender, instance, **kwargs):
+    adjust_statistics(instance.company_id, total_branches=-1)
+
+
+@receiver(post_save, sender=Employee)
+def employee_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    company_id = _employee_company_id(instance)
+    if created:
+        adjust_statistics(
+            company_id,
+            total_employees=1,
+            active_employees=int(is_counted_active(instance))
+        )
+    else:
+        refresh_statistics(company_id, 'employees')
+        refresh_statistics(previous_company_of(instance), 'employees')
+
+
+@receiver(post_delete, sender=Employee)
+def employee_deleted(sender, instance, **kwargs):
+    adjust_statistics(
+        _employee_company_id(instance),
+        total_employees=-1,
+        active_employees=-int(is_counted_active(instance))
+    )
+
+
+@receiver(post_save, sender=FileStorage)
+def file_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        adjust_statistics(instance.company_id, storage_used=instance.file_size)
+    else:
+        refresh_statistics(instance.company_id, 'storage')
+        refresh_statistics(previous_company_of(instance), 'storage')
+
+
+@receiver(post_delete, sender=FileStorage)
+def file_deleted(sender, instance, **kwargs):
+    adjust_statistics(instance.company_id, storage_used=-instance.file_size)
+
+
+@receiver(post_save, sender=Invoice)
+def invoice_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    company_id = _invoice_company_id(instance)
+    if created:
+        adjust_statistics(
+            company_id,
+            total_invoices=1,
+            pending_invoices=int(instance.status == 'pending')
+        )
+    else:
+        refresh_statistics(company_id, 'invoices')
+        refresh_statistics(previous_company_of(instance), 'invoices')
+
+
+@receiver(post_delete, sender=Invoice)
+def invoice_deleted(sender, instance, **kwargs):
+    adjust_statistics(
+        _invoice_company_id(instance),
+        total_invoices=-1,
+        pending_invoices=-int(instance.status == 'pending')
+    )
+
+
+@receiver([post_save, post_delete], sender=APIUsage)
+def api_usage_changed(sender, instance, raw=False, **kwargs):
+    """Yalnızca bugünün kullanımı saklandığından eski tarihli kayıtlar atlanır"""
+    if not raw and instance.date == timezone.localdate():
+        refresh_statistics(instance.company_id, 'api')
+
+
+@receiver([post_save, post_delete], sender=Subscription)
+def subscription_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_statistics(instance.company_id, 'subscription')
+        refresh_statistics(previous_company_of(instance), 'subscription')
+
+
+# Hak bilgisi (abonelik ve plan limitleri) şirket bazında önbellekte tutulur.
+def invalidate_entitlement_snapshots(sender, company_ids):
+    """Abonelik şirketin, plan tüm şirketlerin hak bilgisini geçersiz kılar"""
+    if sender is Subscription:
+        for company_id in company_ids:
+            invalidate_entitlement(company_id)
+    elif sender is Plan:
+        invalidate_entitlements()
+
+
+# Giriş profili: kullanıcı ve çalışan değişiklikleri yalnızca o kullanıcının,
+# şirket, şube, abonelik ve görünüm değişiklikleri şirketin tüm kullanıcılarının
+# profilini geçersiz kılar; plan ve konum adları herkesinkini. Kullanıcı ve
+# çalışan değişiklikleri kimlik doğrulamada önbelleğe alınan kullanıcı durumunu
+# ve token claim'lerini de geçersiz kılar.
+PROFILE_COMPANY_MODELS = (Company, Branch, Subscription, CompanyBranding)
+PROFILE_SHARED_MODELS = (Plan, City, District, Neighborhood, Group)
+
+
+def invalidate_login_profiles(sender, instance, company_ids):
+    if sender is User:
+        invalidate_user_profile(instance.pk)
+        invalidate_user_state(instance.pk)
+    elif sender is Employee:
+        invalidate_user_profile(instance.user_id)
+        invalidate_user_state(instance.user_id)
+    elif sender in PROFILE_COMPANY_MODELS:
+        for company_id in company_ids:
+            invalidate_company_profiles(company_id)
+    elif sender in PROFILE_SHARED_MODELS:
+        invalidate_profiles()
+
+
+@receiver([post_save, post_delete], sender=Group)
+def group_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_profiles()
+        invalidate_user_states()
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def user_access_changed(sender, instance, action, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if isinstance(instance, User):
+        invalidate_user_profile(instance.pk)
+        invalidate_user_state(instance.pk)
+    else:
+        # Grup veya izin tarafından yapılan değişiklik birden çok kullanıcıyı etkiler
+        invalidate_profiles()
+        invalidate_user_states()
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_changed(sender, action, **kwargs):
+    if action.startswith('post_'):
+        invalidate_user_states()
+
+
+# Koşullu GET: updated_at'e yansımayan değişiklikler (silme ve M2M) model
+# bazında işaretlenir. Yanıt önbelleği: değişen kaydın şirketine ait yanıtlar
+# geçersiz kılınır. Silme sinyali bağlı modellerde toplu silme nesneleri yükler.
+
+def model_owner_loaded(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Şirketi belirleyen ilişkisi değişen kayıtlarda eski şirket kaydedilmeden
+    önce okunur. İlişki yüklendiği değerde kaldıysa sorgu yapılmaz.
+    """
+    field = owner_field(sender)
+    # Önceki kayıttan kalan değer bu kaydı etkilemesin
+    instance.__dict__.pop(PREVIOUS_COMPANY_ATTR, None)
+    if raw or field is None or instance._state.adding:
+        return
+    if update_fields is not None and field not in update_fields:
+        return
+    if owner_changed(instance, field):
+        instance.__dict__[PREVIOUS_COMPANY_ATTR] = stored_company_of(instance)
+
+
+def model_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    # Girişte yalnızca last_login kaydedilir, yanıtlar etkilenmez
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    company_id = company_of(instance)
+    invalidate_responses(sender, company_id)
+    previous = previous_company_of(instance)
+    if previous is not None:
+        invalidate_responses(sender, previous)
+    invalidate_entitlement_snapshots(sender, {company_id, previous})
+    invalidate_login_profiles(sender, instance, {company_id, previous})
+
+
+def model_deleted(sender, instance, **kwargs):
+    mark_changed(sender)
+    company_id = company_of(instance)
+    invalidate_responses(sender, company_id)
+    invalidate_entitlement_snapshots(sender, {company_id})
+    invalidate_login_profiles(sender, instance, {company_id})
+
+
+def relation_changed(sender, instance, model, action, **kwargs):
+    if action.startswith('post_'):
+        for changed in (type(instance), model):
+            mark_changed(changed)
+            invalidate_responses(changed)
+
+
+for tracked_model in [*apps.get_app_config('saas').get_models(), User]:
+    if tracked_model is not User and not issubclass(tracked_model, BaseModel):
+        continue
+    pre_save.connect(model_owner_loaded, sender=tracked_model)
+    post_save.connect(model_saved, sender=tracked_model)
+    post_delete.connect(model_deleted, sender=tracked_model)
+    for m2m_field in tracked_model._meta.local_many_to_many:
+        m2m_changed.connect(relation_changed, sender=m2m_field.remote_field.through)
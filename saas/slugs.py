@@ -0,0 +1,141 @@
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Q
+
+# Uzun isimlerde "-9999" gibi bir ekin sığması için ayrılan karakter sayısı
+SUFFIX_RESERVE = 5
+
+# Eşzamanlı kayıtlarda slug çakışırsa yeniden deneme sayısı
+SLUG_RETRY_ATTEMPTS = 5
+
+# Toplu ayırmada OR sorgusuyla kontrol edilen en fazla taban slug sayısı
+BATCH_QUERY_SIZE = 100
+
+
+def _scope_filter(instance):
+    """Slug'ın benzersiz olması gereken kapsamı döndürür (ör. şube için şirket)"""
+    scope = getattr(instance, 'SLUG_SCOPE', None)
+    if not scope:
+        return {}
+    return {f'{scope}_id': getattr(instance, f'{scope}_id')}
+
+
+def _base_slug(instance, base=None):
+    """Örneğin taban slug'ını üretir; slug alanına ek sığacak şekilde kısaltır"""
+    if base is None:
+        from .models import tr_slugify  # Circular import'u önlemek için
+        base = tr_slugify(instance.get_slug_base())
+    max_length = instance._meta.get_field('slug').max_length
+    if len(base) > max_length - SUFFIX_RESERVE:
+        base = base[:max_length - SUFFIX_RESERVE].rstrip('-')
+    return base
+
+
+def _base_query(base):
+    return Q(slug=base) | Q(slug__startswith=f'{base}-')
+
+
+def _pick_slug(base, taken):
+    """
+    Alınmış slug'lar arasında ilk boş adayı seçer: base, base-1, base-2...
+    Seçilen slug taken kümesine eklenir.
+    """
+    candidate = base
+    counter = 0
+    while candidate in taken:
+        counter += 1
+        candidate = f'{base}-{counter}'
+    taken.add(candidate)
+    return candidate
+
+
+def allocate_slug(instance, base):
+    """
+    Kapsam içinde benzersiz bir slug döndürür.
+    base ve base-N biçimindeki mevcut slug'lar tek sorguda okunur.
+    """
+    base = _base_slug(instance, base)
+    qs = instance.__class__._default_manager.filter(_base_query(base), **_scope_filter(instance))
+    if instance.pk:
+        qs = qs.exclude(pk=instance.pk)
+    return _pick_slug(base, set(qs.order_by().values_list('slug', flat=True)))
+
+
+def allocate_slugs(instances, check_existing=True):
+    """
+    Slug'ı boş olan örneklere toplu olarak slug atar (toplu içe aktarma için).
+    Model ve kapsam başına tek sorgu yapılır;
+    grup içindeki aynı isimler de birbirleriyle çakışmaz.
+
+    Kapsam yeni oluşturulmuşsa (ör. yeni şirketlerin şubeleri) check_existing=False
+    ile veritabanı sorgusu atlanır.
+    """
+    groups = defaultdict(list)
+    for instance in instances:
+        scope = tuple(sorted(_scope_filter(instance).items()))
+        groups[(instance.__class__, scope)].append(instance)
+
+    for (model, scope), members in groups.items():
+        pending = [
+            (instance, _base_slug(instance))
+            for instance in members if not instance.slug
+        ]
+        # Gruptaki hazır slug'lar da dolu sayılır
+        taken = {instance.slug for instance in members if instance.slug}
+        bases = {base for _, base in pending} if check_existing else set()
+        if bases:
+            qs = model._default_manager.filter(**dict(scope)).order_by()
+            if len(bases) <= BATCH_QUERY_SIZE:
+                qs = qs.filter(reduce(or_, map(_base_query, sorted(bases))))
+            # Çok sayıda taban için uzun OR sorgusu yerine kapsamdaki tüm slug'lar okunur
+            taken.update(qs.values_list('slug', flat=True))
+        for instance, base in pending:
+            instance.slug = _pick_slug(base, taken)
+    return instances
+
+
+class UniqueSlugMixin(models.Model):
+    """
+    Boş slug'ı get_slug_base() değerinden kapsam içinde benzersiz olarak üretir.
+
+    SLUG_SCOPE verilirse slug yalnızca o alan (ör. 'company') içinde benzersizdir.
+    Aynı anda iki kayıt aynı slug'ı alırsa unique kısıtı hata verir; kayıt bir
+    savepoint içinde yapıldığından slug yeniden üretilip tekrar denenir.
+    """
+    SLUG_SCOPE = None
+
+    class Meta:
+        abstract = True
+
+    def get_slug_base(self):
+        """Slug'ın üretileceği metni döndürür"""
+        raise NotImplementedError
+
+    def save(self, *args, **kwargs):
+        if self.slug:
+            return super().save(*args, **kwargs)
+
+        base = _base_slug(self)
+        pk, adding = self.pk, self._state.adding
+        for attempt in range(SLUG_RETRY_ATTEMPTS):
+            self.slug = allocate_slug(self, base)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                taken = self._slug_taken()
+                # Savepoint geri alındı, örneği kayıt öncesi durumuna döndür
+                self.pk, self._state.adding = pk, adding
+                if attempt == SLUG_RETRY_ATTEMPTS - 1 or not taken:
+                    self.slug = ''
+                    raise
+
+    def _slug_taken(self):
+        """Kayıt hatasının slug çakışmasından kaynaklanıp kaynaklanmadığını kontrol eder"""
+        qs = self.__class__._default_manager.filter(slug=self.slug, **_scope_filter(self))
+        if self.pk:
+            qs = qs.exclude(pk=self.pk)
+        return qs.exists()
@@ -0,0 +1,205 @@
+import gzip
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+from .caching import VersionedValue, bump_version_on_commit
+from .locations import load_location_rows
+from .models import LocationSnapshot
+
+SNAPSHOT_NAMESPACE = 'location-snapshots'
+
+# Sütunsal biçimin sürümü; istemciler bu değere göre çözümler
+SNAPSHOT_FORMAT = 1
+
+# Tablo başına sütunlar; ilk sütun her zaman id'dir
+SNAPSHOT_COLUMNS = {
+    'cities': ('id', 'code', 'name'),
+    'districts': ('id', 'city_id', 'name'),
+    'neighborhoods': ('id', 'district_id', 'name', 'postal_code'),
+}
+
+# Saklanacak eski sürüm sayısı; daha eski sürümden fark istenirse tam veri gerekir
+SNAPSHOT_KEEP = 30
+
+# Aynı sürüm numarasını başka bir yayın aldığında yeniden deneme sayısı
+PUBLISH_ATTEMPTS = 3
+
+DELTA_CACHE_KEY = 'saas:locations:delta:{}:{}'
+DELTA_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _dumps(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def encode_columns(rows, columns):
+    """
+    (id, ...) satırlarını id'ye göre sıralayıp sütunlara ayırır.
+    id sütunu bir önceki id'ye göre fark olarak yazılır; küçük sayılar
+    hem JSON'da hem gzip'te çok daha az yer tutar.
+    """
+    rows = sorted(rows)
+    encoded = {column: [] for column in columns}
+    previous = 0
+    for row in rows:
+        encoded['id'].append(row[0] - previous)
+        previous = row[0]
+        for column, value in zip(columns[1:], row[1:]):
+            encoded[column].append(value)
+    return encoded
+
+
+def decode_columns(encoded, columns):
+    """encode_columns çıktısını {id: (diğer sütunlar)} sözlüğüne çevirir"""
+    table = {}
+    current = 0
+    others = [encoded[column] for column in columns[1:]]
+    for position, delta in enumerate(encoded['id']):
+        current += delta
+        table[current] = tuple(values[position] for values in others)
+    return table
+
+
+def _tables_from_rows(cities, districts, neighborhoods):
+    """load_location_rows çıktısını anlık görüntü tablolarına çevirir"""
+    return {
+        'cities': list(cities),
+        'districts': list(districts),
+        'neighborhoods': list(neighborhoods),
+    }
+
+
+def build_snapshot_payload(version, tables):
+    """
+    Tabloları sütunsal JSON olarak kodlar ve gzip ile sıkıştırır.
+    Özet değeri sürümden bağımsızdır; veri değişmediyse aynı kalır.
+    """
+    columns = {
+        name: encode_columns(rows, SNAPSHOT_COLUMNS[name])
+        for name, rows in tables.items()
+    }
+    checksum = hashlib.sha256(_dumps(columns)).hexdigest()
+    payload = gzip.compress(_dumps({
+        'format': SNAPSHOT_FORMAT,
+        'version': version,
+        'columns': SNAPSHOT_COLUMNS,
+        'tables': columns,
+    }), mtime=0)
+    return payload, checksum
+
+
+def load_snapshot_tables(snapshot):
+    """Anlık görüntüyü {tablo: {id: satır}} olarak çözer"""
+    data = json.loads(gzip.decompress(bytes(snapshot.payload)))
+    return {
+        name: decode_columns(data['tables'][name], SNAPSHOT_COLUMNS[name])
+        for name in SNAPSHOT_COLUMNS
+    }
+
+
+def publish_location_snapshot(force=False, keep=SNAPSHOT_KEEP):
+    """
+    Güncel konum verisinden yeni bir anlık görüntü yayınlar.
+    Veri son sürümle aynıysa (force verilmedikçe) yeni sürüm oluşturulmaz.
+    (snapshot, created) döndürür.
+
+    Sürüm numarası benzersizdir; aynı anda çalışan iki yayından biri
+    IntegrityError alırsa son sürüm yeniden okunur ve tekrar denenir.
+    Tablo boşken kilitlenecek satır olmadığından select_for_update bunu önlemez.
+    """
+    tables = _tables_from_rows(*load_location_rows())
+
+    for attempt in range(PUBLISH_ATTEMPTS):
+        try:
+            return _publish(tables, force, keep)
+        except IntegrityError:
+            if attempt == PUBLISH_ATTEMPTS - 1:
+                raise
+
+
+def _publish(tables, force, keep):
+    with transaction.atomic():
+        latest = (
+            LocationSnapshot.objects.select_for_update()
+            .defer('payload')
+            .order_by('-version')
+            .first()
+        )
+        version = (latest.version if latest else 0) + 1
+        payload, checksum = build_snapshot_payload(version, tables)
+
+        if latest and latest.checksum == checksum and not force:
+            return latest, False
+
+        snapshot = LocationSnapshot.objects.create(
+            version=version,
+            checksum=checksum,
+            payload=payload,
+            size=len(payload),
+            city_count=len(tables['cities']),
+            district_count=len(tables['districts']),
+            neighborhood_count=len(tables['neighborhoods']),
+        )
+
+        if keep:
+            LocationSnapshot.objects.filter(version__lte=version - keep).delete()
+    return snapshot, True
+
+
+def _load_latest_snapshot():
+    return LocationSnapshot.objects.filter(is_active=True).order_by('-version').first()
+
+
+_latest_snapshot = VersionedValue(SNAPSHOT_NAMESPACE, _load_latest_snapshot)
+
+
+def get_latest_snapshot():
+    """Süreç içinde tutulan en güncel anlık görüntüyü döndürür (yoksa None)"""
+    return _latest_snapshot.get()
+
+
+def invalidate_latest_snapshot():
+    bump_version_on_commit(SNAPSHOT_NAMESPACE)
+
+
+def _diff_table(old, new, columns):
+    upserts = [(pk,) + values for pk, values in new.items() if old.get(pk) != values]
+    deletes = sorted(pk for pk in old if pk not in new)
+    return {
+        'upsert': encode_columns(upserts, columns),
+        'delete': deletes,
+    }
+
+
+def build_location_delta(since, snapshot):
+    """
+    since sürümünden verilen anlık görüntüye kadar değişen satırları döndürür.
+    Sonuç gzip ile sıkıştırılmış JSON'dur ve paylaşılan cache'te saklanır.
+    since sürümü artık saklanmıyorsa None döner; istemci tam veriyi indirmelidir.
+    """
+    key = DELTA_CACHE_KEY.format(since, snapshot.version)
+    payload = cache.get(key)
+    if payload is not None:
+        return payload
+
+    base = LocationSnapshot.objects.filter(version=since).first()
+    if base is None:
+        return None
+
+    old_tables = load_snapshot_tables(base)
+    new_tables = load_snapshot_tables(snapshot)
+    payload = gzip.compress(_dumps({
+        'format': SNAPSHOT_FORMAT,
+        'from': since,
+        'version': snapshot.version,
+        'columns': SNAPSHOT_COLUMNS,
+        'tables': {
+            name: _diff_table(old_tables[name], new_tables[name], columns)
+            for name, columns in SNAPSHOT_COLUMNS.items()
+        },
+    }), mtime=0)
+    cache.set(key, payload, DELTA_CACHE_TIMEOUT)
+    return payload
@@ -0,0 +1,188 @@
+from django.db.models import Count, F, Min, OuterRef, Q, Subquery, Sum
+from django.utils import timezone
+
+from .models import (
+    APIUsage, Branch, Company, CompanyStatistics, Employee, FileStorage,
+    Invoice, Subscription
+)
+from .entitlements import active_subscriptions
+
+RECONCILE_BATCH_SIZE = 500
+
+# Sayaç grupları: (model, şirket alanı, hesaplanan alanlar)
+COUNTER_GROUPS = {
+    'branches': (Branch, 'company_id', {
+        'total_branches': Count('id'),
+    }),
+    'employees': (Employee, 'branch__company_id', {
+        'total_employees': Count('id'),
+        'active_employees': Count('id', filter=Q(is_active=True, termination_date__isnull=True)),
+    }),
+    'storage': (FileStorage, 'company_id', {
+        'storage_used': Sum('file_size'),
+    }),
+    'invoices': (Invoice, 'subscription__company_id', {
+        'total_invoices': Count('id'),
+        'pending_invoices': Count('id', filter=Q(status='pending')),
+    }),
+}
+
+# Gruba göre güncellenen tablo alanları
+GROUP_FIELDS = {
+    **{name: tuple(aggregates) for name, (_, _, aggregates) in COUNTER_GROUPS.items()},
+    'api': ('api_calls_today', 'api_calls_date'),
+    'subscription': ('active_subscription_id', 'next_subscription_start'),
+}
+
+ALL_GROUPS = tuple(GROUP_FIELDS)
+
+
+def is_counted_active(employee):
+    """Çalışan aktif çalışan sayacına dahil mi?"""
+    return employee.is_active and employee.termination_date is None
+
+
+def _defaults(groups, today):
+    values = {}
+    for group in groups:
+        for field in GROUP_FIELDS[group]:
+            values[field] = None if field in ('active_subscription_id', 'next_subscription_start') else 0
+    if 'api' in groups:
+        values['api_calls_date'] = today
+    return values
+
+
+def compute_statistics(company_ids=None, groups=ALL_GROUPS, now=None):
+    """
+    Verilen şirketlerin (None ise tümünün) istatistiklerini hesaplar.
+    Grup başına tek bir GROUP BY sorgusu yapılır; {şirket id: {alan: değer}} döner.
+    """
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    if company_ids is None:
+        ids = list(Company.objects.order_by().values_list('id', flat=True))
+    else:
+        ids = list(company_ids)
+    stats = {company_id: _defaults(groups, today) for company_id in ids}
+
+    def scoped(queryset, lookup):
+        if company_ids is not None:
+            queryset = queryset.filter(**{f'{lookup}__in': ids})
+        return queryset.order_by().values(stats_company=F(lookup))
+
+    for group in groups:
+        if group in COUNTER_GROUPS:
+            model, lookup, aggregates = COUNTER_GROUPS[group]
+            rows = scoped(model.objects.all(), lookup).annotate(**aggregates)
+        elif group == 'api':
+            rows = scoped(APIUsage.objects.filter(date=today), 'company_id').annotate(
+                api_calls_today=Sum('requests_count')
+            )
+        else:
+            current = active_subscriptions(OuterRef('pk'), now)
+            upcoming = Subscription.objects.filter(
+                company=OuterRef('pk'),
+                status='active',
+                is_active=True,
+                start_date__gt=now
+            ).order_by().values('company').annotate(first=Min('start_date')).values('first')
+            rows = scoped(Company.objects.all(), 'id').annotate(
+                active_subscription_id=Subquery(current.values('id')[:1]),
+                next_subscription_start=Subquery(upcoming[:1]),
+            )
+
+        for row in rows:
+            values = stats.get(row.pop('stats_company'))
+            if values is not None:
+                values.update({key: value or values[key] for key, value in row.items()})
+    return stats
+
+
+def rebuild_company_statistics(company_ids=None, batch_size=RECONCILE_BATCH_SIZE):
+    """
+    İstatistik tablosunu baştan hesaplayıp toplu olarak yazar (upsert).
+    Yalnızca değişen satırlar yazılır; (kontrol edilen, düzeltilen) sayısını döndürür.
+    """
+    stats = compute_statistics(company_ids)
+    fields = [field for group in ALL_GROUPS for field in GROUP_FIELDS[group]]
+    existing = {
+        row['company_id']: row
+        for row in CompanyStatistics.objects.filter(company_id__in=list(stats))
+        .values('company_id', *fields)
+    }
+
+    changed = [
+        CompanyStatistics(company_id=company_id, **values)
+        for company_id, values in stats.items()
+        if existing.get(company_id) != {'company_id': company_id, **values}
+    ]
+    if changed:
+        CompanyStatistics.objects.bulk_create(
+            changed,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['company'],
+            update_fields=[field.removesuffix('_id') for field in fields] + ['updated_at'],
+        )
+    return len(stats), len(changed)
+
+
+def refresh_statistics(company_id, *groups):
+    """Şirketin verilen sayaç gruplarını yeniden hesaplar (satır yoksa dokunmaz)"""
+    if company_id is None:
+        return
+    values = compute_statistics([company_id], groups)[company_id]
+    CompanyStatistics.objects.filter(company_id=company_id).update(
+        **values, updated_at=timezone.now()
+    )
+
+
+def adjust_statistics(company_id, **deltas):
+    """
+    Sayaçları F() ifadeleriyle artırır/azaltır; okuma yapmadan tek UPDATE sorgusu.
+    Satır henüz yoksa bir şey yapılmaz, ilk okumada baştan hesaplanır.
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if company_id is None or not deltas:
+        return
+    CompanyStatistics.objects.filter(company_id=company_id).update(
+        **{field: F(field) + delta for field, delta in deltas.items()},
+        updated_at=timezone.now()
+    )
+
+
+def build_company_statistics(company, branches=1, subscription=None):
+    """Yeni şirket için istatistik satırını (kaydetmeden) hazırlar"""
+    return CompanyStatistics(
+        company=company,
+        total_branches=branches,
+        api_calls_date=timezone.localdate(),
+        active_subscription=subscription,
+    )
+
+
+def get_company_statistics(company_id, companies=None):
+    """
+    Şirketin istatistik satırını aktif abonelik ve planıyla tek sorguda okur.
+    companies verilirse yalnızca o kümedeki şirketler okunabilir.
+    Satır yoksa hesaplanıp oluşturulur; şirket yoksa None döner.
+    """
+    try:
+        company_id = int(company_id)
+    except (TypeError, ValueError):
+        return None
+
+    queryset = CompanyStatistics.objects.select_related('active_subscription__plan')
+    if companies is not None:
+        queryset = queryset.filter(company__in=companies)
+
+    stats = queryset.filter(company_id=company_id).first()
+    if stats is None:
+        if not (companies if companies is not None else Company.objects).filter(pk=company_id).exists():
+            return None
+        rebuild_company_statistics([company_id])
+        stats = queryset.filter(company_id=company_id).first()
+    elif not stats.is_subscription_current():
+        refresh_statistics(stats.company_id, 'subscription')
+        stats = queryset.filter(company_id=company_id).first()
+    return stats
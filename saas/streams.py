@@ -0,0 +1,194 @@
+import asyncio
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger(__name__)
+
+STREAM_CHANNEL = 'saas:notifications:stream'
+
+# Bağlantı başına bekleyen en fazla olay; dolarsa yeni olaylar atılır
+STREAM_QUEUE_SIZE = 100
+
+# Boşta bağlantıların proxy'lerde kapanmaması için yorum satırı aralığı (sn)
+HEARTBEAT_INTERVAL = 25
+
+# Bağlantı koptuğunda istemcinin yeniden bağlanma gecikmesi (ms)
+RETRY_INTERVAL = 5000
+
+# Redis dinleyicisi koparsa yeniden bağlanma gecikmesi (sn)
+BROKER_RETRY_INTERVAL = 5
+
+
+class StreamHub:
+    """
+    Süreç başına tek olay dağıtıcısı. Bağlı her istemcinin bir kuyruğu
+    olur; broker'dan gelen mesaj yalnızca hedef kullanıcıların kuyruklarına
+    yazılır. Boşta bağlantılar kuyruklarında bekler, işlemci harcamaz.
+    """
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.subscribers = {}
+        self.listener = None
+
+    def subscribe(self, user_id):
+        queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        self.subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        queues = self.subscribers.get(user_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self.subscribers[user_id]
+
+    def dispatch(self, message):
+        """Mesajı hedef kullanıcıların bağlantılarına iletir (olay döngüsünde)"""
+        user_ids = message['users']
+        if len(user_ids) > len(self.subscribers):
+            user_ids = set(user_ids)
+            targets = [user_id for user_id in self.subscribers if user_id in user_ids]
+        else:
+            targets = [user_id for user_id in user_ids if user_id in self.subscribers]
+
+        event = message['event']
+        for user_id in targets:
+            for queue in self.subscribers[user_id]:
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    logger.warning('Kullanıcı %s için olay kuyruğu dolu, olay atlandı', user_id)
+
+
+class LocalBroker:
+    """Süreç içi broker: yayınlanan mesaj aynı süreçteki dağıtıcıya gider"""
+
+    def __init__(self):
+        self.hubs = set()
+        self._lock = threading.Lock()
+
+    def publish(self, message):
+        with self._lock:
+            hubs = list(self.hubs)
+        for hub in hubs:
+            if hub.loop.is_closed():
+                continue
+            hub.loop.call_soon_threadsafe(hub.dispatch, message)
+
+    async def listen(self, hub):
+        with self._lock:
+            self.hubs.add(hub)
+        try:
+            await asyncio.Future()
+        finally:
+            with self._lock:
+                self.hubs.discard(hub)
+
+
+class RedisBroker:
+    """Redis pub/sub broker: tüm süreçlerin (ve Celery worker'larının) yayınları"""
+
+    def __init__(self, url, channel=STREAM_CHANNEL):
+        self.url = url
+        self.channel = channel
+        self._client = None
+
+    def publish(self, message):
+        import redis
+
+        if self._client is None:
+            self._client = redis.Redis.from_url(self.url)
+        self._client.publish(self.channel, json.dumps(message, cls=DjangoJSONEncoder))
+
+    async def listen(self, hub):
+        import redis.asyncio
+
+        while True:
+            client = redis.asyncio.Redis.from_url(self.url)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for item in pubsub.listen():
+                        if item['type'] == 'message':
+                            hub.dispatch(json.loads(item['data']))
+            except (OSError, redis.RedisError):
+                logger.warning('Bildirim akışı Redis\'e bağlanamadı, yeniden denenecek')
+                await asyncio.sleep(BROKER_RETRY_INTERVAL)
+            finally:
+                await client.aclose()
+
+
+_broker = None
+_hub = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """NOTIFICATION_STREAM_BROKER_URL tanımlıysa Redis, değilse süreç içi broker"""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            url = getattr(settings, 'NOTIFICATION_STREAM_BROKER_URL', None)
+            _broker = RedisBroker(url) if url else LocalBroker()
+        return _broker
+
+
+def get_hub():
+    """Çalışan olay döngüsünün dağıtıcısı; broker dinleyicisi ilk çağrıda başlar"""
+    global _hub
+    loop = asyncio.get_running_loop()
+    if _hub is None or _hub.loop is not loop:
+        _hub = StreamHub(loop)
+    if _hub.listener is None or _hub.listener.done():
+        _hub.listener = loop.create_task(get_broker().listen(_hub))
+    return _hub
+
+
+def publish(user_ids, event, data, event_id=None):
+    """
+    Kullanıcılara olay yayınlar. Yayın hatası bildirimin kendisini
+    etkilemez; istemci yeniden bağlandığında listeden tamamlar.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    message = {
+        'users': user_ids,
+        'event': {'event': event, 'id': event_id, 'data': data},
+    }
+    try:
+        get_broker().publish(message)
+    except Exception:
+        logger.warning('Bildirim akışına olay yayınlanamadı', exc_info=True)
+
+
+def format_event(event):
+    """Olayı text/event-stream biçimine çevirir"""
+    lines = []
+    if event.get('id') is not None:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"event: {event['event']}")
+    lines.append(f"data: {json.dumps(event['data'], cls=DjangoJSONEncoder)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+async def event_stream(user_id):
+    """Kullanıcının olaylarını bağlantı kapanana kadar üretir"""
+    hub = get_hub()
+    queue = hub.subscribe(user_id)
+    try:
+        yield f'retry: {RETRY_INTERVAL}\n\n'
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+                continue
+            yield format_event(event)
+    finally:
+        hub.unsubscribe(user_id, queue)
@@ -0,0 +1,33 @@
+try:
+    from celery import shared_task
+except ImportError:  # Celery kurulu değilse görevler süreç içinde çağrılan fonksiyonlar olarak kalır
+    def shared_task(**options):
+        return lambda func: func
+
+from .notifications import (
+    fan_out, publish_announcement, publish_due_announcements, reconcile_unread_counts
+)
+
+
+@shared_task(ignore_result=True)
+def fan_out_notification(notification_id):
+    """Bildirimin alıcı kayıtlarını Celery worker'ında oluşturur"""
+    return fan_out(notification_id)
+
+
+@shared_task(ignore_result=True)
+def publish_announcement_notification(announcement_id):
+    """Duyurunun bildirimini yayın tarihinde oluşturur"""
+    publish_announcement(announcement_id)
+
+
+@shared_task(ignore_result=True)
+def publish_due_announcement_notifications():
+    """Yayına girmiş, bildirimi eksik duyuruları tamamlar (periyodik)"""
+    return publish_due_announcements()
+
+
+@shared_task(ignore_result=True)
+def reconcile_unread_notification_counts():
+    """Okunmamış bildirim sayaçlarını veritabanıyla eşitler (periyodik)"""
+    return reconcile_unread_counts()
@@ -0,0 +1,141 @@
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Optional
+
+from .entitlements import get_entitlement
+from .models import Employee, Subscription
+
+# İstek üzerinde çözülmüş bağlamın saklandığı öznitelik
+TENANT_CACHE_ATTR = '_saas_tenant'
+
+
+@dataclass(frozen=True)
+class TenantContext:
+    """
+    İsteği yapan kullanıcının çalışan, şube, şirket, rol ve aktif abonelik
+    bilgileri. İstek başına bir kez çözülür; viewset'ler ve yetki kontrolleri
+    user.employee.branch.company zinciri yerine bu bağlamı kullanır.
+    Yalnızca id'leri taşıdığından token claim'lerinden de kurulabilir.
+    """
+    user_id: Optional[int] = None
+    is_authenticated: bool = False
+    is_staff: bool = False
+    is_superuser: bool = False
+    employee_id: Optional[int] = None
+    branch_id: Optional[int] = None
+    company_id: Optional[int] = None
+    role: Optional[str] = None
+
+    @property
+    def has_employee(self):
+        return self.employee_id is not None
+
+    @cached_property
+    def entitlement(self):
+        """Şirketin hak bilgisi (önbellekten, ilk erişimde okunur)"""
+        if self.company_id is None:
+            return None
+        return get_entitlement(self.company_id)
+
+    @property
+    def is_company_admin(self):
+        """Şirket yöneticisi mi?"""
+        return self.role == 'company_admin'
+
+    @property
+    def is_branch_admin(self):
+        """Şube yöneticisi mi?"""
+        return self.role == 'branch_admin'
+
+    @property
+    def is_system_user(self):
+        """Süper kullanıcı veya sistem personeli mi?"""
+        return self.is_superuser or self.is_staff
+
+    @property
+    def subscription_id(self):
+        return self.entitlement.subscription_id if self.entitlement else None
+
+    @property
+    def plan_id(self):
+        return self.entitlement.plan_id if self.entitlement else None
+
+    @property
+    def subscription_end(self):
+        return self.entitlement.expires_at if self.entitlement else None
+
+    @property
+    def has_active_subscription(self):
+        return self.entitlement is not None and self.entitlement.is_active()
+
+    def get_subscription(self):
+        """Aktif aboneliği planıyla birlikte tek sorguda getirir (yoksa None)"""
+        if self.subscription_id is None:
+            return None
+        return (
+            Subscription.objects.select_related('plan')
+            .filter(id=self.subscription_id)
+            .first()
+        )
+
+
+ANONYMOUS_TENANT = TenantContext()
+
+
+def resolve_tenant(user):
+    """
+    Kullanıcının bağlamını tek bir JOIN sorgusuyla çözer.
+    Çalışan, şube ve şirket select_related ile gelir; aktif abonelik şirketin
+    önbellekteki hak bilgisinden ilk erişimde okunur. Sonuç user.employee önbelleğine de
+    yazılır; böylece user.employee.branch.company zinciri yeni sorgu yapmaz.
+    """
+    if user is None or not user.is_authenticated:
+        return ANONYMOUS_TENANT
+
+    employee = (
+        Employee.objects.select_related('branch__company')
+        .filter(user_id=user.pk)
+        .order_by()
+        .first()
+    )
+
+    # Ters one-to-one önbelleği: hasattr(user, 'employee') artık sorgu yapmaz
+    Employee.user.field.remote_field.set_cached_value(user, employee)
+    if employee is None:
+        return TenantContext(
+            user_id=user.pk,
+            is_authenticated=True,
+            is_staff=user.is_staff,
+            is_superuser=user.is_superuser,
+        )
+
+    Employee.user.field.set_cached_value(employee, user)
+    return TenantContext(
+        user_id=user.pk,
+        is_authenticated=True,
+        is_staff=user.is_staff,
+        is_superuser=user.is_superuser,
+        employee_id=employee.id,
+        branch_id=employee.branch_id,
+        company_id=employee.branch.company_id,
+        role=employee.role,
+    )
+
+
+def get_tenant(request):
+    """
+    İsteğin bağlamını döndürür; aynı istek içinde yalnızca bir kez çözülür.
+    DRF kimlik doğrulaması middleware'lerden sonra çalıştığından bağlam,
+    çözüldüğü kullanıcıya göre saklanır ve kullanıcı değişirse yenilenir.
+    """
+    http_request = getattr(request, '_request', request)
+    user = getattr(request, 'user', None)
+    user_id = user.pk if user is not None and user.is_authenticated else None
+
+    cached = getattr(http_request, TENANT_CACHE_ATTR, None)
+    if cached is not None and cached.user_id == user_id:
+        return cached
+
+    tenant = resolve_tenant(user)
+    setattr(http_request, TENANT_CACHE_ATTR, tenant)
+    return tenant
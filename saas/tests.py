@@ -1,3 +1,1581 @@
-from django.test import TestCase
+import dataclasses
+import datetime
+import gzip
+import io
+import json
+import tarfile
+import tempfile
+import uuid
+import zipfile
+from contextlib import contextmanager
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import orjson
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import AnonymousUser, Permission, User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.models.signals import post_delete
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from .authentication import issue_tokens, user_states
+from .entitlements import get_entitlement
+from .fast_read import compile_reader
+from .imports import openpyxl
+from .location_sources import (
+    CITY_FILE, DISTRICT_FILE, LOCATION_FILES, NEIGHBORHOOD_FILES, iter_json_array,
+    iter_location_file, open_location_source
+)
+from .login import LOGIN_QUERY_BUDGET
+from .maintenance import get_active_maintenances
+from .notifications import (
+    FANOUT_LOCK_KEY, UNREAD_KEY, count_unread, fan_out, get_unread_count, publish_due_announcements,
+    reconcile_unread_counts
+)
+from .models import (
+    Announcement, Branch, City, Company, CompanyStatistics, District, Employee, FileStorage,
+    Invoice, LocationSnapshot, MaintenanceMode, Neighborhood, Notification, NotificationRecipient,
+    Plan
+)
+from .renderers import ORJSONParser, ORJSONRenderer, dumps
+from .response_cache import stored_company_of
+from .search import LocationIndex, normalize
+from .slugs import allocate_slug, allocate_slugs
+from .snapshots import publish_location_snapshot
+from .serializers import BranchSerializer, NeighborhoodSerializer
+from .tenancy import ANONYMOUS_TENANT, get_tenant, resolve_tenant
+
+
+# Test verisindeki konumlar: {il id: ad}, {ilçe id: (il id, ad)}, {mahalle id: (ilçe id, ad)}
+LOCATION_CITIES = {6: 'Ankara'}
+LOCATION_DISTRICTS = {1: (6, 'Çankaya')}
+LOCATION_NEIGHBORHOODS = {1: (1, 'Kızılay')}
+
+
+def write_location_source(directory, cities, districts, neighborhoods):
+    """
+    Konumları load_locations'ın okuduğu JSON dosyaları olarak dizine yazar.
+    Mahalleler kaynaktaki gibi dört dosyaya bölünür.
+    """
+    directory = Path(directory)
+    rows = {
+        CITY_FILE: [
+            {'sehir_id': str(city_id), 'sehir_adi': name} for city_id, name in cities.items()
+        ],
+        DISTRICT_FILE: [
+            {'ilce_id': str(district_id), 'sehir_id': str(city_id), 'ilce_adi': name}
+            for district_id, (city_id, name) in districts.items()
+        ],
+    }
+    for name in NEIGHBORHOOD_FILES:
+        rows[name] = []
+    for index, (neighborhood_id, (district_id, name)) in enumerate(neighborhoods.items()):
+        rows[NEIGHBORHOOD_FILES[index % len(NEIGHBORHOOD_FILES)]].append({
+            'mahalle_id': str(neighborhood_id), 'mahalle_adi': name, 'ilce_id': str(district_id),
+        })
+    for name, items in rows.items():
+        (directory / name).write_text(json.dumps(items, ensure_ascii=False), encoding='utf-8')
+    return directory
+
+
+class SaasTestCase(TestCase):
+    """
+    Ortak test verisi: deneme planı (migration'dan) ve bir mahalle. Testler
+    core.test_settings ile süreç içi cache kullanır; cache testler arasında
+    temizlenir, sürüm anahtarları düştüğünden süreç içi önbellekler de yenilenir.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        # Deneme planı (ID: 1) 0002 migration'ı ile oluşturulur
+        cls.plan = Plan.objects.get(pk=1)
+        # ID'ler konum kaynağındaki (bkz. write_location_source) ID'lerle aynıdır
+        with cls.commit():
+            city = City.objects.create(id=6, name='Ankara', code='06')
+            district = District.objects.create(id=1, city=city, name='Çankaya')
+            cls.neighborhood = Neighborhood.objects.create(id=1, district=district, name='Kızılay')
+
+    def setUp(self):
+        cache.clear()
+        user_states.clear()
+
+    def create_company(self, name, tax_number):
+        return Company.objects.create(
+            name=name, tax_number=tax_number, tax_office='Çankaya', phone='3120000000',
+            email=f'{tax_number}@example.com', address='Adres', neighborhood=self.neighborhood
+        )
+
+    def create_employee(self, branch, username, role='employee'):
+        user = User.objects.create_user(username, first_name=username.title(), last_name='Test')
+        return Employee.objects.create(
+            user=user, branch=branch, role=role,
+            identity_number=str(10000000000 + User.objects.count()),
+            birth_date=datetime.date(1990, 1, 1), gender='M', phone='5550000000',
+            address='Adres', hire_date=datetime.date(2020, 1, 1), neighborhood=self.neighborhood
+        )
+
+    def client_for(self, user):
+        client = APIClient()
+        token = issue_tokens(user, resolve_tenant(user)).access_token
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    @classmethod
+    @contextmanager
+    def commit(cls):
+        """
+        Commit'ten sonra çalışan geçersiz kılmaları test içinde çalıştırır ve
+        gerçek commit gibi bekleyenlerden çıkarır. Test verisi de bununla
+        oluşturulur; bekleyen aynı çağrı kalırsa on_commit_once sonraki
+        geçersiz kılmayı yenisi saymaz.
+        """
+        connection = transaction.get_connection()
+        start = len(connection.run_on_commit)
+        with cls.captureOnCommitCallbacks(execute=True):
+            yield
+        del connection.run_on_commit[start:]
+
+    def load_locations(self, cities, districts, neighborhoods, **options):
+        """Konumları geçici bir dizinden load_locations ile yükler; komut çıktısını döndürür"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        write_location_source(directory.name, cities, districts, neighborhoods)
+        stdout = io.StringIO()
+        with self.commit():
+            call_command('load_locations', source=directory.name, stdout=stdout, **options)
+        return stdout.getvalue()
+
+    @staticmethod
+    def result_ids(response):
+        data = response.json()
+        rows = data['results'] if isinstance(data, dict) else data
+        return {row['id'] for row in rows}
+
+
+class ResponseCacheTests(SaasTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.commit():
+            self.company_a = self.create_company('A Şirketi', '1000000001')
+            self.company_b = self.create_company('B Şirketi', '1000000002')
+            branch_a = self.company_a.branches.get()
+            branch_b = self.company_b.branches.get()
+            self.admin_a = self.create_employee(branch_a, 'admin_a', 'company_admin')
+            self.admin_b = self.create_employee(branch_b, 'admin_b', 'company_admin')
+            self.employee_a = self.create_employee(branch_a, 'employee_a')
+
+    def test_employee_list_is_isolated_per_tenant(self):
+        expected = {
+            self.admin_a.user: {self.admin_a.id, self.employee_a.id},
+            self.admin_b.user: {self.admin_b.id},
+            self.employee_a.user: {self.employee_a.id},
+        }
+        clients = {user: self.client_for(user) for user in expected}
+        # İkinci tur önbellekten okunur; yine her kullanıcı yalnızca kendi verisini görür
+        for _ in range(2):
+            for user, ids in expected.items():
+                response = clients[user].get('/api/v1/employees/')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(self.result_ids(response), ids)
+
+    def test_cached_list_is_invalidated_on_update_and_delete(self):
+        client = self.client_for(self.admin_a.user)
+        client.get('/api/v1/employees/')
+
+        with self.commit():
+            self.employee_a.phone = '5551112233'
+            self.employee_a.save()
+        rows = client.get('/api/v1/employees/').json()
+        self.assertIn('5551112233', [row['phone'] for row in rows])
+
+        with self.commit():
+            self.employee_a.delete()
+        response = client.get('/api/v1/employees/')
+        self.assertEqual(self.result_ids(response), {self.admin_a.id})
+
+
+    def cached_keys(self, url, users):
+        """Kullanıcılar sırayla listeyi okur; yazılan yanıt anahtarlarını döndürür"""
+        with mock.patch('saas.response_cache.cache', wraps=cache) as response_cache:
+            for user in users:
+                self.assertEqual(self.client_for(user).get(url).status_code, 200)
+        return {call.args[0] for call in response_cache.set.call_args_list}
+
+    def test_responses_are_keyed_per_tenant_by_default(self):
+        root = User.objects.create_superuser('root', 'root@example.com', 'pw')
+        users = [self.admin_a.user, self.admin_b.user, self.employee_a.user, root]
+        self.assertEqual(len(self.cached_keys('/api/v1/branches/', users)), 4)
+        # Planlar kapsamdan açıkça çıkarılmıştır; tüm kullanıcılar aynı yanıtı paylaşır
+        self.assertEqual(len(self.cached_keys('/api/v1/plans/', users)), 1)
+
+    def test_stored_company_is_read_only_when_the_owner_changes(self):
+        branch = Branch.objects.get(pk=self.employee_a.branch_id)
+        employee = Employee.objects.get(pk=self.employee_a.pk)
+        with mock.patch('saas.signals.stored_company_of', wraps=stored_company_of) as stored:
+            branch.phone = '3129999999'
+            branch.save()
+            employee.phone = '5559999999'
+            employee.save()
+            self.assertEqual(stored.call_count, 0)
+
+            employee.branch = self.company_b.branches.get()
+            employee.save()
+            self.assertEqual(stored.call_count, 1)
+
+
+class ConditionalGetTests(SaasTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.commit():
+            user = User.objects.create_superuser('root', 'root@example.com', 'pw')
+        self.client = self.client_for(user)
+
+    def test_list_returns_304_until_data_changes(self):
+        response = self.client.get('/api/v1/plans/')
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+
+        response = self.client.get('/api/v1/plans/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.commit():
+            self.plan.price = 100
+            self.plan.save()
+        response = self.client.get('/api/v1/plans/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+
+class FastReadTests(SaasTestCase):
+    def test_compiled_reader_matches_serializer(self):
+        company = self.create_company('A Şirketi', '1000000001')
+        Branch.objects.create(
+            company=company, name='Şube 2', phone='3120000001', email='sube@example.com',
+            address='Adres', neighborhood=None
+        )
+        reader = compile_reader(BranchSerializer, Branch)
+        self.assertIsNotNone(reader)
+
+        queryset = Branch.objects.order_by('id')
+        fast = orjson.loads(dumps(reader.rows(reader.values(queryset))))
+        expected = orjson.loads(dumps(BranchSerializer(queryset, many=True).data))
+        self.assertEqual(fast, expected)
+
+
+    def create_rows(self):
+        """Boş ilişkiler, Decimal, tarih ve seçim alanları içeren örnek veri"""
+        with self.commit():
+            company = self.create_company('Çiçek Şirketi', '1000000001')
+            branch = Branch.objects.create(
+                company=company, name='Şube 2', phone='3120000001', email='sube@example.com',
+                address='Adres', neighborhood=None
+            )
+            self.create_employee(company.branches.get(is_main_branch=True), 'ayse', 'company_admin')
+            employee = self.create_employee(branch, 'ömer')
+            employee.termination_date = datetime.date(2024, 5, 1)
+            employee.neighborhood = None
+            employee.save()
+            subscription = company.subscriptions.get()
+            for number, status, amount, paid_at in [
+                ('F-1', 'pending', Decimal('100.00'), None),
+                ('F-2', 'paid', Decimal('99.90'), timezone.now()),
+            ]:
+                Invoice.objects.create(
+                    subscription=subscription, number=number, amount=amount,
+                    currency=self.plan.currency, status=status, paid_at=paid_at,
+                    due_date=datetime.date(2030, 1, 1), notes='Not\u2028satırı'
+                )
+            root = User.objects.create_superuser('root', 'root@example.com', 'pw')
+        return self.client_for(root)
+
+    def test_fast_path_is_byte_identical_to_serializer_path(self):
+        client = self.create_rows()
+        for url in ('/api/v1/branches/', '/api/v1/employees/', '/api/v1/invoices/'):
+            for params in ({}, {'fields': 'id,created_at'}, {'expand': ''}):
+                cache.clear()
+                with mock.patch('saas.fast_read.compile_reader', wraps=compile_reader) as compile_fast:
+                    fast = client.get(url, params)
+                # Serializer derlenebilmeli; aksi halde iki istek de normal yoldan geçer
+                self.assertIsNotNone(compile_reader(*compile_fast.call_args.args), url)
+                cache.clear()
+                with mock.patch('saas.fast_read.compile_reader', return_value=None):
+                    slow = client.get(url, params)
+                self.assertEqual(fast.status_code, 200)
+                self.assertEqual(fast.content, slow.content, (url, params))
+
+
+class KeysetPaginationTests(SaasTestCase):
+    def test_pages_are_complete_when_created_at_is_equal(self):
+        notifications = [
+            Notification.objects.create(title=f'Bildirim {i}', message='Mesaj', scope='all')
+            for i in range(7)
+        ]
+        Notification.objects.update(created_at=timezone.now())
+        client = self.client_for(User.objects.create_superuser('root', 'root@example.com', 'pw'))
+
+        seen = []
+        url = '/api/v1/notifications/?page_size=3'
+        while url:
+            data = client.get(url).json()
+            seen.extend(row['id'] for row in data['results'])
+            url = data['next']
+        self.assertEqual(seen, sorted((n.id for n in notifications), reverse=True))
+
+
+class AuthVersionTests(SaasTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.commit():
+            company = self.create_company('A Şirketi', '1000000001')
+            branch = company.branches.get()
+            self.employee = self.create_employee(branch, 'employee_a')
+            self.colleague = self.create_employee(branch, 'colleague_a')
+        self.client = self.client_for(self.employee.user)
+
+    def test_role_change_applies_to_existing_token(self):
+        response = self.client.get('/api/v1/employees/')
+        self.assertEqual(self.result_ids(response), {self.employee.id})
+
+        with self.commit():
+            self.employee.role = 'company_admin'
+            self.employee.save()
+        response = self.client.get('/api/v1/employees/')
+        self.assertEqual(self.result_ids(response), {self.employee.id, self.colleague.id})
+
+    def test_deactivated_user_is_rejected(self):
+        self.assertEqual(self.client.get('/api/v1/employees/').status_code, 200)
+
+        with self.commit():
+            self.employee.user.is_active = False
+            self.employee.user.save()
+        self.assertEqual(self.client.get('/api/v1/employees/').status_code, 401)
+
+
+class AnnouncementNotificationTests(SaasTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.commit():
+            self.company_a = self.create_company('A Şirketi', '1000000001')
+            company_b = self.create_company('B Şirketi', '1000000002')
+            branch_a = self.company_a.branches.get()
+            self.admin_a = self.create_employee(branch_a, 'admin_a', 'company_admin')
+            self.employee_a = self.create_employee(branch_a, 'employee_a')
+            self.create_employee(company_b.branches.get(), 'employee_b')
+            self.root = User.objects.create_superuser('root', 'root@example.com', 'pw')
+            User.objects.create_user('plain')
+
+        # Bildirim oluşturma ve dağıtım iş parçacığına bırakılmadan burada çalıştırılır
+        submit = mock.patch('saas.notifications._submit', side_effect=lambda func, *args: func(*args))
+        submit.start()
+        self.addCleanup(submit.stop)
+
+    def recipients(self, announcement):
+        return set(
+            NotificationRecipient.objects
+            .filter(notification__reference_model='Announcement', notification__reference_id=announcement.id)
+            .values_list('user_id', flat=True)
+        )
+
+    @mock.patch('saas.notifications.publish')
+    def test_company_targeted_announcement_reaches_only_eligible_users(self, publish):
+        with self.commit():
+            announcement = Announcement.objects.create(
+                title='Bakım', content='Hafta sonu bakım yapılacak', target_role='employee'
+            )
+            announcement.target_companies.set([self.company_a])
+        recipients = self.recipients(announcement)
+        self.assertEqual(recipients, {self.employee_a.user_id, self.root.id})
+        self.assertEqual(set(publish.call_args.args[0]), recipients)
+        # Alıcılar duyuruyu görebilen kullanıcılarla aynıdır
+        for user in User.objects.all():
+            self.assertEqual(announcement.can_view(user), user.id in recipients)
+
+    def test_api_announcement_is_notified_after_its_targets_are_written(self):
+        client = self.client_for(self.root)
+        with self.commit():
+            response = client.post('/api/v1/announcements/', {
+                'title': 'Yeni özellik', 'content': 'Raporlar yenilendi', 'priority': 'low',
+                'target_role': 'company_admin', 'target_companies': [self.company_a.id],
+            }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        announcement = Announcement.objects.get(pk=response.json()['id'])
+        self.assertEqual(self.recipients(announcement), {self.admin_a.user_id, self.root.id})
+
+    def test_scheduled_announcement_is_notified_when_published(self):
+        publish_date = timezone.now() + datetime.timedelta(hours=1)
+        with self.commit():
+            announcement = Announcement.objects.create(
+                title='Sürüm', content='Yeni sürüm yayında', publish_date=publish_date
+            )
+        self.assertFalse(Notification.objects.filter(reference_id=announcement.id).exists())
+        self.assertEqual(publish_due_announcements(), 0)
+
+        with self.commit():
+            self.assertEqual(publish_due_announcements(publish_date + datetime.timedelta(minutes=1)), 1)
+        self.assertEqual(len(self.recipients(announcement)), User.objects.exclude(username='plain').count())
+        # Bildirim bir kez oluşturulur
+        self.assertEqual(publish_due_announcements(publish_date + datetime.timedelta(minutes=2)), 0)
+
+    @override_settings(NOTIFICATION_FANOUT_BACKEND='celery')
+    @mock.patch('saas.notifications._send_to_celery', return_value=True)
+    def test_celery_task_is_deferred_until_the_publish_date(self, send_to_celery):
+        publish_date = timezone.now() + datetime.timedelta(hours=1)
+        with self.commit():
+            announcement = Announcement.objects.create(
+                title='Sürüm', content='Yeni sürüm yayında', publish_date=publish_date
+            )
+        send_to_celery.assert_called_once_with(
+            'publish_announcement_notification', announcement.id, eta=publish_date
+        )
+        self.assertFalse(Notification.objects.filter(reference_id=announcement.id).exists())
+
+
+class UnreadCounterTests(SaasTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.commit():
+            self.company = self.create_company('A Şirketi', '1000000001')
+            branch = self.company.branches.get()
+            self.employee = self.create_employee(branch, 'employee_a')
+            self.colleague = self.create_employee(branch, 'colleague_a')
+        self.user_id = self.employee.user_id
+        # Dağıtım iş parçacığına bırakılmadan commit sırasında çalıştırılır
+        submit = mock.patch('saas.notifications._submit', side_effect=lambda func, *args: func(*args))
+        submit.start()
+        self.addCleanup(submit.stop)
+
+    def notify(self):
+        with self.commit():
+            return Notification.objects.create(
+                title='Bildirim', message='Mesaj', scope='company', company=self.company
+            )
+
+    def test_counter_follows_fan_out_and_reads(self):
+        first = self.notify()
+        # İlk okuma veritabanından hesaplar, sonrakiler sayaçtan okunur
+        with self.assertNumQueries(1):
+            self.assertEqual(get_unread_count(self.user_id), 1)
+        second = self.notify()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(self.user_id), 2)
+        # Tekrar çalıştırılan dağıtım sayacı artırmaz
+        self.assertEqual(fan_out(second.id), 0)
+        self.assertEqual(get_unread_count(self.user_id), 2)
+
+        client = self.client_for(self.employee.user)
+        for updated, unread_count in ((1, 1), (0, 1)):
+            response = client.post('/api/v1/notifications/mark-read/', {'ids': [first.id]}, format='json')
+            self.assertEqual(response.json(), {'updated': updated, 'unread_count': unread_count})
+        response = client.post('/api/v1/notifications/mark-all-read/')
+        self.assertEqual(response.json(), {'updated': 1, 'unread_count': 0})
+        self.assertEqual(count_unread(self.user_id), 0)
+
+    def test_concurrent_fan_out_drops_the_counters(self):
+        self.assertEqual(get_unread_count(self.user_id), 0)
+        with mock.patch('saas.notifications.dispatch_fan_out'):
+            notification = self.notify()
+        # Kilidi başka bir çalıştırma tutarken eklenen satırlar sayılmaz, sayaç yeniden hesaplanır
+        cache.add(FANOUT_LOCK_KEY.format(notification.id), True)
+        self.assertEqual(fan_out(notification.id), 2)
+        self.assertIsNone(cache.get(UNREAD_KEY.format(self.user_id)))
+        self.assertEqual(get_unread_count(self.user_id), 1)
+
+    def test_reconcile_fixes_drifted_counters(self):
+        self.notify()
+        self.assertEqual(get_unread_count(self.user_id), 1)
+        self.assertEqual(get_unread_count(self.colleague.user_id), 1)
+        cache.set(UNREAD_KEY.format(self.user_id), 5)
+
+        stdout = io.StringIO()
+        call_command('reconcile_unread_counts', batch_size=1, stdout=stdout)
+        self.assertIn('2 sayaç kontrol edildi, 1 sayaç düzeltildi.', stdout.getvalue())
+        self.assertEqual(get_unread_count(self.user_id), 1)
+        # Sayacı olmayan kullanıcılar hesaplanmaz
+        cache.delete(UNREAD_KEY.format(self.colleague.user_id))
+        self.assertEqual(reconcile_unread_counts(), (1, 0))
+
+
+class NotificationStreamTests(SaasTestCase):
+    url = '/api/v1/notifications/stream/'
+
+    def setUp(self):
+        super().setUp()
+        with self.commit():
+            company = self.create_company('A Şirketi', '1000000001')
+            self.employee = self.create_employee(company.branches.get(), 'employee_a')
+        user = self.employee.user
+        self.access_token = str(issue_tokens(user, resolve_tenant(user)).access_token)
+
+    def stream_token(self):
+        response = self.client_for(self.employee.user).post('/api/v1/notifications/stream-token/')
+        self.assertEqual(response.json()['expires_in'], 60)
+        return response.json()['token']
+
+    def test_stream_requires_asgi(self):
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f'Bearer {self.access_token}')
+        self.assertEqual(response.status_code, 501)
+
+    def test_stream_token_is_not_an_access_token(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.stream_token()}')
+        self.assertEqual(client.get('/api/v1/notifications/').status_code, 401)
+
+    async def test_query_accepts_only_stream_tokens(self):
+        response = await self.async_client.get(self.url, {'token': self.access_token})
+        self.assertEqual(response.status_code, 401)
+
+        token = await sync_to_async(self.stream_token)()
+        response = await self.async_client.get(self.url, {'token': token})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        await response.streaming_content.aclose()
+
+
+class AnnouncementReadTests(SaasTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.commit():
+            company = self.create_company('A Şirketi', '1000000001')
+            self.employee = self.create_employee(company.branches.get(), 'employee_a')
+        # Bildirim planlaması commit edilmediğinden çalışmaz
+        self.first, self.second = (
+            Announcement.objects.create(title=title, content='Duyuru', target_role='employee')
+            for title in ('Birinci', 'İkinci')
+        )
+        self.hidden = Announcement.objects.create(
+            title='Yöneticiler', content='Duyuru', target_role='company_admin'
+        )
+        self.client = self.client_for(self.employee.user)
+
+    def mark_read(self, ids=None):
+        if ids is None:
+            return self.client.post('/api/v1/announcements/mark-all-read/').json()
+        return self.client.post('/api/v1/announcements/mark-read/', {'ids': ids}, format='json').json()
+
+    def test_only_inserted_reads_are_counted(self):
+        # Görülemeyen duyuru okundu yapılmaz, tekrar okunan sayılmaz
+        self.assertEqual(self.mark_read([self.first.id, self.hidden.id]), {'updated': 1, 'unread_count': 1})
+        self.assertEqual(self.mark_read([self.first.id]), {'updated': 0, 'unread_count': 1})
+        self.assertEqual(self.mark_read(), {'updated': 1, 'unread_count': 0})
+        self.assertEqual(self.mark_read(), {'updated': 0, 'unread_count': 0})
+        self.assertEqual(
+            set(self.employee.user.announcement_reads.values_list('announcement_id', flat=True)),
+            {self.first.id, self.second.id}
+        )
+
+
+class LocationTreeTests(SaasTestCase):
+    def test_tree_returns_304_until_locations_are_loaded(self):
+        response = self.client.get('/api/v1/locations/tree/')
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+        self.assertEqual([city[2] for city in response.json()['cities']], ['Ankara'])
+        self.assertEqual(
+            self.client.get('/api/v1/locations/tree/', HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+
+        self.load_locations(
+            {**LOCATION_CITIES, 35: 'İzmir'}, LOCATION_DISTRICTS, LOCATION_NEIGHBORHOODS, diff=True
+        )
+        response = self.client.get('/api/v1/locations/tree/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        self.assertEqual([city[2] for city in response.json()['cities']], ['Ankara', 'İzmir'])
+
+    def test_gzip_body_matches_plain_body(self):
+        plain = self.client.get('/api/v1/locations/tree/')
+        compressed = self.client.get('/api/v1/locations/tree/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(compressed.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(compressed.content), plain.content)
+
+
+class LocationIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = LocationIndex(
+            [(34, '34', 'İstanbul'), (6, '06', 'Ankara')],
+            [(1, 34, 'Kadıköy'), (2, 6, 'Çankaya'), (3, 34, 'Şişli')],
+            [
+                (10, 1, 'Moda', '34710'), (11, 2, 'Kızılay', None),
+                (12, 1, 'Caferağa', None), (13, 3, 'Kadıköy Yolu', None),
+            ],
+        )
+
+    def search(self, text, **kwargs):
+        return [(row['type'], row['name']) for row in self.index.search(text, **kwargs)]
+
+    def test_turkish_characters_are_folded(self):
+        self.assertEqual(normalize('Kadıköy / MODA'), ['kadikoy', 'moda'])
+        for query in ('ISTANBUL', 'ıstanbul', 'İstanbul'):
+            self.assertEqual(self.search(query)[0], ('city', 'İstanbul'))
+        self.assertEqual(self.search('sisli'), self.search('ŞİŞLİ'))
+
+    def test_name_matches_rank_before_context_matches(self):
+        self.assertEqual(self.search('kadıköy'), [
+            ('district', 'Kadıköy'),
+            ('neighborhood', 'Kadıköy Yolu'),
+            # Yalnızca ilçe adıyla eşleşenler en sonda
+            ('neighborhood', 'Moda'),
+            ('neighborhood', 'Caferağa'),
+        ])
+        self.assertEqual(self.search('moda kadikoy'), [('neighborhood', 'Moda')])
+        self.assertEqual(self.search('34710'), [('neighborhood', 'Moda')])
+
+    def test_type_filter_and_limit(self):
+        self.assertEqual(
+            self.search('kad', location_type='neighborhood', limit=2),
+            [('neighborhood', 'Kadıköy Yolu'), ('neighborhood', 'Moda')],
+        )
+
+    def test_typos_fall_back_to_trigram_similarity(self):
+        self.assertEqual(self.search('cankya'), [('district', 'Çankaya')])
+        self.assertEqual(self.search('xyzq'), [])
+
+
+class LocationAutocompleteTests(SaasTestCase):
+    def test_autocomplete_returns_labels(self):
+        response = self.client.get('/api/v1/locations/autocomplete/', {'q': 'KIZILAY'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row['type'], row['label']) for row in response.json()],
+            [('neighborhood', 'Ankara - Çankaya - Kızılay')],
+        )
+
+    def test_unknown_type_is_rejected(self):
+        response = self.client.get('/api/v1/locations/autocomplete/', {'q': 'ank', 'type': 'street'})
+        self.assertEqual(response.status_code, 400)
+
+
+class LocationSourceTests(SimpleTestCase):
+    def test_json_array_is_read_across_chunk_boundaries(self):
+        items = [
+            {'sehir_id': '34', 'adi': 'İstanbul, ] [', 'liste': [1, 2, {'x': None}]},
+            123456789, 'metin', None, True, 1.5e3, [], {},
+        ]
+        text = json.dumps(items, ensure_ascii=False, indent=1)
+        for chunk_size in (1, 2, 3, 5, 8, 64):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(list(iter_json_array(io.StringIO(text), chunk_size)), items)
+        self.assertEqual(list(iter_json_array(io.StringIO(' [ ] '))), [])
+
+    def test_invalid_json_arrays_are_rejected(self):
+        for text in ('{"a": 1}', '[1, 2', '[{"a": 1', ''):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                list(iter_json_array(io.StringIO(text), chunk_size=2))
+
+    def test_directory_zip_and_tar_sources_are_read_alike(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        root = Path(directory.name)
+        (root / 'data').mkdir()
+        files = write_location_source(
+            root / 'data', {6: 'Ankara', 35: 'İzmir'}, LOCATION_DISTRICTS, LOCATION_NEIGHBORHOODS
+        )
+
+        with zipfile.ZipFile(root / 'konumlar.zip', 'w') as archive:
+            for name in LOCATION_FILES:
+                # Arşiv içindeki alt dizin önemsizdir
+                archive.write(files / name, f'turkiye/{name}')
+        with tarfile.open(root / 'konumlar.tar.gz', 'w:gz') as archive:
+            for name in LOCATION_FILES:
+                archive.add(files / name, name)
+
+        for source in (files, root / 'konumlar.zip', root / 'konumlar.tar.gz'):
+            with self.subTest(source=source.name), open_location_source(str(source)) as reader:
+                cities = list(iter_location_file(reader, CITY_FILE))
+                self.assertEqual([city['sehir_adi'] for city in cities], ['Ankara', 'İzmir'])
+                self.assertEqual(len(list(iter_location_file(reader, NEIGHBORHOOD_FILES[0]))), 1)
+                with self.assertRaises(FileNotFoundError):
+                    list(iter_location_file(reader, 'yok.json'))
+
+        with self.assertRaises(ValueError):
+            with open_location_source(str(root / 'konumlar.rar')):
+                pass
+
+
+class LoadLocationsDiffTests(SaasTestCase):
+    cities = {6: 'Ankara', 34: 'İstanbul', 35: 'İzmir'}
+    districts = {1: (6, 'Çankaya'), 2: (34, 'Kadıköy'), 3: (34, 'Beşiktaş'), 4: (35, 'Konak')}
+    neighborhoods = {
+        1: (1, 'Kızılay'), 2: (1, 'Bahçelievler'), 3: (2, 'Moda'), 4: (3, 'Levent'),
+        5: (4, 'Alsancak'),
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.load_locations(self.cities, self.districts, self.neighborhoods, diff=True)
+        with self.commit():
+            self.company = self.create_company('A Şirketi', '1000000001')
+            self.company.neighborhood_id = 4
+            self.company.save()
+
+    def names(self, model):
+        return dict(model.objects.values_list('id', 'name'))
+
+    def test_renames_removals_and_freed_names_are_applied(self):
+        deleted = []
+        receiver = lambda sender, **kwargs: deleted.append(sender)  # noqa: E731
+        post_delete.connect(receiver, sender=Neighborhood)
+        self.addCleanup(post_delete.disconnect, receiver, sender=Neighborhood)
+
+        output = self.load_locations(
+            {6: 'Ankara', 34: 'İstanbul'},
+            {1: (6, 'Çankaya'), 2: (34, 'Kadıköy')},
+            {
+                # Aynı ilçede adlar yer değiştirir; Moda'nın serbest kalan adını yeni kayıt alır
+                1: (1, 'Bahçelievler'), 2: (1, 'Kızılay'), 3: (2, 'Caferağa'), 6: (2, 'Moda'),
+            },
+            diff=True,
+        )
+
+        self.assertIn('Mahalle: 1 yeni, 3 değişen, 2 kaynakta yok', output)
+        self.assertEqual(self.names(City), {6: 'Ankara', 34: 'İstanbul'})
+        self.assertEqual(self.names(District), {1: 'Çankaya', 2: 'Kadıköy'})
+        self.assertEqual(
+            self.names(Neighborhood), {1: 'Bahçelievler', 2: 'Kızılay', 3: 'Caferağa', 6: 'Moda'}
+        )
+        self.assertEqual(Neighborhood.objects.get(pk=6).full_name, 'İstanbul - Kadıköy - Moda')
+        # Silinen mahalleye bağlı adres boşaltılır, şirket silinmez
+        self.company.refresh_from_db()
+        self.assertIsNone(self.company.neighborhood_id)
+        self.assertEqual(deleted, [])
+
+    def test_dry_run_writes_nothing(self):
+        output = self.load_locations(LOCATION_CITIES, LOCATION_DISTRICTS, {}, diff=True, dry_run=True)
+        self.assertIn('İl: 0 yeni, 0 değişen, 2 kaynakta yok', output)
+        self.assertEqual(set(self.names(Neighborhood)), set(self.neighborhoods))
+
+    def test_unchanged_source_writes_nothing(self):
+        with CaptureQueriesContext(connection) as queries:
+            output = self.load_locations(self.cities, self.districts, self.neighborhoods, diff=True)
+        self.assertIn('değişiklik yok', output)
+        writes = [
+            query['sql'] for query in queries
+            if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))
+        ]
+        self.assertEqual(writes, [])
+
+
+class LocationSnapshotTests(SaasTestCase):
+    def get_json(self, url, **extra):
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip', **extra)
+        self.assertEqual(response.status_code, 200)
+        return response, json.loads(gzip.decompress(response.content))
+
+    def test_load_locations_publishes_snapshots_and_deltas(self):
+        self.assertEqual(self.client.get('/api/v1/locations/snapshot/').status_code, 404)
+
+        self.load_locations(LOCATION_CITIES, LOCATION_DISTRICTS, LOCATION_NEIGHBORHOODS, diff=True)
+        response, data = self.get_json('/api/v1/locations/snapshot/')
+        self.assertEqual(response.headers['X-Location-Version'], '1')
+        self.assertEqual(data['tables']['neighborhoods'], {
+            'id': [1], 'district_id': [1], 'name': ['Kızılay'], 'postal_code': [None],
+        })
+        self.assertEqual(self.client.get(
+            '/api/v1/locations/snapshot/', HTTP_IF_NONE_MATCH=response.headers['ETag']
+        ).status_code, 304)
+
+        # Değişmeyen veri yeni sürüm oluşturmaz
+        self.load_locations(LOCATION_CITIES, LOCATION_DISTRICTS, LOCATION_NEIGHBORHOODS, diff=True)
+        self.assertEqual(LocationSnapshot.objects.count(), 1)
+
+        self.load_locations(
+            LOCATION_CITIES, LOCATION_DISTRICTS, {2: (1, 'Bahçelievler'), 3: (1, 'Emek')}, diff=True
+        )
+        response, data = self.get_json('/api/v1/locations/delta/?since=1')
+        self.assertEqual(response.headers['X-Location-Version'], '2')
+        self.assertEqual(data['tables']['neighborhoods'], {
+            # id sütunu bir önceki id'ye göre fark olarak kodlanır
+            'upsert': {'id': [2, 1], 'district_id': [1, 1], 'name': ['Bahçelievler', 'Emek'],
+                       'postal_code': [None, None]},
+            'delete': [1],
+        })
+        self.assertEqual(data['tables']['cities']['upsert']['id'], [])
+
+    def test_unknown_versions_are_rejected(self):
+        publish_location_snapshot()
+        self.assertEqual(self.client.get('/api/v1/locations/delta/?since=5').status_code, 410)
+        self.assertEqual(self.client.get('/api/v1/locations/delta/?since=x').status_code, 400)
+
+    def test_concurrent_publish_of_the_same_version_is_retried(self):
+        create = LocationSnapshot.objects.create
+        versions = []
+
+        def create_after_competitor(**kwargs):
+            # İlk denemede aynı sürümü başka bir yayın yazmış olur
+            versions.append(kwargs['version'])
+            if len(versions) == 1:
+                raise IntegrityError('UNIQUE constraint failed: saas_locationsnapshot.version')
+            return create(**kwargs)
+
+        with mock.patch.object(LocationSnapshot.objects, 'create', side_effect=create_after_competitor):
+            snapshot, created = publish_location_snapshot()
+        self.assertTrue(created)
+        self.assertEqual(versions, [1, 1])
+        self.assertEqual(list(LocationSnapshot.objects.values_list('version', flat=True)), [1])
+
+
+class SlugAllocationTests(SaasTestCase):
+    def create_plan(self, name, **kwargs):
+        return Plan.objects.create(
+            name=name, description='Plan', price=0, currency=self.plan.currency,
+            max_users=10, max_storage=100, **kwargs
+        )
+
+    def test_slugs_take_the_first_free_suffix(self):
+        slugs = [self.create_plan('Çağ Planı').slug for _ in range(3)]
+        self.assertEqual(slugs, ['cag-plani', 'cag-plani-1', 'cag-plani-2'])
+        # Başka bir tabanın "cag-plani-" ile başlayan slug'ı numarayı etkilemez
+        self.create_plan('Çağ Planı Pro')
+        Plan.objects.filter(slug='cag-plani-1').delete()
+        self.assertEqual(self.create_plan('Çağ Planı').slug, 'cag-plani-1')
+
+    def test_long_names_leave_room_for_the_suffix(self):
+        name = 'Uzun ' * 20
+        first, second = self.create_plan(name[:50]), self.create_plan(name[:50])
+        max_length = Plan._meta.get_field('slug').max_length
+        self.assertLessEqual(len(second.slug), max_length)
+        self.assertEqual(second.slug, f'{first.slug}-1')
+
+    def test_branch_slugs_are_unique_per_company(self):
+        # Adları aynı slug'a katlanan iki şirketin şubeleri aynı slug'ı alabilir
+        company_a = self.create_company('A Şirketi', '1000000001')
+        company_b = self.create_company('A Sirketi', '1000000002')
+        self.assertEqual((company_a.slug, company_b.slug), ('a-sirketi', 'a-sirketi-1'))
+        branch_a, branch_b = company_a.branches.get(), company_b.branches.get()
+        self.assertEqual(branch_a.slug, branch_b.slug)
+        second = Branch.objects.create(
+            company=company_a, name=branch_a.name, phone='3120000001',
+            email='sube@example.com', address='Adres', neighborhood=self.neighborhood
+        )
+        self.assertEqual(second.slug, f'{branch_a.slug}-1')
+
+    def test_colliding_slug_is_allocated_again(self):
+        self.create_plan('Pro')
+        calls = []
+
+        def stale_then_fresh(instance, base):
+            # İlk ayırma, eşzamanlı bir kaydın aldığı slug'ı görmemiş gibi davranır
+            calls.append(base)
+            return 'pro' if len(calls) == 1 else allocate_slug(instance, base)
+
+        with mock.patch('saas.slugs.allocate_slug', side_effect=stale_then_fresh):
+            plan = self.create_plan('Pro')
+        self.assertEqual(plan.slug, 'pro-1')
+        self.assertEqual(len(calls), 2)
+
+    def test_other_integrity_errors_are_not_retried(self):
+        self.create_company('A Şirketi', '1000000001')
+        company = Company(
+            name='Başka Şirket', tax_number='1000000001', tax_office='Çankaya', phone='3120000000',
+            email='a@example.com', address='Adres'
+        )
+        with self.assertRaises(IntegrityError):
+            company.save(provision=False)
+        self.assertEqual(company.slug, '')
+
+    def test_batch_allocation_uses_one_query_per_scope(self):
+        self.create_plan('Pro')
+        plans = [
+            Plan(name=name, description='Plan', price=0, currency=self.plan.currency,
+                 max_users=1, max_storage=1)
+            for name in ('Pro', 'Pro', 'Temel')
+        ]
+        with self.assertNumQueries(1):
+            allocate_slugs(plans)
+        self.assertEqual([plan.slug for plan in plans], ['pro-1', 'pro-2', 'temel'])
+
+
+class CompanyBulkRegisterTests(SaasTestCase):
+    url = '/api/v1/companies/bulk-register/'
+
+    def setUp(self):
+        super().setUp()
+        with self.commit():
+            self.root = User.objects.create_superuser('root', 'root@example.com', 'pw')
+        self.client = self.client_for(self.root)
+
+    def row(self, name, tax_number):
+        return {
+            'name': name, 'company_type': 'limited', 'tax_number': tax_number,
+            'tax_office': 'Çankaya', 'phone': '3120000000', 'email': f'{tax_number}@example.com',
+            'address': 'Adres', 'neighborhood': self.neighborhood.id,
+        }
+
+    def test_companies_are_registered_with_branch_and_trial(self):
+        rows = [self.row('A Şirketi', '1000000001'), self.row('A Şirketi', '1000000002')]
+        response = self.client.post(self.url, rows, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([row['slug'] for row in response.json()['data']], ['a-sirketi', 'a-sirketi-1'])
+
+        for company in Company.objects.filter(tax_number__in=['1000000001', '1000000002']):
+            self.assertEqual(company.branches.get(is_main_branch=True).name, 'A Şirketi Merkez')
+            self.assertEqual(company.subscriptions.get().plan_id, self.plan.id)
+            self.assertEqual(company.statistics.total_branches, 1)
+
+    def test_only_admins_can_register(self):
+        with self.commit():
+            employee = self.create_employee(
+                self.create_company('A Şirketi', '1000000001').branches.get(), 'admin_a', 'company_admin'
+            )
+        response = self.client_for(employee.user).post(
+            self.url, [self.row('B Şirketi', '1000000002')], format='json'
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_duplicate_tax_numbers_in_the_batch_are_rejected(self):
+        self.create_company('Kayıtlı Şirket', '1000000001')
+        rows = [
+            self.row('A Şirketi', '1000000002'),
+            self.row('B Şirketi', '1000000002'),
+            self.row('C Şirketi', '1000000001'),
+        ]
+        response = self.client.post(self.url, rows, format='json')
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']['non_field_errors']
+        self.assertEqual(errors[0], {})
+        self.assertIn('1. satırda', errors[1]['tax_number'][0])
+        self.assertIn('zaten var', errors[2]['tax_number'][0])
+        self.assertFalse(Company.objects.filter(tax_number='1000000002').exists())
+
+    def test_tax_number_registered_after_validation_returns_failed_rows(self):
+        from . import onboarding
+        register = onboarding._bulk_register
+
+        def racing(rows, *args):
+            # Doğrulama ile kayıt arasında başka bir istek ikinci satırı kaydeder
+            self.create_company('Rakip Şirket', rows[1]['tax_number'])
+            return register(rows, *args)
+
+        rows = [self.row('A Şirketi', '1000000001'), self.row('B Şirketi', '1000000002')]
+        with mock.patch.object(onboarding, '_bulk_register', side_effect=racing):
+            response = self.client.post(self.url, rows, format='json')
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']['non_field_errors']
+        self.assertEqual(errors[0], {})
+        self.assertIn('tax_number', errors[1])
+        self.assertFalse(Company.objects.filter(tax_number='1000000001').exists())
+
+    def test_colliding_company_slugs_are_allocated_again(self):
+        self.create_company('A Şirketi', '1000000001')
+        calls = []
+
+        def stale_then_fresh(instances, check_existing=True):
+            # İlk ayırma, eşzamanlı bir kaydın aldığı slug'ı görmemiş gibi davranır
+            calls.append(check_existing)
+            if len(calls) == 1:
+                for instance in instances:
+                    instance.slug = 'a-sirketi'
+                return instances
+            return allocate_slugs(instances, check_existing)
+
+        with mock.patch('saas.onboarding.allocate_slugs', side_effect=stale_then_fresh):
+            response = self.client.post(self.url, [self.row('A Şirketi', '1000000002')], format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['data'][0]['slug'], 'a-sirketi-1')
+
+
+class EmployeeImportTests(SaasTestCase):
+    url = '/api/v1/employees/import/'
+    headers = [
+        'Kullanıcı Adı', 'Ad', 'Soyad', 'TC Kimlik No', 'Doğum Tarihi', 'Cinsiyet',
+        'Telefon', 'Adres', 'Mahalle', 'İşe Başlama Tarihi',
+    ]
+
+    def setUp(self):
+        super().setUp()
+        with self.commit():
+            self.company = self.create_company('A Şirketi', '1000000001')
+            self.branch = self.company.branches.get()
+            self.admin = self.create_employee(self.branch, 'admin_a', 'company_admin')
+            # Viewset DjangoModelPermissions kullandığından POST için ekleme izni gerekir
+            self.admin.user.user_permissions.add(Permission.objects.get(codename='add_employee'))
+        self.client = self.client_for(self.admin.user)
+
+    def employee_row(self, username, identity_number, birth_date='01.02.1990'):
+        return [
+            username, 'Ayşe', 'Yılmaz', identity_number, birth_date, 'F',
+            '5550000000', 'Adres', str(self.neighborhood.id), '2020-01-01',
+        ]
+
+    def rows(self):
+        return [
+            self.employee_row('ayse', '20000000001'),
+            self.employee_row('ayse', '20000000002'),  # Dosyada tekrar eden kullanıcı adı
+            self.employee_row('fatma', '20000000003', birth_date='31.02.1990'),
+            self.employee_row('zeynep', self.admin.identity_number),
+            None,  # Boş satır atlanır ama satır numarası ilerler
+            self.employee_row('', '20000000005'),
+        ]
+
+    def csv_file(self, rows):
+        lines = [';'.join(self.headers)]
+        lines.extend(';'.join(row) if row else ';;' for row in rows)
+        return SimpleUploadedFile('calisanlar.csv', '\n'.join(lines).encode('utf-8-sig'))
+
+    def post(self, upload, **data):
+        return self.client.post(self.url, {'file': upload, 'branch': self.branch.id, **data})
+
+    def assert_partial_import(self, response):
+        self.assertEqual(response.status_code, 201, response.content)
+        data = response.json()['data']
+        self.assertEqual((data['total'], data['created'], data['failed']), (5, 2, 3))
+        errors = {error['row']: set(error['errors']) for error in data['errors']}
+        self.assertEqual(errors, {3: {'username'}, 4: {'birth_date'}, 5: {'identity_number'}})
+
+        employees = Employee.objects.filter(identity_number__in=['20000000001', '20000000005'])
+        self.assertEqual(
+            set(employees.values_list('user__username', flat=True)), {'ayse', '20000000005'}
+        )
+        self.assertEqual(
+            employees.get(user__username='ayse').display_name, 'Ayşe Yılmaz - A Şirketi Merkez/A Şirketi'
+        )
+        stats = self.company.statistics
+        stats.refresh_from_db()
+        self.assertEqual((stats.total_employees, stats.active_employees), (3, 3))
+
+    def test_csv_rows_are_imported_and_errors_reported_by_row(self):
+        self.assert_partial_import(self.post(self.csv_file(self.rows())))
+
+    @skipUnless(openpyxl, 'openpyxl kurulu değil')
+    def test_xlsx_rows_are_imported_like_csv(self):
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(self.headers)
+        for row in self.rows():
+            if row is None:
+                sheet.append([None] * len(self.headers))
+                continue
+            # Excel'de tarihler ve sayılar metin olarak gelmez
+            row[3] = int(row[3]) if row[3] else None
+            row[9] = datetime.date(2020, 1, 1)
+            sheet.append(row)
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        self.assert_partial_import(self.post(SimpleUploadedFile('calisanlar.xlsx', buffer.getvalue())))
+
+    def test_dry_run_writes_nothing(self):
+        response = self.post(self.csv_file(self.rows()), dry_run='true')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['created'], 2)
+        self.assertFalse(Employee.objects.filter(identity_number='20000000001').exists())
+
+    def test_unsupported_file_type_is_rejected(self):
+        response = self.post(SimpleUploadedFile('calisanlar.txt', b'ad;soyad'))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('file', response.json())
+
+
+class TenantContextTests(SaasTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.commit():
+            self.company = self.create_company('A Şirketi', '1000000001')
+            self.employee = self.create_employee(self.company.branches.get(), 'admin_a', 'company_admin')
+            self.root = User.objects.create_superuser('root', 'root@example.com', 'pw')
+
+    def test_context_is_resolved_in_one_query(self):
+        user = User.objects.get(pk=self.employee.user_id)
+        with self.assertNumQueries(1):
+            tenant = resolve_tenant(user)
+            # Çözülen çalışan kullanıcıya önbelleklenir; zincir yeni sorgu yapmaz
+            self.assertEqual(user.employee.branch.company, self.company)
+        self.assertEqual(
+            (tenant.employee_id, tenant.branch_id, tenant.company_id, tenant.role),
+            (self.employee.id, self.employee.branch_id, self.company.id, 'company_admin')
+        )
+        self.assertTrue(tenant.is_company_admin)
+        self.assertFalse(tenant.is_system_user)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            tenant.role = 'employee'
+
+    def test_users_without_employee_and_anonymous_users(self):
+        root = User.objects.get(pk=self.root.pk)
+        with self.assertNumQueries(1):
+            tenant = resolve_tenant(root)
+            self.assertFalse(hasattr(root, 'employee'))
+        self.assertTrue(tenant.is_system_user)
+        self.assertFalse(tenant.has_employee)
+        self.assertIsNone(tenant.entitlement)
+        self.assertIs(resolve_tenant(AnonymousUser()), ANONYMOUS_TENANT)
+
+    def test_request_context_is_cached_until_the_user_changes(self):
+        request = RequestFactory().get('/')
+        request.user = self.employee.user
+        with self.assertNumQueries(1):
+            self.assertIs(get_tenant(request), get_tenant(request))
+        request.user = self.root
+        self.assertEqual(get_tenant(request).user_id, self.root.pk)
+
+    def test_api_requests_resolve_the_context_at_most_once(self):
+        client = self.client_for(self.employee.user)
+        with mock.patch('saas.authentication.resolve_tenant', wraps=resolve_tenant) as resolve, \
+                mock.patch('saas.tenancy.resolve_tenant', wraps=resolve_tenant) as resolve_again:
+            # Güncel token'ın claim'leri kullanılır, veritabanına gidilmez
+            self.assertEqual(client.get('/api/v1/employees/').status_code, 200)
+            self.assertEqual(resolve.call_count + resolve_again.call_count, 0)
+
+            with self.commit():
+                self.employee.role = 'employee'
+                self.employee.save()
+            # Claim'ler eskidi; bağlam middleware ve viewset için bir kez çözülür
+            self.assertEqual(client.get('/api/v1/employees/').status_code, 200)
+            self.assertEqual(resolve.call_count + resolve_again.call_count, 1)
+
+
+class CompanyStatisticsTests(SaasTestCase):
+    def setUp(self):
+        super().setUp()
+        self.company_a = self.create_company('A Şirketi', '1000000001')
+        self.company_b = self.create_company('B Şirketi', '1000000002')
+        self.branch_a = self.company_a.branches.get()
+
+    def counters(self, company, *fields):
+        return CompanyStatistics.objects.values_list(*fields).get(company=company)
+
+    def assert_counters(self, company, **expected):
+        self.assertEqual(self.counters(company, *expected), tuple(expected.values()))
+
+    def create_invoice(self, company, number, status='pending'):
+        return Invoice.objects.create(
+            subscription=company.subscriptions.get(), number=number, amount=Decimal('100.00'),
+            currency=self.plan.currency, status=status, due_date=datetime.date(2030, 1, 1)
+        )
+
+    def test_branch_and_employee_counters_follow_creates_updates_and_deletes(self):
+        branch = Branch.objects.create(
+            company=self.company_a, name='Şube 2', phone='3120000001', email='sube@example.com',
+            address='Adres'
+        )
+        first = self.create_employee(self.branch_a, 'employee_1')
+        second = self.create_employee(branch, 'employee_2')
+        self.assert_counters(self.company_a, total_branches=2, total_employees=2, active_employees=2)
+
+        first.is_active = False
+        first.save()
+        self.assert_counters(self.company_a, total_employees=2, active_employees=1)
+
+        first.delete()
+        self.assert_counters(self.company_a, total_employees=1, active_employees=1)
+        second.delete()
+        branch.delete()
+        self.assert_counters(self.company_a, total_branches=1, total_employees=0, active_employees=0)
+
+    def test_moved_employee_updates_both_companies(self):
+        employee = self.create_employee(self.branch_a, 'employee_a')
+        employee.branch = self.company_b.branches.get()
+        employee.save()
+        self.assert_counters(self.company_a, total_employees=0, active_employees=0)
+        self.assert_counters(self.company_b, total_employees=1, active_employees=1)
+
+    def test_moved_branch_takes_its_employees_to_the_new_company(self):
+        branch = Branch.objects.create(
+            company=self.company_a, name='Şube 2', phone='3120000001', email='sube@example.com',
+            address='Adres'
+        )
+        self.create_employee(branch, 'employee_a')
+        branch.company = self.company_b
+        branch.save()
+        self.assert_counters(self.company_a, total_branches=1, total_employees=0)
+        self.assert_counters(self.company_b, total_branches=2, total_employees=1)
+
+    def test_storage_counter_follows_file_size(self):
+        stored = FileStorage.objects.create(
+            company=self.company_a, file='company_files/a.pdf', file_type='document', file_size=100
+        )
+        FileStorage.objects.create(
+            company=self.company_a, file='company_files/b.pdf', file_type='document', file_size=50
+        )
+        self.assert_counters(self.company_a, storage_used=150)
+
+        stored.file_size = 300
+        stored.save()
+        self.assert_counters(self.company_a, storage_used=350)
+
+        stored.company = self.company_b
+        stored.save()
+        self.assert_counters(self.company_a, storage_used=50)
+        self.assert_counters(self.company_b, storage_used=300)
+
+        stored.delete()
+        self.assert_counters(self.company_b, storage_used=0)
+
+    def test_invoice_counters_follow_status(self):
+        invoice = self.create_invoice(self.company_a, 'F-1')
+        self.create_invoice(self.company_a, 'F-2', status='paid')
+        self.assert_counters(self.company_a, total_invoices=2, pending_invoices=1)
+
+        invoice.status = 'paid'
+        invoice.save()
+        self.assert_counters(self.company_a, total_invoices=2, pending_invoices=0)
+
+        invoice.delete()
+        self.assert_counters(self.company_a, total_invoices=1, pending_invoices=0)
+
+    def test_reconcile_command_fixes_drifted_counters(self):
+        self.create_employee(self.branch_a, 'employee_a')
+        self.create_invoice(self.company_a, 'F-1')
+        # Sinyal göndermeyen toplu güncellemeler sayaçları kaydırır
+        CompanyStatistics.objects.update(total_branches=9, total_employees=9, pending_invoices=9)
+
+        stdout = io.StringIO()
+        call_command('reconcile_company_statistics', company=[self.company_a.id], stdout=stdout)
+        self.assertIn('1 şirket kontrol edildi, 1 istatistik satırı güncellendi', stdout.getvalue())
+        self.assert_counters(self.company_a, total_branches=1, total_employees=1, pending_invoices=1)
+        self.assert_counters(self.company_b, total_branches=9)
+
+        stdout = io.StringIO()
+        call_command('reconcile_company_statistics', stdout=stdout)
+        self.assertIn('2 şirket kontrol edildi, 1 istatistik satırı güncellendi', stdout.getvalue())
+        self.assert_counters(self.company_b, total_branches=1, total_employees=0, pending_invoices=0)
+        # Sapma kalmadıysa hiçbir satır yazılmaz
+        stdout = io.StringIO()
+        call_command('reconcile_company_statistics', stdout=stdout)
+        self.assertIn('0 istatistik satırı güncellendi', stdout.getvalue())
+
+
+class QueryPlanTests(SaasTestCase):
+    list_urls = [
+        '/api/v1/companies/', '/api/v1/branches/', '/api/v1/employees/',
+        '/api/v1/subscriptions/', '/api/v1/invoices/',
+    ]
+
+    def setUp(self):
+        super().setUp()
+        with self.commit():
+            self.root = User.objects.create_superuser('root', 'root@example.com', 'pw')
+        self.client = self.client_for(self.root)
+        self.created = 0
+
+    def add_companies(self, count):
+        with self.commit():
+            for _ in range(count):
+                self.created += 1
+                company = self.create_company(f'Şirket {self.created}', str(1000000000 + self.created))
+                self.create_employee(company.branches.get(), f'employee_{self.created}')
+                Invoice.objects.create(
+                    subscription=company.subscriptions.get(), number=f'F-{self.created}',
+                    amount=Decimal('100.00'), currency=self.plan.currency, status='pending',
+                    due_date=datetime.date(2030, 1, 1)
+                )
+
+    def get_list(self, url, params=None):
+        """Listeyi okur; satırları ve çalışan SQL cümlelerini döndürür"""
+        # Farklı sorgu dizesi yanıt önbelleğini atlatır; her ölçüm listeyi yeniden okur
+        self.requests = getattr(self, 'requests', 0) + 1
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {**(params or {}), 'request': self.requests})
+        self.assertEqual(response.status_code, 200, url)
+        data = response.json()
+        rows = data['results'] if isinstance(data, dict) else data
+        return rows, [query['sql'] for query in queries]
+
+    def test_list_queries_do_not_grow_with_rows(self):
+        self.add_companies(1)
+        # İlk istek kullanıcı durumunu ve süreç içi önbellekleri doldurur
+        self.get_list('/api/v1/plans/')
+        single = {url: len(self.get_list(url)[1]) for url in self.list_urls}
+        self.add_companies(5)
+        for url in self.list_urls:
+            rows, queries = self.get_list(url)
+            self.assertGreaterEqual(len(rows), 6, url)
+            self.assertEqual(len(queries), single[url], url)
+
+    def test_sparse_fields_prune_payload_and_columns(self):
+        self.add_companies(1)
+        rows, queries = self.get_list('/api/v1/employees/', {'fields': 'id,user_full_name'})
+        self.assertEqual(set(rows[0]), {'id', 'user_full_name'})
+        sql = '\n'.join(queries)
+        self.assertNotIn('identity_number', sql)
+        self.assertNotIn('saas_neighborhood', sql)
+
+    def test_nested_serializers_are_embedded_only_when_expanded(self):
+        self.add_companies(1)
+
+        def first_invoice(expand):
+            rows, queries = self.get_list('/api/v1/invoices/', {'expand': expand})
+            return rows[0], '\n'.join(queries)
+
+        invoice, sql = first_invoice('')
+        self.assertNotIn('subscription_details', invoice)
+        self.assertIn('subscription', invoice)
+        self.assertNotIn('saas_plan', sql)
+
+        invoice, sql = first_invoice('subscription_details')
+        self.assertNotIn('plan_details', invoice['subscription_details'])
+        self.assertNotIn('saas_plan', sql)
+
+        invoice, sql = first_invoice('subscription_details.plan_details')
+        self.assertEqual(invoice['subscription_details']['plan_details']['id'], self.plan.id)
+        self.assertIn('saas_plan', sql)
+
+
+class StoredLabelTests(SaasTestCase):
+    def setUp(self):
+        super().setUp()
+        self.company = self.create_company('A Şirketi', '1000000001')
+        self.branch = self.company.branches.get()
+        self.employee = self.create_employee(self.branch, 'ayse')
+        self.invoice = Invoice.objects.create(
+            subscription=self.company.subscriptions.get(), number='F-1', amount=Decimal('100.00'),
+            currency=self.plan.currency, status='pending', due_date=datetime.date(2030, 1, 1)
+        )
+
+    def assert_labels_current(self):
+        """Saklanan etiketler modelin build_* metotlarıyla aynı olmalı"""
+        for district in District.objects.select_related('city'):
+            self.assertEqual(district.full_name, district.build_full_name())
+        for neighborhood in Neighborhood.objects.select_related('district__city'):
+            self.assertEqual(neighborhood.full_name, neighborhood.build_full_name())
+        for employee in Employee.objects.select_related('user', 'branch__company'):
+            self.assertEqual(employee.display_name, employee.build_display_name())
+        for invoice in Invoice.objects.select_related('subscription__company'):
+            self.assertEqual(invoice.display_name, invoice.build_display_name())
+
+    def test_location_labels_follow_renames(self):
+        city = City.objects.get(pk=6)
+        city.name = 'Başkent'
+        city.save()
+        self.neighborhood.refresh_from_db()
+        self.assertEqual(self.neighborhood.full_name, 'Başkent - Çankaya - Kızılay')
+
+        district = District.objects.get(pk=1)
+        district.name = 'Yenimahalle'
+        district.save(update_fields=['name'])
+        self.assert_labels_current()
+
+    def test_employee_and_invoice_labels_follow_renames(self):
+        user = self.employee.user
+        user.first_name = 'Fatma'
+        user.save()
+        self.branch.name = 'Kızılay Şubesi'
+        self.branch.save()
+        self.company.name = 'B Şirketi'
+        self.company.save()
+        self.assert_labels_current()
+        self.employee.refresh_from_db()
+        self.assertEqual(self.employee.display_name, 'Fatma Test - Kızılay Şubesi/B Şirketi')
+
+    def test_unrelated_updates_do_not_rewrite_labels(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.employee.user.save(update_fields=['last_login'])
+            self.company.save(update_fields=['phone'])
+        self.assertFalse(
+            [query for query in queries if 'display_name' in query['sql']]
+        )
+
+    def test_labels_are_rendered_without_queries(self):
+        employee = Employee.objects.get(pk=self.employee.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(str(employee), employee.display_name)
+        neighborhood = Neighborhood.objects.get(pk=self.neighborhood.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(str(neighborhood), 'Ankara - Çankaya - Kızılay')
+
+
+class RendererTests(SimpleTestCase):
+    def test_dumps_matches_drf_renderer(self):
+        data = {
+            'amount': Decimal('99.90'),
+            'created_at': datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            'date': datetime.date(2024, 5, 1),
+            'time': datetime.time(9, 30),
+            'label': gettext_lazy('Geçerli bir şube seçiniz.'),
+            'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'text': 'Çağ satır',
+            'items': [1, None, True, {'nested': 'değer'}],
+        }
+        self.assertEqual(dumps(data), JSONRenderer().render(data))
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_nan_and_infinity_are_written_as_null(self):
+        # DRF bu değerleri reddeder; orjson null yazar (bkz. renderers.dumps)
+        for value in (float('nan'), float('inf')):
+            with self.assertRaises(ValueError):
+                JSONRenderer().render({'value': value})
+            self.assertEqual(dumps({'value': value}), b'{"value":null}')
+
+    def test_stream_matches_rendered_list(self):
+        rows = [{'id': index, 'name': f'Mahalle {index}'} for index in range(7)]
+        for batch_size in (1, 3, 7, 10):
+            body = b''.join(ORJSONRenderer().render_stream(iter(rows), batch_size=batch_size))
+            self.assertEqual(body, JSONRenderer().render(rows))
+        self.assertEqual(b''.join(ORJSONRenderer().render_stream(iter([]))), b'[]')
+
+    def test_parser_reads_utf8_and_rejects_invalid_json(self):
+        parser = ORJSONParser()
+        self.assertEqual(parser.parse(io.BytesIO('{"ad": "Şule"}'.encode())), {'ad': 'Şule'})
+        with self.assertRaises(ParseError):
+            parser.parse(io.BytesIO(b'{"ad": '))
+
+
+class StreamingListTests(SaasTestCase):
+    url = '/api/v1/neighborhoods/'
+
+    def setUp(self):
+        super().setUp()
+        with self.commit():
+            district = District.objects.get(pk=1)
+            for index in range(2, 6):
+                Neighborhood.objects.create(id=index, district=district, name=f'Mahalle {index}')
+
+    def expected_body(self):
+        queryset = Neighborhood.objects.order_by('name')
+        return JSONRenderer().render(NeighborhoodSerializer(queryset, many=True).data)
+
+    def test_wsgi_list_is_streamed_synchronously(self):
+        response = self.client.get(self.url)
+        self.assertTrue(response.streaming)
+        self.assertFalse(response.is_async)
+        self.assertEqual(b''.join(response.streaming_content), self.expected_body())
+
+    async def test_asgi_list_is_streamed_asynchronously(self):
+        response = await self.async_client.get(self.url)
+        self.assertTrue(response.streaming)
+        # Senkron akış ASGI'de bütünüyle belleğe okunurdu
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(body, await sync_to_async(self.expected_body)())
+
+
+class LoginTests(SaasTestCase):
+    url = '/auth/login/'
+    password = 'Parola.123'
+
+    def setUp(self):
+        super().setUp()
+        with self.commit():
+            self.company = self.create_company('A Şirketi', '1000000001')
+            self.employee = self.create_employee(self.company.branches.get(), 'ayse', 'company_admin')
+            self.employee.user.set_password(self.password)
+            self.employee.user.save()
+
+    def login(self):
+        response = self.client.post(
+            self.url, {'username': 'ayse', 'password': self.password}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_login_stays_within_query_budget(self):
+        # setUp cache'i temizlediğinden süreç içi bakım bilgisi de ilk istekte okunur
+        with self.assertNumQueries(LOGIN_QUERY_BUDGET):
+            self.login()
+        # Profil önbellekten gelir: kullanıcı ve bağlam
+        with self.assertNumQueries(2):
+            self.login()
+
+    def test_exceeding_the_budget_only_logs_a_warning(self):
+        with self.commit():
+            user = self.employee.user
+            user.password = make_password(self.password, hasher='pbkdf2_sha1')
+            user.save()
+        # Parola hash'i yükseltilirken yapılan UPDATE bütçeyi aşar ama giriş başarılıdır
+        with self.assertLogs('saas.login', 'WARNING') as logs:
+            self.login()
+        self.assertIn(f'login: {LOGIN_QUERY_BUDGET + 1} sorgu', logs.output[0])
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$'))
+
+    def test_profile_is_invalidated_by_related_changes(self):
+        self.assertEqual(self.login()['user']['company']['name'], 'A Şirketi')
+        with self.commit():
+            self.company.name = 'B Şirketi'
+            self.company.save()
+        self.assertEqual(self.login()['user']['company']['name'], 'B Şirketi')
+
+        with self.commit():
+            self.employee.phone = '5551112233'
+            self.employee.save()
+        self.assertEqual(self.login()['user']['employee']['personal']['phone'], '5551112233')
+
+
+class EntitlementTests(SaasTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.commit():
+            self.company = self.create_company('A Şirketi', '1000000001')
+            self.employee = self.create_employee(self.company.branches.get(), 'employee_a')
+        self.subscription = self.company.subscriptions.get()
+
+    def test_entitlement_is_cached_until_the_subscription_changes(self):
+        self.assertTrue(get_entitlement(self.company.id).is_active())
+        with self.assertNumQueries(0):
+            self.assertTrue(get_entitlement(self.company.id).is_active())
+        client = self.client_for(self.employee.user)
+        self.assertEqual(client.get('/api/v1/employees/').status_code, 200)
+
+        with self.commit():
+            self.subscription.end_date = timezone.now() - datetime.timedelta(days=1)
+            self.subscription.save()
+        self.assertFalse(get_entitlement(self.company.id).is_active())
+        self.assertEqual(client.get('/api/v1/employees/').status_code, 403)
+
+    def test_plan_change_refreshes_every_company(self):
+        self.assertEqual(get_entitlement(self.company.id).max_users, self.plan.max_users)
+        with self.commit():
+            self.plan.max_users += 5
+            self.plan.save()
+        self.assertEqual(get_entitlement(self.company.id).max_users, self.plan.max_users)
+
+
+class MaintenanceTests(SaasTestCase):
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        with self.commit():
+            self.company = self.create_company('A Şirketi', '1000000001')
+            self.other_company = self.create_company('B Şirketi', '1000000002')
+            branch = self.company.branches.get()
+            self.admin = self.create_employee(branch, 'admin_a', 'company_admin')
+            self.employee = self.create_employee(branch, 'employee_a')
+            self.maintenance = MaintenanceMode.objects.create(
+                title='Mobil bakım', description='Mobil uygulama güncelleniyor', platform='mobile',
+                status='in_progress', planned_start_time=now, actual_start_time=now,
+                planned_end_time=now + datetime.timedelta(hours=1), access_level='company_admin'
+            )
+
+    def get(self, user, platform):
+        return self.client_for(user).get('/api/v1/employees/', HTTP_X_CLIENT_PLATFORM=platform)
+
+    def test_windows_are_cached_per_process(self):
+        self.assertEqual([window.id for window in get_active_maintenances('mobile')], [self.maintenance.id])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_active_maintenances('web'), [])
+
+    def test_only_the_affected_platform_is_blocked(self):
+        response = self.get(self.employee.user, 'mobile')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['maintenance']['title'], 'Mobil bakım')
+        self.assertIn('Retry-After', response)
+        self.assertEqual(self.get(self.employee.user, 'web').status_code, 200)
+        # İzinli şirket listesi boşken tüm şirket yöneticileri erişebilir
+        self.assertEqual(self.get(self.admin.user, 'mobile').status_code, 200)
+
+    def test_allowed_companies_change_is_applied(self):
+        self.assertEqual(self.get(self.admin.user, 'mobile').status_code, 200)
+        with self.commit():
+            self.maintenance.allowed_companies.set([self.other_company])
+        self.assertEqual(self.get(self.admin.user, 'mobile').status_code, 503)
+
+        with self.commit():
+            self.maintenance.allowed_companies.add(self.company)
+        self.assertEqual(self.get(self.admin.user, 'mobile').status_code, 200)
+
+    def test_completed_maintenance_no_longer_blocks(self):
+        self.assertEqual(self.get(self.employee.user, 'mobile').status_code, 503)
+        with self.commit():
+            self.maintenance.status = 'completed'
+            self.maintenance.actual_end_time = timezone.now()
+            self.maintenance.save()
+        self.assertEqual(self.get(self.employee.user, 'mobile').status_code, 200)
@@ -219,6 +219,15 @@ urlpatterns = [
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
     
+    # Konum ağacı, otomatik tamamlama ve mobil senkronizasyon
+    path('api/v1/locations/tree/', views.LocationTreeView.as_view(), name='location-tree'),
+    path('api/v1/locations/autocomplete/', views.LocationAutocompleteView.as_view(), name='location-autocomplete'),
+    path('api/v1/locations/snapshot/', views.LocationSnapshotView.as_view(), name='location-snapshot'),
+    path('api/v1/locations/delta/', views.LocationDeltaView.as_view(), name='location-delta'),
+
+    # Bildirim akışı (SSE, ASGI)
+    path('api/v1/notifications/stream/', views.NotificationStreamView.as_view(), name='notification-stream'),
+
     # API endpoints (v1)
     path('api/v1/', include(router.urls)),
 ]
@@ -6,18 +6,42 @@ from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser, D
 from rest_framework.decorators import action, permission_classes
 from django_filters.rest_framework import DjangoFilterBackend
 from django.utils import timezone
+from django.db import transaction
 from django.db.models import Q, Count, Sum, Avg, F
-from .serializers import LoginSerializer, CitySerializer, DistrictSerializer, NeighborhoodSerializer, CompanySerializer, BranchSerializer, EmployeeSerializer, PlanSerializer, SubscriptionSerializer, InvoiceSerializer, NotificationSerializer, AnnouncementSerializer, MaintenanceModeSerializer, CompanyBrandingSerializer, APIUsageSerializer, IntegrationSerializer, FileStorageSerializer, AuditLogSerializer
+from .serializers import LoginSerializer, CitySerializer, DistrictSerializer, NeighborhoodSerializer, CompanySerializer, CompanyBulkRegisterSerializer, BranchSerializer, EmployeeSerializer, PlanSerializer, SubscriptionSerializer, InvoiceSerializer, NotificationSerializer, AnnouncementSerializer, MarkReadSerializer, MaintenanceModeSerializer, CompanyBrandingSerializer, APIUsageSerializer, IntegrationSerializer, FileStorageSerializer, AuditLogSerializer
 from .models import City, District, Neighborhood, Company, Branch, Employee, Plan, Subscription, Invoice, Notification, Announcement, MaintenanceMode, CompanyBranding, APIUsage, Integration, FileStorage, AuditLog
 from datetime import datetime, timedelta
-from django.core.cache import cache
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
-from django.views.decorators.vary import vary_on_cookie
 from django.utils.translation import gettext_lazy as _
 from django.contrib.contenttypes.models import ContentType
 import logging
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import ValidationError, NotFound
+import gzip
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from .locations import get_location_tree
+from .search import LOCATION_TYPES, autocomplete_locations
+from .snapshots import get_latest_snapshot, build_location_delta
+from .onboarding import BulkRegisterConflict, register_company, bulk_register_companies
+from .imports import ImportFileError, import_employees
+from .statistics import get_company_statistics
+from .entitlements import get_entitlement
+from .notifications import get_unread_count, mark_read as mark_notifications_read
+from .announcements import count_unread_announcements, mark_announcements_read
+from .query_plan import QueryPlanMixin, build_query_plan
+from .pagination import CreatedAtCursorPagination, DateCursorPagination
+from .fast_read import FastReadMixin, StreamingListMixin
+from .conditional import ConditionalGetMixin
+from .response_cache import ResponseCacheMixin
+from .login import LOGIN_QUERY_BUDGET, query_budget
+from .authentication import StreamToken, TenantJWTAuthentication
+from .streams import event_stream
+from rest_framework.parsers import MultiPartParser
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
 
 # Create your views here.
 
@@ -35,12 +59,15 @@ class LoginView(APIView):
     serializer_class = LoginSerializer
 
     def post(self, request, *args, **kwargs):
-        serializer = self.serializer_class(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # Yoğun giriş saatlerinde sorgu sayısının artmaması için bütçe uygulanır
+        with query_budget(LOGIN_QUERY_BUDGET, 'login'):
+            serializer = self.serializer_class(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            data = serializer.data
+        return Response(data, status=status.HTTP_200_OK)
 
 # Konum ViewSet'leri
-class CityViewSet(viewsets.ModelViewSet):
+class CityViewSet(ConditionalGetMixin, StreamingListMixin, QueryPlanMixin, viewsets.ModelViewSet):
     """
     İl yönetimi için API endpoint'leri.
     Token gerektirmez.
@@ -71,7 +98,7 @@ class CityViewSet(viewsets.ModelViewSet):
             permission_classes = [IsAdminUser]
         return [permission() for permission in permission_classes]
 
-class DistrictViewSet(viewsets.ModelViewSet):
+class DistrictViewSet(ConditionalGetMixin, StreamingListMixin, QueryPlanMixin, viewsets.ModelViewSet):
     """
     İlçe yönetimi için API endpoint'leri.
     Token gerektirmez.
@@ -109,7 +136,7 @@ class DistrictViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(city_id=city_id)
         return queryset
 
-class NeighborhoodViewSet(viewsets.ModelViewSet):
+class NeighborhoodViewSet(ConditionalGetMixin, StreamingListMixin, QueryPlanMixin, viewsets.ModelViewSet):
     """
     Mahalle yönetimi için API endpoint'leri.
     Token gerektirmez.
@@ -140,8 +167,133 @@ class NeighborhoodViewSet(viewsets.ModelViewSet):
             permission_classes = [IsAdminUser]
         return [permission() for permission in permission_classes]
 
+def encoded_json_response(request, etag, gzip_payload, payload=None):
+    """
+    Önceden kodlanmış JSON gövdesini ETag ve gzip desteğiyle döndürür.
+    payload verilmezse gzip kabul etmeyen istemciler için gövde açılarak gönderilir.
+    """
+    if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        response = HttpResponseNotModified()
+    elif 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+        response = HttpResponse(gzip_payload, content_type='application/json')
+        response['Content-Encoding'] = 'gzip'
+    else:
+        if payload is None:
+            payload = gzip.decompress(gzip_payload)
+        response = HttpResponse(payload, content_type='application/json')
+
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=0, must_revalidate=True)
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+class LocationTreeView(APIView):
+    """
+    İl → İlçe → Mahalle ağacını tek bir yanıt olarak döndürür.
+    Token gerektirmez.
+
+    GET /api/v1/locations/tree/ ile kullanılır.
+    * Ağaç süreç içinde bir kez kurulur, konum verisi değişene kadar yeniden kullanılır
+    * Yanıt ETag içerir; If-None-Match eşleşirse 304 döner
+    * Diziler `fields` başlığındaki sırayla kodlanır
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request, *args, **kwargs):
+        tree = get_location_tree()
+        return encoded_json_response(request, tree.etag, tree.gzip_payload, tree.payload)
+
+class LocationAutocompleteView(APIView):
+    """
+    İl, ilçe ve mahalleler için otomatik tamamlama.
+    Token gerektirmez.
+
+    GET /api/v1/locations/autocomplete/?q=kadıköy moda ile kullanılır.
+    * q: Aranan metin (Türkçe karakterler tr_slugify ile aynı şekilde katlanır)
+    * type: city, district veya neighborhood (opsiyonel)
+    * limit: Sonuç sayısı (varsayılan 10, en fazla 20)
+    * Arama bellekteki indeks üzerinden yapılır, veritabanına gidilmez
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request, *args, **kwargs):
+        query = request.query_params.get('q', '')
+        location_type = request.query_params.get('type') or None
+        if location_type and location_type not in LOCATION_TYPES:
+            raise ValidationError({'type': _('Geçersiz konum tipi.')})
+        try:
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError:
+            raise ValidationError({'limit': _('Geçerli bir sayı giriniz.')})
+
+        results = autocomplete_locations(query, limit=limit, location_type=location_type)
+        return Response(results)
+
+class LocationSnapshotView(APIView):
+    """
+    Konum verisinin yayınlanmış son anlık görüntüsünü döndürür.
+    Token gerektirmez.
+
+    GET /api/v1/locations/snapshot/ ile kullanılır.
+    * Gövde sütunsal JSON'dur: tables.<tablo>.<sütun> dizileri, id sütunu farklarla kodlanır
+    * Anlık görüntüler load_locations sonunda veya publish_location_snapshot komutuyla yayınlanır
+    * Yanıttaki version değeri sonraki fark isteklerinde since olarak gönderilir
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request, *args, **kwargs):
+        snapshot = get_latest_snapshot()
+        if snapshot is None:
+            raise NotFound(_('Yayınlanmış konum verisi bulunamadı.'))
+
+        etag = '"snapshot-%s-%s"' % (snapshot.version, snapshot.checksum[:16])
+        response = encoded_json_response(request, etag, bytes(snapshot.payload))
+        response['X-Location-Version'] = snapshot.version
+        return response
+
+class LocationDeltaView(APIView):
+    """
+    Verilen sürümden son anlık görüntüye kadar değişen konumları döndürür.
+    Token gerektirmez.
+
+    GET /api/v1/locations/delta/?since=12 ile kullanılır.
+    * tables.<tablo>.upsert: eklenen/değişen satırlar (anlık görüntüyle aynı biçim)
+    * tables.<tablo>.delete: silinen veya pasife alınan id'ler
+    * since sürümü artık saklanmıyorsa 410 döner, tam anlık görüntü indirilmelidir
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request, *args, **kwargs):
+        try:
+            since = int(request.query_params['since'])
+        except (KeyError, ValueError):
+            raise ValidationError({'since': _('Geçerli bir sürüm numarası giriniz.')})
+
+        snapshot = get_latest_snapshot()
+        if snapshot is None:
+            raise NotFound(_('Yayınlanmış konum verisi bulunamadı.'))
+
+        payload = None
+        if since <= snapshot.version:
+            payload = build_location_delta(since, snapshot)
+        if payload is None:
+            return Response(
+                {'detail': _('Bu sürüm artık desteklenmiyor, tam veriyi indirin.'),
+                 'version': snapshot.version},
+                status=status.HTTP_410_GONE
+            )
+
+        etag = '"delta-%s-%s"' % (since, snapshot.version)
+        response = encoded_json_response(request, etag, payload)
+        response['X-Location-Version'] = snapshot.version
+        return response
+
 # Şirket ve Şube ViewSet'leri
-class BaseViewSet(viewsets.ModelViewSet):
+class BaseViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     """Tüm ViewSet'ler için temel sınıf"""
     permission_classes = [IsAuthenticated, DjangoModelPermissions]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -183,7 +335,7 @@ class BaseViewSet(viewsets.ModelViewSet):
         deleted_count = self.get_queryset().filter(id__in=ids).delete()[0]
         return Response({'deleted_count': deleted_count})
 
-class CompanyViewSet(BaseViewSet):
+class CompanyViewSet(ConditionalGetMixin, ResponseCacheMixin, BaseViewSet):
     """
     Şirket yönetimi için API endpoint'leri.
     
@@ -197,6 +349,10 @@ class CompanyViewSet(BaseViewSet):
     Yeni şirket kaydı oluşturur (token gerektirmez).
     * Otomatik olarak merkez şube oluşturulur
     * 30 günlük deneme planı atanır
+
+    bulk_register:
+    Şirketleri toplu olarak kaydeder (yalnızca yöneticiler).
+    * Tek istekte en fazla 500 şirket
     """
     queryset = Company.objects.all()
     serializer_class = CompanySerializer
@@ -208,6 +364,8 @@ class CompanyViewSet(BaseViewSet):
         """list ve register için izin gerektirmez"""
         if self.action in ['list', 'register']:
             permission_classes = [AllowAny]
+        elif self.action == 'bulk_register':
+            permission_classes = [IsAdminUser]
         else:
             permission_classes = [IsAuthenticated]
         return [permission() for permission in permission_classes]
@@ -220,71 +378,62 @@ class CompanyViewSet(BaseViewSet):
 
     @action(detail=True, methods=['get'])
     def statistics(self, request, pk=None):
-        """Şirket istatistiklerini döndürür"""
-        company = self.get_object()
-        
-        # İstatistikleri hesapla
-        stats = {
+        """
+        Şirket istatistiklerini döndürür.
+        Sayaçlar CompanyStatistics tablosunda hazır tutulur; tek sorguyla okunur.
+        """
+        stats = get_company_statistics(pk, companies=self.get_queryset())
+        if stats is None:
+            raise NotFound(_('Şirket bulunamadı.'))
+
+        now = timezone.now()
+        data = {
             'general': {
-                'total_branches': company.branches.count(),
-                'total_employees': Employee.objects.filter(branch__company=company).count(),
-                'active_employees': Employee.objects.filter(
-                    branch__company=company,
-                    is_active=True,
-                    termination_date__isnull=True
-                ).count(),
+                'total_branches': stats.total_branches,
+                'total_employees': stats.total_employees,
+                'active_employees': stats.active_employees,
             },
             'subscription': {
                 'current_plan': None,
                 'remaining_days': 0,
                 'usage_stats': {
-                    'storage_used': FileStorage.objects.filter(company=company)
-                        .aggregate(total=Sum('file_size'))['total'] or 0,
-                    'api_calls_today': APIUsage.objects.filter(
-                        company=company,
-                        date=timezone.now().date()
-                    ).aggregate(total=Sum('requests_count'))['total'] or 0,
+                    'storage_used': stats.storage_used,
+                    'api_calls_today': (
+                        stats.api_calls_today
+                        if stats.api_calls_date == timezone.localdate(now) else 0
+                    ),
                 }
             },
             'financial': {
-                'total_invoices': Invoice.objects.filter(
-                    subscription__company=company
-                ).count(),
-                'pending_invoices': Invoice.objects.filter(
-                    subscription__company=company,
-                    status='pending'
-                ).count(),
+                'total_invoices': stats.total_invoices,
+                'pending_invoices': stats.pending_invoices,
             }
         }
 
-        # Aktif abonelik bilgileri
-        active_sub = company.subscriptions.filter(
-            status='active',
-            start_date__lte=timezone.now(),
-            end_date__gte=timezone.now()
-        ).first()
-
-        if active_sub:
-            stats['subscription']['current_plan'] = {
-                'name': active_sub.plan.name,
-                'price': str(active_sub.plan.price),
-                'features': active_sub.plan.features,
+        # Aktif abonelik bilgileri (önbellekteki hak bilgisinden)
+        entitlement = get_entitlement(stats.company_id, now)
+        if entitlement.is_active(now):
+            data['subscription']['current_plan'] = {
+                'name': entitlement.plan_name,
+                'price': str(entitlement.plan_price),
+                'features': entitlement.features,
             }
-            stats['subscription']['remaining_days'] = (
-                active_sub.end_date - timezone.now().date()
-            ).days
+            data['subscription']['remaining_days'] = entitlement.remaining_days(now)
 
-        return Response(stats)
+        return Response(data)
 
     @action(detail=True, methods=['get'])
     def audit_logs(self, request, pk=None):
         """Şirket audit loglarını döndürür"""
         company = self.get_object()
-        page = self.paginate_queryset(
-            AuditLog.objects.filter(company=company).order_by('-created_at')
+        selection = self.get_field_selection()
+        queryset = build_query_plan(AuditLogSerializer, AuditLog, selection).apply(
+            AuditLog.objects.filter(company=company)
         )
-        serializer = AuditLogSerializer(page, many=True)
-        return self.get_paginated_response(serializer.data)
+        paginator = CreatedAtCursorPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = selection.apply(AuditLogSerializer(page, many=True))
+        return paginator.get_paginated_response(serializer.data)
 
     @action(detail=False, methods=['post'], url_path='register')
     def register(self, request):
@@ -306,53 +455,10 @@ class CompanyViewSet(BaseViewSet):
                     'errors': e.detail
                 }, status=status.HTTP_400_BAD_REQUEST)
 
-            # Şirketi oluştur
-            company = serializer.save(is_active=True)
-            logger.info(f"Company created: {company.name}")
-
+            # Şirket, merkez şube ve deneme aboneliği tek transaction içinde oluşturulur
             try:
-                # Merkez şube oluştur
-                branch = Branch.objects.create(
-                    company=company,
-                    name=f"{company.name} Merkez",
-                    is_main_branch=True,
-                    phone=company.phone,
-                    email=company.email,
-                    address=company.address,
-                    neighborhood=company.neighborhood
-                )
-                logger.info(f"Main branch created for company: {company.name}")
-
-                # Deneme planı ata
-                trial_plan = Plan.objects.get(id=1)
-                subscription = Subscription.objects.create(
-                    company=company,
-                    plan=trial_plan,
-                    status='active',
-                    start_date=timezone.now(),
-                    end_date=timezone.now() + timedelta(days=30)
-                )
-                logger.info(f"Trial subscription created for company: {company.name}")
-
-                return Response({
-                    'status': 'success',
-                    'message': 'Şirket başarıyla oluşturuldu',
-                    'data': {
-                        'company': serializer.data,
-                        'branch': {
-                            'id': branch.id,
-                            'name': branch.name
-                        },
-                        'subscription': {
-                            'plan': trial_plan.name,
-                            'end_date': subscription.end_date
-                        }
-                    }
-                }, status=status.HTTP_201_CREATED)
-
+                result = register_company(serializer.validated_data)
             except Exception as e:
-                # Hata durumunda oluşturulan şirketi sil
-                company.delete()
                 logger.error(f"Error during company registration process: {str(e)}")
                 return Response({
                     'status': 'error',
@@ -360,6 +466,25 @@ class CompanyViewSet(BaseViewSet):
                     'detail': str(e)
                 }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+            serializer.instance = result.company
+            logger.info(f"Company created: {result.company.name}")
+
+            return Response({
+                'status': 'success',
+                'message': 'Şirket başarıyla oluşturuldu',
+                'data': {
+                    'company': serializer.data,
+                    'branch': {
+                        'id': result.branch.id,
+                        'name': result.branch.name
+                    },
+                    'subscription': {
+                        'plan': result.subscription.plan.name,
+                        'end_date': result.subscription.end_date
+                    }
+                }
+            }, status=status.HTTP_201_CREATED)
+
         except Exception as e:
             logger.error(f"Unexpected error during registration: {str(e)}")
             return Response({
@@ -368,7 +493,52 @@ class CompanyViewSet(BaseViewSet):
                 'detail': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-class BranchViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['post'], url_path='bulk-register')
+    def bulk_register(self, request):
+        """
+        Bayi içe aktarımları için toplu şirket kaydı (yalnızca yöneticiler).
+        Gövde şirket listesidir; her şirket için merkez şube ve deneme aboneliği
+        toplu insert ile oluşturulur. Bir satır bile hatalıysa hiçbiri kaydedilmez.
+        """
+        serializer = CompanyBulkRegisterSerializer(data=request.data, many=True)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except ValidationError as e:
+            return Response({
+                'status': 'error',
+                'message': 'Validasyon hatası',
+                'errors': e.detail
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            results = bulk_register_companies(serializer.validated_data)
+        except BulkRegisterConflict as e:
+            return Response({
+                'status': 'error',
+                'message': 'Bazı şirketler başka bir kayıtla çakıştı',
+                # Liste doğrulama hatalarıyla aynı biçim: satır başına hata sözlükleri
+                'errors': serializers.as_serializer_error(ValidationError(e.errors))
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        logger.info(f"{len(results)} companies bulk registered by {request.user.username}")
+
+        return Response({
+            'status': 'success',
+            'message': f'{len(results)} şirket başarıyla oluşturuldu',
+            'data': [
+                {
+                    'id': result.company.id,
+                    'name': result.company.name,
+                    'slug': result.company.slug,
+                    'tax_number': result.company.tax_number,
+                    'branch_id': result.branch.id,
+                    'subscription_end_date': result.subscription.end_date,
+                }
+                for result in results
+            ]
+        }, status=status.HTTP_201_CREATED)
+
+class BranchViewSet(ConditionalGetMixin, ResponseCacheMixin, FastReadMixin, QueryPlanMixin, viewsets.ModelViewSet):
     """
     Şube yönetimi için API endpoint'leri.
 
@@ -402,7 +572,7 @@ class BranchViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'company__name', 'email']
     ordering_fields = ['name', 'created_at']
 
-class EmployeeViewSet(BaseViewSet):
+class EmployeeViewSet(ConditionalGetMixin, ResponseCacheMixin, FastReadMixin, BaseViewSet):
     """
     Çalışan yönetimi için API endpoint'leri.
 
@@ -435,9 +605,14 @@ class EmployeeViewSet(BaseViewSet):
     * Cinsiyet dağılımı
     * Rol dağılımı
     * Ortalama çalışma süresi
+
+    import_file:
+    CSV/XLSX dosyasından toplu çalışan aktarır.
+    * POST /api/v1/employees/import/ (multipart)
     """
     queryset = Employee.objects.all()
     serializer_class = EmployeeSerializer
+    response_cache_scope = 'company'
     filterset_fields = ['branch', 'role', 'gender', 'is_active']
     search_fields = ['user__username', 'user__first_name', 'user__last_name', 'identity_number']
     ordering_fields = ['user__first_name', 'hire_date']
@@ -445,15 +620,15 @@ class EmployeeViewSet(BaseViewSet):
     def get_queryset(self):
         """Kullanıcının yetkisine göre çalışanları filtrele"""
         queryset = super().get_queryset()
-        user = self.request.user
-
-        if not user.is_superuser and not user.is_staff:
-            if hasattr(user, 'employee'):
-                if user.employee.role == 'company_admin':
-                    return queryset.filter(branch__company=user.employee.branch.company)
-                elif user.employee.role == 'branch_admin':
-                    return queryset.filter(branch=user.employee.branch)
-                return queryset.filter(id=user.employee.id)
+        tenant = self.request.tenant
+
+        if not tenant.is_system_user:
+            if tenant.has_employee:
+                if tenant.is_company_admin:
+                    return queryset.filter(branch__company_id=tenant.company_id)
+                elif tenant.is_branch_admin:
+                    return queryset.filter(branch_id=tenant.branch_id)
+                return queryset.filter(id=tenant.employee_id)
             return Employee.objects.none()
         return queryset
 
@@ -479,17 +654,65 @@ class EmployeeViewSet(BaseViewSet):
         }
         return Response(stats)
 
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_file(self, request):
+        """
+        CSV/XLSX dosyasından toplu çalışan içe aktarımı.
+        * file: CSV (',' veya ';' ayraçlı) ya da XLSX dosyası
+        * branch: Satırda şube belirtilmemişse kullanılacak şube
+        * default_password: Opsiyonel ortak başlangıç parolası
+        * dry_run: true ise yalnızca doğrulama yapılır
+        Hatalı satırlar satır numarasıyla raporlanır, geçerli satırlar kaydedilir.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': _('Dosya yükleyiniz.')})
+        try:
+            branch = Branch.objects.select_related('company').get(pk=request.data.get('branch'))
+        except (Branch.DoesNotExist, ValueError, TypeError):
+            raise ValidationError({'branch': _('Geçerli bir şube seçiniz.')})
+
+        user = request.user
+        tenant = request.tenant
+        if not tenant.is_system_user:
+            if not (tenant.is_company_admin and tenant.company_id == branch.company_id):
+                return Response({
+                    'status': 'error',
+                    'message': 'Bu şirkete çalışan aktarma yetkiniz yok.'
+                }, status=status.HTTP_403_FORBIDDEN)
+
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+        try:
+            result = import_employees(
+                upload, upload.name, branch,
+                user=user,
+                default_password=request.data.get('default_password') or None,
+                dry_run=dry_run
+            )
+        except ImportFileError as e:
+            raise ValidationError({'file': str(e)})
+
+        logger.info(
+            f"Employee import for branch {branch.id}: {result.created} created, {result.failed} failed"
+        )
+        return Response({
+            'status': 'success' if not result.failed else 'partial',
+            'message': f'{result.created} çalışan aktarıldı, {result.failed} satır hatalı',
+            'data': result.as_dict()
+        }, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
+
 # Abonelik ve Ödeme ViewSet'leri
-class PlanViewSet(viewsets.ModelViewSet):
+class PlanViewSet(ConditionalGetMixin, ResponseCacheMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Plan.objects.all()
     serializer_class = PlanSerializer
     permission_classes = [IsAuthenticated]
+    response_cache_scope = 'all'  # Planlar tüm kullanıcılara aynı döner
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['is_active']
     search_fields = ['name']
     ordering_fields = ['price', 'created_at']
 
-class SubscriptionViewSet(BaseViewSet):
+class SubscriptionViewSet(ConditionalGetMixin, ResponseCacheMixin, BaseViewSet):
     """
     Abonelik yönetimi için API endpoint'leri.
 
@@ -540,6 +763,7 @@ class SubscriptionViewSet(BaseViewSet):
             title=_("Abonelik İptali"),
             message=_(f"{subscription.company.name} şirketi için abonelik iptal edildi."),
             notification_type='subscription_cancelled',
+            scope='company',
             company=subscription.company,
             created_by=request.user
         )
@@ -561,7 +785,7 @@ class SubscriptionViewSet(BaseViewSet):
             'new_end_date': subscription.end_date
         })
 
-class InvoiceViewSet(viewsets.ModelViewSet):
+class InvoiceViewSet(ConditionalGetMixin, ResponseCacheMixin, FastReadMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Invoice.objects.all()
     serializer_class = InvoiceSerializer
     permission_classes = [IsAuthenticated]
@@ -571,16 +795,86 @@ class InvoiceViewSet(viewsets.ModelViewSet):
     ordering_fields = ['due_date', 'created_at']
 
 # Bildirim ViewSet'leri
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(ConditionalGetMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Notification.objects.all()
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = CreatedAtCursorPagination
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['notification_type', 'scope', 'is_active']
     search_fields = ['title', 'message']
-    ordering_fields = ['-created_at']
 
-class AnnouncementViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'], url_path='unread-count')
+    def unread_count(self, request):
+        """Kullanıcının okunmamış bildirim sayısı (cache'teki sayaçtan, sorgusuz)"""
+        return Response({'unread_count': get_unread_count(request.user.id)})
+
+    @action(detail=False, methods=['post'], url_path='mark-read')
+    def mark_read(self, request):
+        """Verilen bildirimleri tek UPDATE ile okundu yapar, yeni okunmamış sayısını döner"""
+        serializer = MarkReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        updated = mark_notifications_read(request.user.id, serializer.validated_data['ids'])
+        return Response({'updated': updated, 'unread_count': get_unread_count(request.user.id)})
+
+    @action(detail=False, methods=['post'], url_path='mark-all-read')
+    def mark_all_read(self, request):
+        """Kullanıcının tüm bildirimlerini tek UPDATE ile okundu yapar"""
+        updated = mark_notifications_read(request.user.id)
+        return Response({'updated': updated, 'unread_count': get_unread_count(request.user.id)})
+
+    @action(detail=False, methods=['post'], url_path='stream-token')
+    def stream_token(self, request):
+        """Bildirim akışını (?token=) açmak için kısa ömürlü token üretir"""
+        token = StreamToken.for_user(request.user)
+        return Response({'token': str(token), 'expires_in': int(token.lifetime.total_seconds())})
+
+def _stream_user(request):
+    """
+    Akış isteğinin kullanıcısı. EventSource başlık gönderemediğinden
+    Authorization başlığının yanında ?token= parametresi de kabul edilir;
+    parametrede yalnızca stream-token ile alınan kısa ömürlü token geçerlidir.
+    """
+    authentication = TenantJWTAuthentication()
+    try:
+        raw_token = request.GET.get('token')
+        if raw_token:
+            token = StreamToken(raw_token)
+            return authentication.get_user_state(token).user
+        result = authentication.authenticate(request)
+    except (AuthenticationFailed, InvalidToken, TokenError):
+        return None
+    return result[0] if result else None
+
+
+class NotificationStreamView(View):
+    """
+    Yeni bildirim ve duyuruları Server-Sent Events ile iletir.
+
+    Yalnızca ASGI giriş noktasıyla (core.asgi) çalışır; WSGI sunucuları
+    (runserver, senkron gunicorn) asenkron akışı yanıt vermeden sonuna kadar
+    tüketmeye çalışacağından bu durumda 501 döner. Boşta bağlantılar
+    süreçteki dağıtıcının kuyruğunda bekler ve belirli aralıklarla yorum
+    satırı alır. Olaylar: notification, announcement (data: bildirim JSON'u,
+    id: bildirim id).
+    """
+
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse(
+                {'detail': _('Bildirim akışı yalnızca ASGI sunucusu ile kullanılabilir.')},
+                status=501
+            )
+        user = await sync_to_async(_stream_user)(request)
+        if user is None:
+            return JsonResponse({'detail': _('Kimlik doğrulama bilgileri verilmedi.')}, status=401)
+
+        response = StreamingHttpResponse(event_stream(user.id), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # nginx yanıtı tamponlamasın
+        return response
+
+class AnnouncementViewSet(ConditionalGetMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Announcement.objects.all()
     serializer_class = AnnouncementSerializer
     permission_classes = [IsAuthenticated]
@@ -589,8 +883,35 @@ class AnnouncementViewSet(viewsets.ModelViewSet):
     search_fields = ['title', 'content']
     ordering_fields = ['-publish_date', '-priority']
 
+    def perform_create(self, serializer):
+        # Hedef şirketler duyuruyla aynı transaction'da yazılır; bildirim commit'ten sonra oluşturulur
+        with transaction.atomic():
+            serializer.save()
+
+    @action(detail=False, methods=['post'], url_path='mark-read')
+    def mark_read(self, request):
+        """Verilen duyuruları tek INSERT ile okundu yapar, yeni okunmamış sayısını döner"""
+        serializer = MarkReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        tenant = request.tenant
+        created = mark_announcements_read(request.user.id, tenant, serializer.validated_data['ids'])
+        return Response({
+            'updated': created,
+            'unread_count': count_unread_announcements(request.user.id, tenant)
+        })
+
+    @action(detail=False, methods=['post'], url_path='mark-all-read')
+    def mark_all_read(self, request):
+        """Kullanıcının görebildiği tüm duyuruları tek INSERT ile okundu yapar"""
+        tenant = request.tenant
+        created = mark_announcements_read(request.user.id, tenant)
+        return Response({
+            'updated': created,
+            'unread_count': count_unread_announcements(request.user.id, tenant)
+        })
+
 # Sistem ViewSet'leri
-class MaintenanceModeViewSet(viewsets.ModelViewSet):
+class MaintenanceModeViewSet(ConditionalGetMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = MaintenanceMode.objects.all()
     serializer_class = MaintenanceModeSerializer
     permission_classes = [IsAuthenticated]
@@ -599,7 +920,7 @@ class MaintenanceModeViewSet(viewsets.ModelViewSet):
     search_fields = ['title']
     ordering_fields = ['planned_start_time']
 
-class CompanyBrandingViewSet(viewsets.ModelViewSet):
+class CompanyBrandingViewSet(ConditionalGetMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = CompanyBranding.objects.all()
     serializer_class = CompanyBrandingSerializer
     permission_classes = [IsAuthenticated]
@@ -607,16 +928,16 @@ class CompanyBrandingViewSet(viewsets.ModelViewSet):
     filterset_fields = ['company', 'is_active']
     search_fields = ['company__name']
 
-class APIUsageViewSet(viewsets.ModelViewSet):
+class APIUsageViewSet(ConditionalGetMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = APIUsage.objects.all()
     serializer_class = APIUsageSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = DateCursorPagination
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['company', 'endpoint', 'method', 'date']
     search_fields = ['company__name', 'endpoint']
-    ordering_fields = ['-date', '-requests_count']
 
-class IntegrationViewSet(viewsets.ModelViewSet):
+class IntegrationViewSet(ConditionalGetMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Integration.objects.all()
     serializer_class = IntegrationSerializer
     permission_classes = [IsAuthenticated]
@@ -625,7 +946,7 @@ class IntegrationViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'company__name']
     ordering_fields = ['name']
 
-class FileStorageViewSet(viewsets.ModelViewSet):
+class FileStorageViewSet(ConditionalGetMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = FileStorage.objects.all()
     serializer_class = FileStorageSerializer
     permission_classes = [IsAuthenticated]
@@ -634,11 +955,11 @@ class FileStorageViewSet(viewsets.ModelViewSet):
     search_fields = ['description', 'company__name']
     ordering_fields = ['-created_at']
 
-class AuditLogViewSet(viewsets.ModelViewSet):
+class AuditLogViewSet(ConditionalGetMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = AuditLog.objects.all()
     serializer_class = AuditLogSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = CreatedAtCursorPagination
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['action', 'content_type', 'user', 'company']
     search_fields = ['object_repr', 'user__username', 'company__name']
-    ordering_fields = ['-created_at']